@@ -5,14 +5,12 @@ import logging
 from pathlib import Path
 from collections import defaultdict
 import hashlib
-import pytz
-import pytesseract
-from PIL import Image
-import PyPDF2
-try:
-    import docx2txt
-except ImportError:
-    docx2txt = None
+import sys
+
+# Shared scanner helpers (docscan/) live in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from docscan.catalog import file_digest
+from docscan.extractors import extract, supports
 
 class ProjectAnalyzer:
     def __init__(self, root_dir):
@@ -27,8 +25,11 @@ class ProjectAnalyzer:
             },
             "code_analysis": {},
             "documentation": {},
+            "duplicates": {},
             "dependencies": set()
         }
+        # Content hash -> path of the first file with that content
+        self.blobs = {}
         self.logger = logging.getLogger(__name__)
         
         # Supported file extensions
@@ -61,10 +62,22 @@ class ProjectAnalyzer:
         self.analysis_results["metadata"]["total_files"] += 1
         self.analysis_results["metadata"]["file_types"][ext] += 1
         
+        if ext not in self.code_extensions and ext not in self.doc_extensions:
+            return
+        
+        # Identical copies (e.g. the duplicated University/ trees) are analyzed once
+        # and listed as aliases of the first copy
+        content_hash = file_digest(file_path)
+        original = self.blobs.get(content_hash)
+        if original is not None:
+            self.analysis_results["duplicates"].setdefault(original, []).append(rel_path)
+            return
+        self.blobs[content_hash] = rel_path
+        
         # Analyze based on file type
         if ext in self.code_extensions:
             self._analyze_code_file(file_path, rel_path)
-        elif ext in self.doc_extensions:
+        else:
             self._analyze_document(file_path, rel_path)
     
     def _analyze_code_file(self, file_path, rel_path):
@@ -98,32 +111,13 @@ class ProjectAnalyzer:
             content = ""
             file_type = file_path.suffix.lower()
             
-            # Handle different document types
-            if file_type == '.pdf':
-                # Extract text from PDF
-                with open(file_path, 'rb') as f:
-                    reader = PyPDF2.PdfReader(f)
-                    content = "\n".join([page.extract_text() for page in reader.pages])
-            elif file_type == '.docx':
-                # Extract text from Word documents
-                if docx2txt is not None:
-                    # Use docx2txt if available
-                    content = docx2txt.process(str(file_path))
-                else:
-                    # Fallback: try python-docx, otherwise skip content
-                    try:
-                        import docx as docx_lib
-                        doc = docx_lib.Document(str(file_path))
-                        content = "\n".join(p.text for p in doc.paragraphs)
-                    except ImportError:
-                        print(f"Skipping DOCX file {file_path}: no suitable text extraction library available")
-                        content = ""
-            elif file_type in ['.png', '.jpg', '.jpeg', '.tiff', '.bmp']:
-                # Extract text from images using OCR
+            # PDFs, Word documents, images (OCR) and text files go through the shared
+            # extractor registry, which imports PyPDF2, docx2txt and the OCR engine on first use
+            if supports(file_type):
                 try:
-                    content = pytesseract.image_to_string(Image.open(file_path))
+                    content = extract(file_path, file_type)
                 except Exception as e:
-                    print(f"OCR failed for {file_path}: {str(e)}")
+                    print(f"Text extraction failed for {file_path}: {str(e)}")
             else:
                 # Fallback to regular text file reading
                 with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
@@ -185,6 +179,12 @@ class ProjectAnalyzer:
             # Generate timestamp for the report
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             
+            # List duplicate copies with the file that was analyzed
+            for original, aliases in self.analysis_results["duplicates"].items():
+                for section in ("code_analysis", "documentation"):
+                    if original in self.analysis_results[section]:
+                        self.analysis_results[section][original]["aliases"] = aliases
+            
             # Save full analysis
             output_file = analysis_dir / f"full_analysis_{timestamp}.json"
             with open(output_file, 'w', encoding='utf-8') as f:
@@ -208,7 +208,7 @@ class ProjectAnalyzer:
         """Generate a summary report of the analysis"""
         try:
             summary = {
-                "report_date": datetime.datetime.now(pytz.UTC).isoformat(),
+                "report_date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
                 "total_files_analyzed": self.analysis_results["metadata"]["total_files"],
                 "file_type_distribution": dict(self.analysis_results["metadata"]["file_types"]),
                 "code_analysis": {
@@ -230,6 +230,10 @@ class ProjectAnalyzer:
                         for doc in self.analysis_results["documentation"].values()
                     )
                 },
+                "duplicates": {
+                    "duplicate_files": sum(len(aliases) for aliases in self.analysis_results["duplicates"].values()),
+                    "files_with_copies": len(self.analysis_results["duplicates"])
+                },
                 "dependencies": {
                     "total": len(self.analysis_results["dependencies"]),
                     "sample": list(self.analysis_results["dependencies"])[:10]  # First 10 deps
@@ -262,6 +266,7 @@ class ProjectAnalyzer:
                 f.write(f"Total files analyzed: {summary['total_files_analyzed']}\n")
                 f.write(f"Code files: {summary['code_analysis']['total_files']}\n")
                 f.write(f"Documentation files: {summary['documentation']['total_files']}\n")
+                f.write(f"Duplicate copies (counted once): {summary['duplicates']['duplicate_files']}\n")
                 f.write(f"Total dependencies found: {summary['dependencies']['total']}\n\n")
                 
                 f.write("\nFILE TYPE DISTRIBUTION\n")
@@ -1,14 +1,27 @@
 import os
 import logging
-import pytesseract
-from PIL import Image, ImageEnhance
-import PyPDF2
-import docx2txt
 import json
 from datetime import datetime
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from collections import defaultdict
+from functools import partial
+import argparse
 import re
+import sys
+import tempfile
+import textwrap
+
+# Shared scanner helpers (docscan/) live in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from docscan import stats
+from docscan.archive import ZipSource
+from docscan.catalog import ScanCatalog, config_signature
+from docscan.extractors import extract, supports
+from docscan.faculty_model import MIN_SCORE, FacultyBatch
+from docscan.keywords import KeywordMatcher
+from docscan.parallel import ExtractionPool, ImageBatch, PdfSplit, TaskFailure
+from docscan.report import NdjsonReport
+from docscan.textstore import TextStore
 
 # Configure logging
 logging.basicConfig(
@@ -22,183 +35,217 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class DocumentAnalyzer:
-    def __init__(self, base_dir):
+    def __init__(self, base_dir, workers=1, split_pdf_pages=200, ocr_pdf_pages=False, stream_report=False,
+                 spill_text=False, file_timeout=None, memory_mb=None, topics=True,
+                 faculty_model=None):
         self.base_dir = Path(base_dir)
+        self.workers = workers
+        self.split_pdf_pages = split_pdf_pages
+        self.ocr_pdf_pages = ocr_pdf_pages
+        self.stream_report = stream_report
+        self.spill_text = spill_text
+        self.file_timeout = file_timeout
+        self.memory_mb = memory_mb
+        self.topics = topics
         self.results_dir = self.base_dir / "document_analysis"
         self.results_dir.mkdir(exist_ok=True)
+        # Trained faculty classifier (python -m docscan.faculty_model train), used when the file exists
+        self.faculty_model = Path(faculty_model) if faculty_model else self.results_dir / "faculty_model.joblib"
         self.faculty_data = defaultdict(dict)
         self.text_data = []
+        # With stream_report the text_data entries go to an NDJSON file instead
+        self.report = None
+        # With spill_text the texts live in compressed segment files and
+        # text_data entries hold a 'text_ref' instead of the 'text'
+        self.text_store = None
+        # Files whose extraction was aborted (timed out, memory cap, crashed worker)
+        self.failed_files = []
+        self.supported_extensions = {'.pdf', '.docx', '.txt', '.xlsx', '.pptx', '.jpg', '.jpeg', '.png', '.bmp', '.tiff'}
+        # Archives opened by process_member, kept open between members
+        self._zip_sources = {}
+        # TF-IDF term counts kept between runs (see docscan.topics); only new
+        # and changed documents are counted, in batches of pending texts
+        self.topic_model = None
+        
+        # Faculty name stems, matched at the start of words ('recht' finds 'Rechtswissenschaften')
+        self.faculties = {
+            'informatik': 'Informatik',
+            'wirtschaft': 'Wirtschaftswissenschaften',
+            'ingenieur': 'Ingenieurwissenschaften',
+            'design': 'Design',
+            'gesundheit': 'Gesundheitswesen',
+            'sozial': 'Sozialwesen',
+            'recht': 'Rechtswissenschaften',
+            'kultur': 'Kulturwissenschaften'
+        }
+        self.faculty_matcher = KeywordMatcher({faculty: [key + '*'] for key, faculty in self.faculties.items()})
         
     def process_document(self, file_path):
         """Process a single document based on its file type"""
-        try:
-            if file_path.suffix.lower() in ['.png', '.jpg', '.jpeg', '.bmp', '.tiff']:
-                return self._process_image(file_path)
-            elif file_path.suffix.lower() == '.pdf':
-                return self._process_pdf(file_path)
-            elif file_path.suffix.lower() == '.docx':
-                return self._process_docx(file_path)
-            elif file_path.suffix.lower() == '.txt':
-                return self._process_txt(file_path)
-            else:
-                logger.warning(f"Unsupported file type: {file_path}")
-                return ""
-        except Exception as e:
-            logger.error(f"Error processing {file_path}: {str(e)}")
-            return ""
+        logger.info(f"Processing: {file_path}")
+        return self._extract(file_path, file_path.suffix.lower(), file_path)
     
-    def _process_image(self, image_path):
-        """Extract text from image using OCR"""
-        try:
-            # Open image and enhance for better OCR
-            image = Image.open(image_path)
-            
-            # Enhance image for better OCR results
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(2)
-            enhancer = ImageEnhance.Sharpness(image)
-            image = enhancer.enhance(2)
-            
-            # Use pytesseract to extract text
-            text = pytesseract.image_to_string(image)
-            return text.strip()
-        except Exception as e:
-            logger.error(f"Error processing image {image_path}: {str(e)}")
+    def _extract(self, source, suffix, name):
+        """Extract text through the shared extractor registry (None if it could not be read)"""
+        if not supports(suffix):
+            logger.warning(f"Unsupported file type: {name}")
             return ""
-    
-    def _process_pdf(self, pdf_path):
-        """Extract text from PDF file"""
         try:
-            text = ""
-            with open(pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-            return text.strip()
+            # Images keep their colour mode for OCR; repeated images come from the OCR cache
+            return extract(source, suffix, ocr_scanned=self.ocr_pdf_pages, grayscale=False, strip=True)
         except Exception as e:
-            logger.error(f"Error processing PDF {pdf_path}: {str(e)}")
-            return ""
+            logger.error(f"Error processing {name}: {str(e)}")
+            return None
     
-    def _process_docx(self, docx_path):
-        """Extract text from DOCX file"""
-        try:
-            return docx2txt.process(docx_path)
-        except Exception as e:
-            logger.error(f"Error processing DOCX {docx_path}: {str(e)}")
+    def _merge_pdf_pages(self, pdf_path, pages):
+        """Join the page texts of a PDF that was extracted as parallel page ranges"""
+        logger.info(f"Processed in page ranges: {pdf_path}")
+        if pages is None:
             return ""
+        return "\n".join(pages).strip()
     
-    def _process_txt(self, txt_path):
-        """Read text from TXT file"""
+    def process_member(self, zip_path, chain):
+        """Extract the text of one zip member in memory (None if it could not be read)"""
+        zip_path = Path(zip_path)
+        source = self._zip_sources.get(zip_path)
+        if source is None:
+            source = self._zip_sources[zip_path] = ZipSource(zip_path)
+        member_name = f"{zip_path.name}/{'/'.join(chain)}"
+        logger.info(f"Processing: {member_name}")
         try:
-            with open(txt_path, 'r', encoding='utf-8') as file:
-                return file.read().strip()
+            stream = source.open(chain)
         except Exception as e:
-            logger.error(f"Error reading TXT {txt_path}: {str(e)}")
-            return ""
+            logger.error(f"Error processing {member_name}: {str(e)}")
+            return None
+        return self._extract(stream, PurePosixPath(chain[-1]).suffix.lower(), member_name)
     
-    def analyze_text(self, text, file_path):
-        """Analyze the extracted text and categorize by faculty"""
+    def analyze_text(self, text, file_path, version=None, prediction=None):
+        """Analyze the extracted text and categorize by faculty
+        
+        ``version`` identifies this state of the document for the topic model
+        (size and mtime of the file by default); ``prediction`` is the faculty
+        model's ``(faculty, score)`` for the text, if it was classified.
+        """
         if not text:
             return
             
-        # Simple faculty detection (can be enhanced with more sophisticated NLP)
-        faculty = self._detect_faculty(text, file_path)
+        faculty = self._detect_faculty(text, file_path, prediction)
         
         # Store text data
-        self.text_data.append({
+        entry = {
             'file': str(file_path.relative_to(self.base_dir)),
             'faculty': faculty,
             'text': text,
             'word_count': len(text.split())
-        })
+        }
+        if prediction is not None:
+            entry['predicted_faculty'], entry['faculty_score'] = prediction[0], round(prediction[1], 3)
+        if self.report:
+            self.report.write(entry)
+        elif self.spill_text:
+            if self.text_store is None:
+                self.text_store = TextStore(tempfile.mkdtemp(prefix='text_store_', dir=self.results_dir))
+            entry['text_ref'] = self.text_store.put(entry['text'])
+            entry['text'] = None
+            self.text_data.append(entry)
+        else:
+            self.text_data.append(entry)
         
         # Update faculty data
         if faculty not in self.faculty_data:
             self.faculty_data[faculty] = {
                 'documents': [],
-                'word_count': 0,
-                'topics': set()
+                'word_count': 0
             }
         
         self.faculty_data[faculty]['documents'].append(str(file_path.name))
         self.faculty_data[faculty]['word_count'] += len(text.split())
         
-        # Simple topic extraction (can be enhanced with NLP)
-        topics = self._extract_topics(text)
-        self.faculty_data[faculty]['topics'].update(topics)
+        if self.topic_model is not None:
+            self._add_topic_document(entry['file'], faculty, text, file_path, version)
     
-    def _detect_faculty(self, text, file_path):
-        """Detect faculty from text or file path"""
-        # Check file path for faculty indicators
-        path_str = str(file_path).lower()
-        faculties = {
-            'informatik': 'Informatik',
-            'wirtschaft': 'Wirtschaftswissenschaften',
-            'ingenieur': 'Ingenieurwissenschaften',
-            'design': 'Design',
-            'gesundheit': 'Gesundheitswesen',
-            'sozial': 'Sozialwesen',
-            'recht': 'Rechtswissenschaften',
-            'kultur': 'Kulturwissenschaften'
-        }
-        
-        for key, faculty in faculties.items():
-            if key in path_str.lower():
-                return faculty
-        
-        # Check text content if not found in path
-        text_lower = text.lower()
-        for key, faculty in faculties.items():
-            if key in text_lower:
-                return faculty
-        
-        return 'Allgemein'
+    def _detect_faculty(self, text, file_path, prediction=None):
+        """Detect faculty from file path, the faculty model's prediction or the text"""
+        # Faculty indicators in the path win; a confident model beats keywords in the text
+        faculty = self.faculty_matcher.first(str(file_path))
+        if faculty:
+            return faculty
+        if prediction is not None and prediction[1] >= MIN_SCORE:
+            return prediction[0]
+        return self.faculty_matcher.first(text) or 'Allgemein'
     
-    def _extract_topics(self, text):
-        """Extract potential topics from text"""
-        # Simple keyword matching (can be enhanced with NLP)
-        topics = set()
-        text_lower = text.lower()
-        
-        # Common academic topics
-        topic_keywords = {
-            'ki': 'Künstliche Intelligenz',
-            'maschinelles lernen': 'Maschinelles Lernen',
-            'data science': 'Data Science',
-            'big data': 'Big Data',
-            'cloud computing': 'Cloud Computing',
-            'cybersicherheit': 'Cybersicherheit',
-            'blockchain': 'Blockchain',
-            'internet der dinge': 'Internet der Dinge',
-            'wirtschaftsinformatik': 'Wirtschaftsinformatik',
-            'marketing': 'Marketing',
-            'finanzen': 'Finanzen',
-            'maschinenbau': 'Maschinenbau',
-            'elektrotechnik': 'Elektrotechnik',
-            'design thinking': 'Design Thinking',
-            'gesundheitsmanagement': 'Gesundheitsmanagement',
-            'soziale arbeit': 'Soziale Arbeit',
-            'recht': 'Recht',
-            'kulturwissenschaft': 'Kulturwissenschaft',
-            'medien': 'Medien',
-            'kommunikation': 'Kommunikation'
-        }
-        
-        for keyword, topic in topic_keywords.items():
-            if keyword in text_lower:
-                topics.add(topic)
-        
-        return topics
+    def _faculty_batch(self):
+        """Batch that classifies texts without a faculty in their path, then calls analyze_text"""
+        return FacultyBatch(self.faculty_model, self.analyze_text, spill_dir=self.results_dir)
+    
+    def _needs_model(self, file_path):
+        """Whether the faculty model should classify the file (no faculty in its path)"""
+        return self.faculty_matcher.first(str(file_path)) is None
+    
+    def _open_topic_model(self, path):
+        """Load the topic model stored at ``path`` (stays None with topics off or without scikit-learn)"""
+        self.topic_model = None
+        self._topic_faculties = {}
+        self._pending_topics = []
+        self._pending_chars = 0
+        self._topics_counted = 0
+        if not self.topics:
+            return
+        try:
+            from docscan.topics import TopicModel
+        except ImportError as e:
+            logger.warning(f"Topic extraction needs scikit-learn, reporting no topics: {e}")
+            return
+        self.topic_model = TopicModel(path).load()
+    
+    def _add_topic_document(self, key, faculty, text, file_path, version):
+        """Queue a new or changed document for the topic model"""
+        from docscan.topics import UPDATE_BATCH_CHARS
+        self._topic_faculties[key] = faculty
+        if version is None:
+            file_stat = file_path.stat()
+            version = f"{file_stat.st_size}:{file_stat.st_mtime_ns}"
+        if self.topic_model.current(key, version):
+            return
+        self._pending_topics.append((key, version, text))
+        self._pending_chars += len(text)
+        if self._pending_chars >= UPDATE_BATCH_CHARS:
+            self._count_pending_topics()
+    
+    def _count_pending_topics(self, prune=False):
+        """Count the queued documents; with ``prune`` drop those not seen in this run"""
+        self._topics_counted += self.topic_model.update(self._pending_topics,
+                                                        keep=set(self._topic_faculties) if prune else None)
+        self._pending_topics = []
+        self._pending_chars = 0
+    
+    def _topic_report(self, top_terms=10):
+        """Top TF-IDF terms per faculty and per document (empty without a topic model)"""
+        if self.topic_model is None:
+            return {}, {}
+        self._count_pending_topics(prune=True)
+        self.topic_model.save()
+        logger.info(f"Topic model: {self._topics_counted} documents counted, "
+                    f"{len(self.topic_model) - self._topics_counted} unchanged")
+        faculty_terms = self.topic_model.group_top_terms(self._topic_faculties, top_terms)
+        document_terms = self.topic_model.top_terms(top_terms)
+        return ({faculty: [term for term, _ in terms] for faculty, terms in faculty_terms.items()},
+                {key: [term for term, _ in terms] for key, terms in document_terms.items()})
     
     def generate_report(self):
         """Generate comprehensive analysis report"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        faculty_topics, document_topics = self._topic_report()
         report = {
             'metadata': {
                 'report_date': datetime.now().isoformat(),
                 'total_documents': sum(len(data['documents']) for data in self.faculty_data.values()),
                 'total_faculties': len(self.faculty_data),
-                'total_word_count': sum(data['word_count'] for data in self.faculty_data.values())
+                'total_word_count': sum(data['word_count'] for data in self.faculty_data.values()),
+                'ocr_images_skipped': stats.counters['ocr_prefilter_skipped'],
+                'ocr_images_processed': stats.counters['ocr_runs'],
+                'ocr_pdf_pages': stats.counters['pdf_pages_ocred'],
+                'failed_files': self.failed_files
             },
             'faculties': {}
         }
@@ -209,13 +256,20 @@ class DocumentAnalyzer:
                 'document_count': len(data['documents']),
                 'word_count': data['word_count'],
                 'documents': data['documents'],
-                'topics': list(data['topics'])
+                'topics': faculty_topics.get(faculty, [])
             }
+        report['document_topics'] = document_topics
         
-        # Save full text data
-        text_report_path = self.results_dir / f'full_text_data_{timestamp}.json'
-        with open(text_report_path, 'w', encoding='utf-8') as f:
-            json.dump(self.text_data, f, ensure_ascii=False, indent=2)
+        # Save full text data (already on disk when streaming)
+        if self.report:
+            self.report.finish({'metadata': report['metadata']})
+            self.report = None
+        elif self.text_store:
+            self._write_full_text_data(self.results_dir / f'full_text_data_{timestamp}.json')
+        else:
+            text_report_path = self.results_dir / f'full_text_data_{timestamp}.json'
+            with open(text_report_path, 'w', encoding='utf-8') as f:
+                json.dump(self.text_data, f, ensure_ascii=False, indent=2)
         
         # Save analysis report
         report_path = self.results_dir / f'analysis_report_{timestamp}.json'
@@ -228,6 +282,23 @@ class DocumentAnalyzer:
         logger.info(f"Analysis complete. Reports saved to {self.results_dir}")
         return report
     
+    def _write_full_text_data(self, path):
+        """Write full_text_data from the text store, loading one text at a time
+        
+        The output is identical to ``json.dump(text_data, indent=2)`` with the texts in place.
+        """
+        logger.info(f"Writing full texts from the text store ({self.text_store.size_on_disk() / (1024 * 1024):.1f} MB compressed)")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for i, entry in enumerate(self.text_data):
+                entry = dict(entry, text=self.text_store.get(entry['text_ref']))
+                del entry['text_ref']
+                f.write(',\n' if i else '\n')
+                f.write(textwrap.indent(json.dumps(entry, ensure_ascii=False, indent=2), '  '))
+            f.write('\n]' if self.text_data else ']')
+        self.text_store.remove()
+        self.text_store = None
+    
     def _generate_human_readable_report(self, report, timestamp):
         """Generate a human-readable text report"""
         report_path = self.results_dir / f'analysis_report_{timestamp}.txt'
@@ -243,7 +314,16 @@ class DocumentAnalyzer:
             f.write("-" * 80 + "\n")
             f.write(f"Total documents analyzed: {report['metadata']['total_documents']}\n")
             f.write(f"Total faculties identified: {report['metadata']['total_faculties']}\n")
-            f.write(f"Total word count: {report['metadata']['total_word_count']:,}\n\n")
+            f.write(f"Total word count: {report['metadata']['total_word_count']:,}\n")
+            f.write(f"Images OCR'd: {report['metadata']['ocr_images_processed']:,} "
+                    f"(skipped without text: {report['metadata']['ocr_images_skipped']:,})\n\n")
+            
+            if report['metadata']['failed_files']:
+                f.write("FAILED FILES\n")
+                f.write("-" * 80 + "\n")
+                for failed in report['metadata']['failed_files']:
+                    f.write(f"- {failed['file']}: {failed['reason']}\n")
+                f.write("\n")
             
             # Faculty details
             f.write("FACULTY ANALYSIS\n")
@@ -267,6 +347,13 @@ class DocumentAnalyzer:
             f.write("\nEND OF REPORT\n")
             f.write("=" * 80 + "\n")
     
+    def _start_report(self):
+        """Open the NDJSON full text stream when streaming is enabled"""
+        self.failed_files = []
+        if self.stream_report:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.report = NdjsonReport(self.results_dir, f'full_text_data_{timestamp}').open()
+    
     def process_directory(self, directory=None):
         """Process all documents in the specified directory"""
         if directory is None:
@@ -275,27 +362,138 @@ class DocumentAnalyzer:
             directory = Path(directory)
         
         logger.info(f"Starting document analysis in: {directory}")
+        stats.reset()
+        self._start_report()
+        self._open_topic_model(self.results_dir / "topics.npz")
         
-        # Supported file extensions
-        extensions = {'.pdf', '.docx', '.txt', '.jpg', '.jpeg', '.png', '.bmp', '.tiff'}
-        
-        # Walk through directory and process files
+        # Walk through directory and collect files
+        files_to_process = []
         for root, _, files in os.walk(directory):
             for file in files:
                 file_path = Path(root) / file
-                if file_path.suffix.lower() in extensions:
-                    logger.info(f"Processing: {file_path}")
-                    text = self.process_document(file_path)
-                    if text:
-                        self.analyze_text(text, file_path)
+                if file_path.suffix.lower() in self.supported_extensions:
+                    files_to_process.append(file_path)
+        
+        # Extract (in parallel with --workers) and analyze in walk order
+        pool = ExtractionPool(partial(type(self), self.base_dir, ocr_pdf_pages=self.ocr_pdf_pages), 'process_document',
+                              workers=self.workers, local=self,
+                              pdf_split=PdfSplit(self._merge_pdf_pages, min_pages=self.split_pdf_pages,
+                                                 ocr_scanned=self.ocr_pdf_pages),
+                              timeout=self.file_timeout, memory_mb=self.memory_mb,
+                              image_batch=ImageBatch(grayscale=False))
+        texts = pool.map((file_path,) for file_path in files_to_process)
+        batch = self._faculty_batch()
+        for file_path, text in zip(files_to_process, texts):
+            if isinstance(text, TaskFailure):
+                self.failed_files.append({'file': str(file_path.relative_to(self.base_dir)), 'reason': text.reason})
+            elif text:
+                batch.add(text, file_path, None, classify=self._needs_model(file_path))
+        batch.flush()
+        
+        # Generate and save reports
+        return self.generate_report()
+    
+    def process_archive(self, zip_path):
+        """Process all documents in a zip archive (and zips nested in it) without extracting it
+        
+        Members are read into memory and handed to the extractors. Their texts
+        are cached by member CRC, so a re-run on the same archive only extracts
+        the members that changed. Documents are reported as
+        ``<archive name>/<member path>``.
+        """
+        zip_path = Path(zip_path)
+        logger.info(f"Starting document analysis in archive: {zip_path}")
+        stats.reset()
+        self._start_report()
+        self._open_topic_model(self.results_dir / f"{zip_path.name}.topics.npz")
+        
+        with ZipSource(zip_path, self.supported_extensions) as source:
+            members = list(source.members())
+        
+        catalog = ScanCatalog(self.results_dir / f"{zip_path.name}.catalog.sqlite",
+                              signature=config_signature('document_analysis', self.ocr_pdf_pages))
+        with catalog:
+            cached = [catalog.lookup_content(f"{zip_path.name}/{member.name}", member.size, member.content_hash)
+                      for member in members]
+            
+            # Extract the new and changed members (in parallel with --workers) and analyze in archive order
+            pool = ExtractionPool(partial(type(self), self.base_dir, ocr_pdf_pages=self.ocr_pdf_pages),
+                                  'process_member', workers=self.workers, local=self,
+                                  timeout=self.file_timeout, memory_mb=self.memory_mb)
+            texts = pool.map((zip_path, member.chain) for member, record in zip(members, cached) if record is None)
+            batch = self._faculty_batch()
+            for member, record in zip(members, cached):
+                rel_path = f"{zip_path.name}/{member.name}"
+                if record is None:
+                    text = next(texts)
+                    if isinstance(text, TaskFailure):
+                        self.failed_files.append({'file': rel_path, 'reason': text.reason})
+                        continue
+                    if text is None:
+                        continue
+                    catalog.store_content(rel_path, member.size, member.content_hash, {'text': text})
+                else:
+                    text = record['text']
+                if text:
+                    file_path = self.base_dir / rel_path
+                    batch.add(text, file_path, f"{member.size}:{member.content_hash}",
+                              classify=self._needs_model(file_path))
+            batch.flush()
+            
+            removed = catalog.prune()
+            catalog_stats = catalog.stats()
+            logger.info(f"Archive catalog: {catalog_stats['hits']} unchanged, {catalog_stats['misses']} extracted, "
+                        f"{removed} stale entries removed")
+        
+        for source in self._zip_sources.values():
+            source.close()
+        self._zip_sources.clear()
         
         # Generate and save reports
         return self.generate_report()
 
 
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Analyze University documents by faculty.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Parallel extraction processes (0 = one per CPU core)")
+    parser.add_argument('--split-pdf-pages', type=int, default=200,
+                        help="Split PDFs with at least this many pages across workers (0 = never)")
+    parser.add_argument('--ocr-pdf-pages', action='store_true',
+                        help="OCR PDF pages without a text layer (scanned documents)")
+    parser.add_argument('--ocr-text-threshold', type=float,
+                        help="Minimum edge density for an image to be OCR'd (0 = OCR every image)")
+    parser.add_argument('--stream-report', action='store_true',
+                        help="Write the full texts to an NDJSON file while scanning (flat memory, survives crashes)")
+    parser.add_argument('--spill-text', action='store_true',
+                        help="Keep extracted texts in compressed files on disk instead of in memory")
+    parser.add_argument('--file-timeout', type=float, default=600,
+                        help="Seconds one file may take to extract before it is abandoned (0 = no limit)")
+    parser.add_argument('--max-memory-mb', type=int, default=0,
+                        help="Memory cap of each extraction process in MB (0 = no cap)")
+    parser.add_argument('--no-topics', action='store_true',
+                        help="Skip the TF-IDF topic terms per faculty and document (they need scikit-learn)")
+    parser.add_argument('--faculty-model', type=Path,
+                        help="Trained faculty classifier (default: University/document_analysis/faculty_model.joblib if present)")
+    return parser.parse_args(argv)
+
 def main():
+    args = parse_args()
+    if args.ocr_text_threshold is not None:
+        from docscan.ocr import set_text_threshold
+        set_text_threshold(args.ocr_text_threshold)
+    
     # Initialize analyzer with the University directory
-    analyzer = DocumentAnalyzer(Path(__file__).parent)
+    analyzer = DocumentAnalyzer(Path(__file__).parent, workers=args.workers,
+                                split_pdf_pages=args.split_pdf_pages,
+                                ocr_pdf_pages=args.ocr_pdf_pages,
+                                stream_report=args.stream_report,
+                                spill_text=args.spill_text,
+                                file_timeout=args.file_timeout or None,
+                                memory_mb=args.max_memory_mb or None,
+                                topics=not args.no_topics,
+                                faculty_model=args.faculty_model)
     
     # Process all documents and generate reports
     report = analyzer.process_directory()
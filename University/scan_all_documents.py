@@ -1,14 +1,24 @@
 import os
 import logging
-import pytesseract
-from PIL import Image, ImageEnhance
-import PyPDF2
-import docx2txt
 import json
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
+from functools import partial
+import argparse
 import re
+import sys
+
+# Shared scanner helpers (docscan/) live in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from docscan import stats
+from docscan.checkpoint import DEFAULT_INTERVAL, Checkpoint
+from docscan.extractors import extract
+from docscan.faculty_model import MIN_SCORE, FacultyBatch
+from docscan.keywords import KeywordMatcher
+from docscan.neardup import DEFAULT_THRESHOLD, MINHASH_SETTINGS, MinHash, find_clusters
+from docscan.parallel import ExtractionPool, ImageBatch, PdfSplit, TaskFailure
+from docscan.search import SearchIndex
 
 # Configure logging
 logging.basicConfig(
@@ -22,28 +32,73 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class DocumentScanner:
-    def __init__(self, base_dir):
+    def __init__(self, base_dir, workers=1, split_pdf_pages=200, ocr_pdf_pages=False,
+                 checkpoint_interval=DEFAULT_INTERVAL, file_timeout=None, memory_mb=None,
+                 search_index=True, near_duplicates='flag', near_duplicate_threshold=DEFAULT_THRESHOLD,
+                 faculty_model=None):
         self.base_dir = Path(base_dir)
+        self.workers = workers
+        self.split_pdf_pages = split_pdf_pages
+        self.ocr_pdf_pages = ocr_pdf_pages
+        self.file_timeout = file_timeout
+        self.memory_mb = memory_mb
+        # 'flag' lists near-identical documents, 'collapse' also counts only one per cluster
+        self.near_duplicates = near_duplicates
+        self.near_duplicate_threshold = near_duplicate_threshold
         self.results_dir = self.base_dir / "document_analysis"
         self.results_dir.mkdir(exist_ok=True)
+        # Trained faculty classifier (python -m docscan.faculty_model train), used when the file exists
+        self.faculty_model = Path(faculty_model) if faculty_model else self.results_dir / "faculty_model.joblib"
         self.faculty_data = defaultdict(dict)
         self.text_data = []
+        # MinHash signatures of the documents by file (see docscan.neardup); kept
+        # out of the document info so they stay out of the reports
+        self.signatures = {}
+        self.failed_files = []  # extraction aborted: timed out, memory cap, crashed worker
+        self.checkpoint = Checkpoint(self.results_dir / "checkpoint",
+                                     signature=[str(self.base_dir), ocr_pdf_pages, MINHASH_SETTINGS],
+                                     interval=checkpoint_interval)
+        # Full-text index of the extracted texts (search with python -m docscan.search)
+        self.search_index = SearchIndex(self.results_dir / "search_index.sqlite") if search_index else None
+        self._indexed = {}
         self.supported_extensions = {
             # Document formats
             '.pdf', '.docx', '.doc', '.txt', '.rtf', '.odt',
             # Image formats
             '.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif',
-            # Spreadsheet formats
-            '.xlsx', '.xls', '.ods',
+            # Spreadsheet formats (streamed in read-only mode)
+            '.xlsx', '.xlsm',
             # Presentation formats
-            '.pptx', '.ppt', '.odp'
+            '.pptx'
+        }
+        
+        # Faculty keywords mapping (whole words; '*' marks German stems)
+        self.faculty_keywords = {
+            'informatik': ['informatik', 'computer science', 'cs', 'it', 'software', 'programmierung', 'algorithm'],
+            'wirtschaft': ['wirtschaft', 'business', 'bwl', 'vwl', 'betriebswirt*', 'volkswirt*', 'management', 'marketing'],
+            'ingenieur': ['ingenieur', 'engineering', 'maschinenbau', 'elektrotechnik', 'mechanical', 'electrical'],
+            'design': ['design', 'gestaltung', 'grafik', 'typografie', 'illustration', 'fotografie'],
+            'gesundheit': ['gesundheit', 'medizin', 'gesundheitswesen', 'pflege', 'medizintechnik', 'pharmazie'],
+            'sozial': ['sozial', 'sozialarbeit', 'pädagogik', 'erziehung', 'bildung', 'lehramt', 'bildungswissenschaft'],
+            'recht': ['recht', 'jura', 'gesetz', 'jurist', 'verwaltung', 'steuer', 'wirtschaftsrecht'],
+            'sprache': ['sprache', 'linguistik', 'übersetzung', 'dolmetschen', 'germanistik', 'anglistik']
         }
+        self.faculty_matcher = KeywordMatcher(self.faculty_keywords)
     
-    def scan_documents(self):
-        """Scan all documents in the base directory and subdirectories"""
+    def scan_documents(self, resume=False):
+        """Scan all documents in the base directory and subdirectories
+        
+        Progress is checkpointed periodically; with ``resume`` the scan continues
+        after the files processed by the last checkpointed run.
+        """
         logger.info(f"Starting document scan in: {self.base_dir}")
+        stats.reset()
+        processed = self._start_checkpoint(resume)
+        if self.search_index:
+            self._indexed = self.search_index.indexed()
         
-        # Walk through all directories and files
+        # Collect supported files first so extraction can be fanned out
+        files_to_scan = []
         for root, _, files in os.walk(self.base_dir):
             # Skip certain directories
             if any(skip_dir in root for skip_dir in ['venv', '__pycache__', '.git', 'node_modules']):
@@ -56,132 +111,111 @@ class DocumentScanner:
                 if str(file_path).startswith(str(self.results_dir)):
                     continue
                     
-                # Process supported file types
+                # Process supported file types (except those done before the checkpoint)
                 if file_path.suffix.lower() in self.supported_extensions:
-                    try:
-                        logger.info(f"Processing: {file_path}")
-                        text = self._extract_text(file_path)
-                        if text:
-                            self._analyze_document(text, file_path)
-                    except Exception as e:
-                        logger.error(f"Error processing {file_path}: {str(e)}")
+                    if str(file_path.relative_to(self.base_dir)) not in processed:
+                        files_to_scan.append(file_path)
+        
+        # Extract (in parallel with --workers) and analyze in walk order
+        pool = ExtractionPool(partial(type(self), self.base_dir, ocr_pdf_pages=self.ocr_pdf_pages), '_extract_text',
+                              workers=self.workers, local=self,
+                              pdf_split=PdfSplit(self._merge_pdf_pages, min_pages=self.split_pdf_pages,
+                                                 ocr_scanned=self.ocr_pdf_pages),
+                              timeout=self.file_timeout, memory_mb=self.memory_mb,
+                              image_batch=ImageBatch())
+        texts = pool.map((file_path,) for file_path in files_to_scan)
+        # Texts without a faculty in their path are classified in batches by the faculty model
+        batch = FacultyBatch(self.faculty_model, self._add_document, spill_dir=self.results_dir)
+        for file_path, text in zip(files_to_scan, texts):
+            if isinstance(text, TaskFailure):
+                self.failed_files.append({'file': str(file_path.relative_to(self.base_dir)),
+                                          'reason': text.reason})
+            elif text:
+                batch.add(text, file_path, classify=self.faculty_matcher.first(str(file_path)) is None)
+            processed.add(str(file_path.relative_to(self.base_dir)))
+            if self.checkpoint.due():
+                # Queued documents count as processed, so they go into the checkpoint first
+                batch.flush()
+                self._save_checkpoint(processed)
+        batch.flush()
+        
+        if self.search_index:
+            removed = self.search_index.prune(processed)
+            logger.info(f"Search index: {self.search_index.stats()['documents']} documents, {removed} removed")
+            self.search_index.close()
         
-        # Generate reports
-        return self._generate_reports()
+        # Generate reports, then drop the checkpoint of the finished scan
+        report = self._generate_reports()
+        self.checkpoint.clear()
+        return report
+    
+    def _start_checkpoint(self, resume):
+        """Open the checkpoint and restore a resumed scan; returns the processed files"""
+        state = self.checkpoint.start(resume)
+        if state is None:
+            return set()
+        
+        self.text_data = []
+        self.signatures = {}
+        for doc_info in self.checkpoint.documents():
+            signature = doc_info.pop('minhash', None)
+            if signature:
+                self.signatures[doc_info['file']] = signature
+            self.text_data.append(doc_info)
+        self.faculty_data = defaultdict(dict)
+        for faculty, data in state['faculty_data'].items():
+            self.faculty_data[faculty] = dict(data, file_types=defaultdict(int, data['file_types']))
+        self.failed_files = state['failed_files']
+        stats.merge(state['stats'])
+        return set(state['processed'])
+    
+    def _save_checkpoint(self, processed):
+        self.checkpoint.save({
+            'processed': sorted(processed),
+            'faculty_data': self.faculty_data,
+            'failed_files': self.failed_files,
+            'stats': stats.snapshot()
+        })
+        logger.info(f"Checkpoint saved ({len(processed)} files processed)")
     
     def _extract_text(self, file_path):
         """Extract text from different file types"""
+        logger.info(f"Processing: {file_path}")
         try:
-            ext = file_path.suffix.lower()
-            
-            # Handle PDF files
-            if ext == '.pdf':
-                return self._extract_from_pdf(file_path)
-                
-            # Handle Word documents
-            elif ext in ['.docx', '.doc', '.odt', '.rtf']:
-                return self._extract_from_docx(file_path)
-                
-            # Handle text files
-            elif ext == '.txt':
-                return self._extract_from_txt(file_path)
-                
-            # Handle images
-            elif ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif']:
-                return self._extract_from_image(file_path)
-                
-            # Handle spreadsheets
-            elif ext in ['.xlsx', '.xls', '.ods']:
-                return self._extract_from_spreadsheet(file_path)
-                
-            # Handle presentations
-            elif ext in ['.pptx', '.ppt', '.odp']:
-                return self._extract_from_presentation(file_path)
-                
+            # Documents, spreadsheets, presentations, text files and images (OCR)
+            # all go through the shared extractor registry
+            return extract(file_path, file_path.suffix.lower(), ocr_scanned=self.ocr_pdf_pages, strip=True)
         except Exception as e:
             logger.error(f"Error extracting text from {file_path}: {str(e)}")
             return ""
     
-    def _extract_from_pdf(self, file_path):
-        """Extract text from PDF files"""
-        try:
-            text = ""
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-            return text.strip()
-        except Exception as e:
-            logger.error(f"Error processing PDF {file_path}: {str(e)}")
+    def _merge_pdf_pages(self, file_path, pages):
+        """Join the page texts of a PDF that was extracted as parallel page ranges"""
+        logger.info(f"Processed in page ranges: {file_path}")
+        if pages is None:
             return ""
+        return "\n".join(pages).strip()
     
-    def _extract_from_docx(self, file_path):
-        """Extract text from Word documents"""
+    def _add_document(self, text, file_path, prediction):
+        """Analyze, checkpoint and index one extracted document"""
         try:
-            return docx2txt.process(file_path)
+            doc_info = self._analyze_document(text, file_path, prediction)
+            # The checkpoint stream also carries the signature, so a resumed scan still finds near-duplicates
+            self.checkpoint.add_document(dict(doc_info, minhash=self.signatures.get(doc_info['file'])))
+            self._index_document(text, file_path, doc_info['faculty'])
         except Exception as e:
-            logger.error(f"Error processing DOCX {file_path}: {str(e)}")
-            return ""
+            logger.error(f"Error processing {file_path}: {str(e)}")
     
-    def _extract_from_txt(self, file_path):
-        """Extract text from plain text files"""
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                return file.read().strip()
-        except Exception as e:
-            logger.error(f"Error reading TXT {file_path}: {str(e)}")
-            return ""
-    
-    def _extract_from_image(self, file_path):
-        """Extract text from images using OCR"""
-        try:
-            # Open image and enhance for better OCR
-            image = Image.open(file_path)
-            
-            # Convert to grayscale if not already
-            if image.mode != 'L':
-                image = image.convert('L')
-            
-            # Enhance image for better OCR results
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(2)
-            enhancer = ImageEnhance.Sharpness(image)
-            image = enhancer.enhance(2)
-            
-            # Use pytesseract to extract text
-            text = pytesseract.image_to_string(image)
-            return text.strip()
-        except Exception as e:
-            logger.error(f"Error processing image {file_path}: {str(e)}")
-            return ""
-    
-    def _extract_from_spreadsheet(self, file_path):
-        """Extract text from spreadsheet files (simplified)"""
-        try:
-            # For now, just return basic info about the spreadsheet
-            # In a production environment, you would use openpyxl or similar to extract data
-            return f"[Spreadsheet] {file_path.name} - Content extraction not fully implemented"
-        except Exception as e:
-            logger.error(f"Error processing spreadsheet {file_path}: {str(e)}")
-            return ""
-    
-    def _extract_from_presentation(self, file_path):
-        """Extract text from presentation files (simplified)"""
-        try:
-            # For now, just return basic info about the presentation
-            # In a production environment, you would use python-pptx or similar to extract data
-            return f"[Presentation] {file_path.name} - Content extraction not fully implemented"
-        except Exception as e:
-            logger.error(f"Error processing presentation {file_path}: {str(e)}")
-            return ""
-    
-    def _analyze_document(self, text, file_path):
-        """Analyze the extracted text and categorize by faculty"""
+    def _analyze_document(self, text, file_path, prediction=None):
+        """Analyze the extracted text and categorize by faculty (returns the document info)
+        
+        ``prediction`` is the faculty model's ``(faculty, score)`` for the text, if it was classified.
+        """
         if not text:
-            return
+            return None
             
-        # Detect faculty from path or content
-        faculty = self._detect_faculty(text, file_path)
+        # Detect faculty from path, the faculty model or content
+        faculty = self._detect_faculty(text, file_path, prediction)
         
         # Store document information
         doc_info = {
@@ -192,6 +226,12 @@ class DocumentScanner:
             'word_count': len(text.split()),
             'char_count': len(text)
         }
+        if self.near_duplicates:
+            signature = MinHash().update(text).digest()
+            if signature:
+                self.signatures[doc_info['file']] = signature
+        if prediction is not None:
+            doc_info['predicted_faculty'], doc_info['faculty_score'] = prediction[0], round(prediction[1], 3)
         
         self.text_data.append(doc_info)
         
@@ -208,48 +248,81 @@ class DocumentScanner:
         self.faculty_data[faculty]['total_size_kb'] += doc_info['size_kb']
         self.faculty_data[faculty]['total_word_count'] += doc_info['word_count']
         self.faculty_data[faculty]['file_types'][file_path.suffix.lower()] += 1
+        return doc_info
     
-    def _detect_faculty(self, text, file_path):
-        """Detect faculty from file path or content"""
-        path_str = str(file_path).lower()
-        text_lower = text.lower()
-        
-        # Faculty keywords mapping
-        faculty_keywords = {
-            'informatik': ['informatik', 'computer science', 'cs', 'it', 'software', 'programmierung', 'algorithm'],
-            'wirtschaft': ['wirtschaft', 'business', 'bwl', 'vwl', 'betriebswirt', 'volkswirt', 'management', 'marketing'],
-            'ingenieur': ['ingenieur', 'engineering', 'maschinenbau', 'elektrotechnik', 'mechanical', 'electrical'],
-            'design': ['design', 'gestaltung', 'grafik', 'typografie', 'illustration', 'fotografie'],
-            'gesundheit': ['gesundheit', 'medizin', 'gesundheitswesen', 'pflege', 'medizintechnik', 'pharmazie'],
-            'sozial': ['sozial', 'sozialarbeit', 'pädagogik', 'erziehung', 'bildung', 'lehramt', 'bildungswissenschaft'],
-            'recht': ['recht', 'jura', 'gesetz', 'jurist', 'verwaltung', 'steuer', 'wirtschaftsrecht'],
-            'sprache': ['sprache', 'linguistik', 'übersetzung', 'dolmetschen', 'germanistik', 'anglistik']
-        }
+    def _index_document(self, text, file_path, faculty):
+        """Put a document's text into the search index unless this version is already there"""
+        if self.search_index is None:
+            return
+        rel_path = str(file_path.relative_to(self.base_dir))
+        file_stat = file_path.stat()
+        if self._indexed.get(rel_path) == (file_stat.st_size, file_stat.st_mtime_ns):
+            return
+        with self.search_index.writer(rel_path, file_path.suffix.lower(),
+                                      file_stat.st_size, file_stat.st_mtime_ns) as writer:
+            writer.write(text)
+            writer.commit(faculty)
+    
+    def _detect_faculty(self, text, file_path, prediction=None):
+        """Detect faculty from file path, the faculty model's prediction or content"""
+        # Check file path for faculty indicators (directory and file names)
+        faculty = self.faculty_matcher.first(str(file_path))
+        if faculty:
+            return faculty
         
-        # Check file path for faculty indicators
-        for faculty, keywords in faculty_keywords.items():
-            if any(keyword in path_str for keyword in keywords):
-                return faculty
+        # A confident model prediction beats the first keyword in the text
+        if prediction is not None and prediction[1] >= MIN_SCORE:
+            return prediction[0]
         
         # Check text content if not found in path
-        for faculty, keywords in faculty_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                return faculty
-        
-        # Try to detect from directory structure
-        path_parts = path_str.replace('\\', '/').split('/')
-        for part in path_parts:
-            part_lower = part.lower()
-            for faculty, keywords in faculty_keywords.items():
-                if any(keyword in part_lower for keyword in keywords):
-                    return faculty
-        
-        return 'Allgemein'
+        return self.faculty_matcher.first(text) or 'Allgemein'
+    
+    def _find_near_duplicates(self):
+        """Clusters of near-identical documents; of each cluster the first file (sorted) is kept"""
+        if not self.near_duplicates:
+            return []
+        signatures = sorted(self.signatures.items(), key=lambda item: item[0].lower())
+        clusters = find_clusters(signatures, self.near_duplicate_threshold)
+        logger.info(f"Near-duplicates: {sum(len(members) - 1 for members in clusters)} documents "
+                    f"in {len(clusters)} clusters")
+        return [{'kept': members[0], 'duplicates': members[1:]}
+                for members in sorted(clusters, key=lambda members: members[0].lower())]
+    
+    def _collapse_near_duplicates(self, clusters):
+        """Drop all but the kept document of every cluster from the documents and faculty totals"""
+        duplicates = {path for cluster in clusters for path in cluster['duplicates']}
+        if not duplicates:
+            return
+        for doc_info in self.text_data:
+            if doc_info['file'] not in duplicates:
+                continue
+            data = self.faculty_data[doc_info['faculty']]
+            data['documents'].remove(doc_info['file'])
+            data['total_size_kb'] -= doc_info['size_kb']
+            data['total_word_count'] -= doc_info['word_count']
+            ext = Path(doc_info['file']).suffix.lower()
+            data['file_types'][ext] -= 1
+            if not data['file_types'][ext]:
+                del data['file_types'][ext]
+            if not data['documents']:
+                del self.faculty_data[doc_info['faculty']]
+        self.text_data = [doc_info for doc_info in self.text_data if doc_info['file'] not in duplicates]
     
     def _generate_reports(self):
         """Generate analysis reports"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
+        # Near-identical documents (regenerated reports, edited copies) are listed,
+        # or with 'collapse' counted once
+        near_duplicates = self._find_near_duplicates()
+        if self.near_duplicates == 'collapse':
+            self._collapse_near_duplicates(near_duplicates)
+        else:
+            duplicate_of = {path: cluster['kept'] for cluster in near_duplicates for path in cluster['duplicates']}
+            for doc_info in self.text_data:
+                if doc_info['file'] in duplicate_of:
+                    doc_info['near_duplicate_of'] = duplicate_of[doc_info['file']]
+        
         # Prepare report data
         report = {
             'metadata': {
@@ -258,7 +331,17 @@ class DocumentScanner:
                 'total_documents': len(self.text_data),
                 'total_faculties': len(self.faculty_data),
                 'total_word_count': sum(doc['word_count'] for doc in self.text_data),
-                'total_size_mb': round(sum(doc['size_kb'] for doc in self.text_data) / 1024, 2)
+                'total_size_mb': round(sum(doc['size_kb'] for doc in self.text_data) / 1024, 2),
+                'ocr_images_skipped': stats.counters['ocr_prefilter_skipped'],
+                'ocr_images_processed': stats.counters['ocr_runs'],
+                'ocr_pdf_pages': stats.counters['pdf_pages_ocred'],
+                'failed_files': self.failed_files,
+                'near_duplicates': {
+                    'mode': self.near_duplicates,
+                    'threshold': self.near_duplicate_threshold,
+                    'duplicate_documents': sum(len(cluster['duplicates']) for cluster in near_duplicates),
+                    'clusters': near_duplicates
+                } if self.near_duplicates else None
             },
             'faculties': {}
         }
@@ -305,7 +388,32 @@ class DocumentScanner:
             f.write(f"Total Documents: {report['metadata']['total_documents']:,}\n")
             f.write(f"Total Word Count: {report['metadata']['total_word_count']:,}\n")
             f.write(f"Total Size: {report['metadata']['total_size_mb']:.2f} MB\n")
-            f.write(f"Faculties Identified: {len(report['faculties'])}\n\n")
+            f.write(f"Faculties Identified: {len(report['faculties'])}\n")
+            f.write(f"Images OCR'd: {report['metadata']['ocr_images_processed']:,} "
+                    f"(skipped without text: {report['metadata']['ocr_images_skipped']:,})\n\n")
+            
+            # Files that could not be extracted in time or within the memory cap
+            if report['metadata']['failed_files']:
+                f.write("FAILED FILES\n")
+                f.write("-" * 80 + "\n")
+                for failed in report['metadata']['failed_files']:
+                    f.write(f"- {failed['file']}: {failed['reason']}\n")
+                f.write("\n")
+            
+            # Near-identical documents; the first file of each cluster is the one kept
+            near_duplicates = report['metadata']['near_duplicates']
+            if near_duplicates and near_duplicates['clusters']:
+                f.write("NEAR-DUPLICATE CLUSTERS\n")
+                f.write("-" * 80 + "\n")
+                f.write(f"{near_duplicates['duplicate_documents']:,} documents in "
+                        f"{len(near_duplicates['clusters']):,} clusters are near-duplicates "
+                        f"(similarity >= {near_duplicates['threshold']:.0%})"
+                        + (", counted once\n\n" if near_duplicates['mode'] == 'collapse' else "\n\n"))
+                for cluster in near_duplicates['clusters']:
+                    f.write(f"{cluster['kept']}\n")
+                    for duplicate in cluster['duplicates']:
+                        f.write(f"  ~ {duplicate}\n")
+                f.write("\n")
             
             # Faculty Summary
             f.write("FACULTY SUMMARY\n")
@@ -329,20 +437,65 @@ class DocumentScanner:
                 for doc in sorted(data['documents']):
                     doc_info = next((d for d in self.text_data if d['file'] == doc), None)
                     if doc_info:
-                        f.write(f"- {doc} ({doc_info['word_count']:,} words, {doc_info['size_kb']:.1f} KB, modified: {doc_info['modified'][:10]})\n")
+                        f.write(f"- {doc} ({doc_info['word_count']:,} words, {doc_info['size_kb']:.1f} KB, modified: {doc_info['modified'][:10]})"
+                                + (f" ~ {doc_info['near_duplicate_of']}" if doc_info.get('near_duplicate_of') else "") + "\n")
                 f.write("\n")
             
             f.write("\n" + "=" * 80 + "\n")
             f.write("END OF REPORT\n")
             f.write("=" * 80 + "\n")
 
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Scan and analyze all University documents.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Parallel extraction processes (0 = one per CPU core)")
+    parser.add_argument('--split-pdf-pages', type=int, default=200,
+                        help="Split PDFs with at least this many pages across workers (0 = never)")
+    parser.add_argument('--ocr-pdf-pages', action='store_true',
+                        help="OCR PDF pages without a text layer (scanned documents)")
+    parser.add_argument('--ocr-text-threshold', type=float,
+                        help="Minimum edge density for an image to be OCR'd (0 = OCR every image)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue an interrupted scan from its last checkpoint")
+    parser.add_argument('--checkpoint-interval', type=float, default=DEFAULT_INTERVAL,
+                        help="Seconds between checkpoints of scan progress")
+    parser.add_argument('--file-timeout', type=float, default=600,
+                        help="Seconds one file may take to extract before it is abandoned (0 = no limit)")
+    parser.add_argument('--max-memory-mb', type=int, default=0,
+                        help="Memory cap of each extraction process in MB (0 = no cap)")
+    parser.add_argument('--no-index', action='store_true',
+                        help="Do not update the full-text search index (search it with python -m docscan.search)")
+    parser.add_argument('--near-duplicates', choices=['flag', 'collapse', 'off'], default='flag',
+                        help="List clusters of near-identical documents (flag), also count each "
+                             "cluster as one document (collapse), or skip the detection (off)")
+    parser.add_argument('--near-duplicate-threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Minimum estimated similarity of near-duplicates (0-1)")
+    parser.add_argument('--faculty-model', type=Path,
+                        help="Trained faculty classifier (default: University/document_analysis/faculty_model.joblib if present)")
+    return parser.parse_args(argv)
+
 def main():
+    args = parse_args()
+    if args.ocr_text_threshold is not None:
+        from docscan.ocr import set_text_threshold
+        set_text_threshold(args.ocr_text_threshold)
+    
     # Initialize scanner with the current directory
-    scanner = DocumentScanner(Path(__file__).parent)
+    scanner = DocumentScanner(Path(__file__).parent, workers=args.workers,
+                              split_pdf_pages=args.split_pdf_pages,
+                              ocr_pdf_pages=args.ocr_pdf_pages,
+                              checkpoint_interval=args.checkpoint_interval,
+                              file_timeout=args.file_timeout or None,
+                              memory_mb=args.max_memory_mb or None,
+                              search_index=not args.no_index,
+                              near_duplicates=None if args.near_duplicates == 'off' else args.near_duplicates,
+                              near_duplicate_threshold=args.near_duplicate_threshold,
+                              faculty_model=args.faculty_model)
     
     # Start scanning
     print("Starting document scan...")
-    report = scanner.scan_documents()
+    report = scanner.scan_documents(resume=args.resume)
     
     # Print summary
     print("\nScan Complete!")
@@ -0,0 +1,7 @@
+"""Shared building blocks for the KEAN document scanners.
+
+Used by scan_root_documents.py and the scanners under University/.
+"""
+from .catalog import ScanCatalog, config_signature, file_digest  # noqa: F401
+from .parallel import ExtractionPool, resolve_workers  # noqa: F401
+from . import stats  # noqa: F401
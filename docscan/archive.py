@@ -0,0 +1,96 @@
+"""Read documents straight out of zip archives, including zips nested in zips."""
+import io
+import logging
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Collection, Dict, Iterator, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ZipMember(NamedTuple):
+    """A file inside an archive.
+
+    ``chain`` holds the member names from the outer archive down to the
+    file, e.g. ``('kean-platform-fixed.zip', 'docs/manual.pdf')``.
+    """
+    chain: Tuple[str, ...]
+    crc: int
+    size: int
+
+    @property
+    def name(self) -> str:
+        return '/'.join(self.chain)
+
+    @property
+    def content_hash(self) -> str:
+        """Catalog key: the CRC-32 the archive stores for the member."""
+        return f"crc32:{self.crc:08x}"
+
+
+class ZipSource:
+    """A zip archive whose members are read in memory, never extracted to disk.
+
+    Members ending in ``.zip`` are opened as nested archives and their
+    members are listed in place of the nested zip itself.
+
+    Args:
+        zip_path: Archive on disk
+        extensions: Lower-case suffixes to list (None lists every member)
+    """
+
+    def __init__(self, zip_path: Path, extensions: Optional[Collection[str]] = None):
+        self.zip_path = Path(zip_path)
+        self.extensions = extensions
+        self._archives: Dict[Tuple[str, ...], zipfile.ZipFile] = {}
+
+    def __enter__(self) -> 'ZipSource':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _archive(self, chain: Tuple[str, ...]) -> zipfile.ZipFile:
+        """Open (once) the archive at ``chain``; nested archives are held in memory."""
+        archive = self._archives.get(chain)
+        if archive is None:
+            if chain:
+                archive = zipfile.ZipFile(io.BytesIO(self._archive(chain[:-1]).read(chain[-1])))
+            else:
+                archive = zipfile.ZipFile(self.zip_path)
+            self._archives[chain] = archive
+        return archive
+
+    def members(self) -> Iterator[ZipMember]:
+        """Yield the files of the archive and its nested archives, in archive order."""
+        return self._members(())
+
+    def _members(self, chain: Tuple[str, ...]) -> Iterator[ZipMember]:
+        for info in self._archive(chain).infolist():
+            if info.is_dir():
+                continue
+            member_chain = chain + (info.filename,)
+            suffix = PurePosixPath(info.filename).suffix.lower()
+            if suffix == '.zip':
+                try:
+                    yield from self._members(member_chain)
+                except (zipfile.BadZipFile, RuntimeError, OSError) as e:
+                    logger.warning(f"Cannot open nested archive {'/'.join(member_chain)}: {e}")
+                continue
+            if self.extensions is None or suffix in self.extensions:
+                yield ZipMember(member_chain, info.CRC, info.file_size)
+
+    def read(self, chain: Tuple[str, ...]) -> bytes:
+        """Decompress one member (the CRC is verified by zipfile while reading)."""
+        return self._archive(chain[:-1]).read(chain[-1])
+
+    def open(self, chain: Tuple[str, ...]) -> io.BytesIO:
+        """A member as a seekable in-memory stream named after its archive path."""
+        stream = io.BytesIO(self.read(chain))
+        stream.name = f"{self.zip_path}/{'/'.join(chain)}"
+        return stream
+
+    def close(self) -> None:
+        for archive in self._archives.values():
+            archive.close()
+        self._archives.clear()
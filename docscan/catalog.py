@@ -0,0 +1,263 @@
+"""Persistent scan catalog so unchanged files are not re-extracted on every run."""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Bump when the layout of stored records changes
+CATALOG_VERSION = 1
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# SQLite's default limit on host parameters is 999
+_QUERY_BATCH = 500
+
+
+def file_digest(file_path: Path) -> str:
+    """Return the SHA-1 hex digest of a file's contents."""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def bytes_digest(data) -> str:
+    """``file_digest`` of bytes already in memory (or memory-mapped) during extraction."""
+    return hashlib.sha1(data).hexdigest()
+
+
+def config_signature(*parts: Any) -> str:
+    """Fingerprint scanner settings that influence the stored records."""
+    payload = json.dumps([CATALOG_VERSION, *parts], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class ScanCatalog:
+    """SQLite-backed catalog of extraction results.
+
+    Entries are keyed by (relative path, size, mtime_ns, content hash). A file
+    whose size and mtime_ns are unchanged is served straight from the catalog;
+    if only the mtime moved (touched, copied back, restored from backup), the
+    content hash decides, for entries stored with one. ``store`` does not
+    read the file to hash it; the scanner passes the digest of the bytes
+    its extractor read anyway (plain-text files and PDFs, see
+    ``bytes_digest``). Entries of other formats have no hash and count as
+    changed once their mtime moves. Records written under a different ``signature``
+    (e.g. other faculty keywords) are treated as misses.
+
+    Directories are catalogued by their Merkle fingerprint (see
+    docscan.walk.DirNode). When a directory's fingerprint is unchanged, the
+    records of its whole subtree are loaded in bulk with ``load_records``
+    instead of being looked up file by file.
+    """
+
+    def __init__(self, db_path: Path, signature: str = ''):
+        self.db_path = Path(db_path)
+        self.signature = signature
+        self.conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        self.dir_hits = 0
+        self._seen: Set[str] = set()
+        self._seen_dirs: Set[str] = set()
+
+    def connect(self) -> None:
+        """Open the catalog database, creating the schema if needed."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                rel_path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                signature TEXT NOT NULL,
+                record TEXT NOT NULL,
+                scanned_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS dirs (
+                rel_dir TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                signature TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS throughput (
+                extension TEXT PRIMARY KEY,
+                files REAL NOT NULL,
+                bytes REAL NOT NULL,
+                seconds REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.dir_hits = 0
+        self._seen.clear()
+        self._seen_dirs.clear()
+
+    def close(self) -> None:
+        """Commit pending writes and close the database."""
+        if self.conn:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self) -> 'ScanCatalog':
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def lookup(self, rel_path: str, file_path: Path, stat_result: os.stat_result,
+               on_touched: Optional[Callable[[int], None]] = None) -> Optional[Dict[str, Any]]:
+        """Return the cached record for an unchanged file, or None.
+
+        ``on_touched`` is called with the stored mtime_ns when the file was
+        only touched (recognized by its content hash).
+        """
+        self._seen.add(rel_path)
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, content_hash, signature, record FROM files WHERE rel_path = ?",
+            (rel_path,)
+        ).fetchone()
+
+        if row is None or row['signature'] != self.signature or row['size'] != stat_result.st_size:
+            self.misses += 1
+            return None
+
+        if row['mtime_ns'] != stat_result.st_mtime_ns:
+            # Same size but touched: only trust the entry if the bytes match
+            if not row['content_hash'] or file_digest(file_path) != row['content_hash']:
+                self.misses += 1
+                return None
+            self.conn.execute(
+                "UPDATE files SET mtime_ns = ? WHERE rel_path = ?",
+                (stat_result.st_mtime_ns, rel_path)
+            )
+            if on_touched is not None:
+                on_touched(row['mtime_ns'])
+
+        self.hits += 1
+        return json.loads(row['record'])
+
+    def store(self, rel_path: str, stat_result: os.stat_result, record: Dict[str, Any],
+              content_hash: str = '') -> None:
+        """Insert or replace the record for a freshly extracted file.
+
+        ``content_hash`` is the digest of the file's bytes if the extractor
+        read them (``bytes_digest``); the file is not read again to compute it.
+        """
+        self._seen.add(rel_path)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files "
+            "(rel_path, size, mtime_ns, content_hash, signature, record, scanned_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (rel_path, stat_result.st_size, stat_result.st_mtime_ns, content_hash,
+             self.signature, json.dumps(record, ensure_ascii=False, default=str), time.time())
+        )
+
+    def lookup_content(self, rel_path: str, size: int, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the cached record of an entry without a file on disk (e.g. a zip member).
+
+        The caller supplies the content hash (for zip members their CRC-32),
+        so nothing has to be read to validate the entry.
+        """
+        self._seen.add(rel_path)
+        row = self.conn.execute(
+            "SELECT size, content_hash, signature, record FROM files WHERE rel_path = ?", (rel_path,)
+        ).fetchone()
+        if (row is None or row['signature'] != self.signature or row['size'] != size
+                or row['content_hash'] != content_hash):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row['record'])
+
+    def store_content(self, rel_path: str, size: int, content_hash: str, record: Dict[str, Any]) -> None:
+        """Insert or replace the record of an entry looked up with ``lookup_content``."""
+        self._seen.add(rel_path)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files "
+            "(rel_path, size, mtime_ns, content_hash, signature, record, scanned_at) "
+            "VALUES (?, ?, 0, ?, ?, ?, ?)",
+            (rel_path, size, content_hash, self.signature,
+             json.dumps(record, ensure_ascii=False, default=str), time.time())
+        )
+
+    def dir_unchanged(self, rel_dir: str, fingerprint: str) -> bool:
+        """Whether a directory's subtree is unchanged since its fingerprint was stored."""
+        row = self.conn.execute(
+            "SELECT fingerprint, signature FROM dirs WHERE rel_dir = ?", (rel_dir,)
+        ).fetchone()
+        return row is not None and row['fingerprint'] == fingerprint and row['signature'] == self.signature
+
+    def load_records(self, rel_paths: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Records of an unchanged subtree, or None if any of them is missing."""
+        records = {}
+        for start in range(0, len(rel_paths), _QUERY_BATCH):
+            batch = rel_paths[start:start + _QUERY_BATCH]
+            rows = self.conn.execute(
+                f"SELECT rel_path, signature, record FROM files "
+                f"WHERE rel_path IN ({', '.join('?' * len(batch))})",
+                batch
+            )
+            for row in rows:
+                if row['signature'] == self.signature:
+                    records[row['rel_path']] = json.loads(row['record'])
+        if len(records) != len(rel_paths):
+            return None
+
+        self._seen.update(rel_paths)
+        self.hits += len(rel_paths)
+        self.dir_hits += 1
+        return records
+
+    def store_dirs(self, fingerprints: Iterable[Tuple[str, str]]) -> None:
+        """Remember ``(rel_dir, fingerprint)`` pairs of fully catalogued directories."""
+        fingerprints = list(fingerprints)
+        self._seen_dirs.update(rel_dir for rel_dir, _ in fingerprints)
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO dirs (rel_dir, fingerprint, signature) VALUES (?, ?, ?)",
+            [(rel_dir, fingerprint, self.signature) for rel_dir, fingerprint in fingerprints]
+        )
+
+    def load_throughput(self) -> Dict[str, List[float]]:
+        """Extraction timings of earlier runs: extension -> [files, bytes, seconds]."""
+        return {row['extension']: [row['files'], row['bytes'], row['seconds']]
+                for row in self.conn.execute("SELECT extension, files, bytes, seconds FROM throughput")}
+
+    def store_throughput(self, throughput: Dict[str, List[float]]) -> None:
+        """Replace the stored timings (see docscan.schedule.CostModel.merged_history)."""
+        self.conn.execute("DELETE FROM throughput")
+        self.conn.executemany(
+            "INSERT INTO throughput (extension, files, bytes, seconds) VALUES (?, ?, ?, ?)",
+            [(ext, *totals) for ext, totals in throughput.items()]
+        )
+
+    def prune(self) -> int:
+        """Drop entries for files (and directories) that were not seen during this scan."""
+        stale = [
+            row['rel_path'] for row in self.conn.execute("SELECT rel_path FROM files")
+            if row['rel_path'] not in self._seen
+        ]
+        self.conn.executemany("DELETE FROM files WHERE rel_path = ?", [(p,) for p in stale])
+        stale_dirs = [
+            row['rel_dir'] for row in self.conn.execute("SELECT rel_dir FROM dirs")
+            if row['rel_dir'] not in self._seen_dirs
+        ]
+        self.conn.executemany("DELETE FROM dirs WHERE rel_dir = ?", [(d,) for d in stale_dirs])
+        self.conn.commit()
+        return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for the current scan."""
+        return {'hits': self.hits, 'misses': self.misses, 'unchanged_dirs': self.dir_hits}
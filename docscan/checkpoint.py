@@ -0,0 +1,108 @@
+"""Checkpoints for long-running scans, so a crashed run can be resumed."""
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 60.0
+
+
+class Checkpoint:
+    """Periodic snapshot of a scan in ``directory``.
+
+    ``documents.ndjson`` receives every analyzed document as it is produced.
+    ``state.json`` holds the scanner's aggregates (processed files, faculty
+    totals, ...) together with the byte offset up to which the document
+    stream matches them; it is replaced atomically, so it is always either
+    the previous or the new snapshot. On resume the stream is cut back to
+    that offset and the files processed after the snapshot are redone.
+
+    Args:
+        directory: Where the checkpoint files live
+        signature: Scanner settings; a checkpoint written with other settings is discarded
+        interval: Minimum seconds between two snapshots (see ``due``)
+    """
+
+    def __init__(self, directory: Path, signature: Any = None, interval: float = DEFAULT_INTERVAL):
+        self.directory = Path(directory)
+        self.signature = signature
+        self.interval = interval
+        self.state_path = self.directory / "state.json"
+        self.documents_path = self.directory / "documents.ndjson"
+        self._documents: Optional[TextIO] = None
+        self._last_save = 0.0
+
+    def start(self, resume: bool = False) -> Optional[Dict[str, Any]]:
+        """Open the checkpoint; returns the saved state when resuming one."""
+        state = self._load() if resume else None
+        if state is None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._documents = open(self.documents_path, 'w', encoding='utf-8')
+        else:
+            self._documents = open(self.documents_path, 'r+', encoding='utf-8')
+            self._documents.truncate(state['documents_offset'])
+            self._documents.seek(state['documents_offset'])
+        self._last_save = time.monotonic()
+        return state
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            logger.info("No checkpoint to resume, starting a new scan")
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.state_path}: {e}")
+            return None
+        if state.get('signature') != json.loads(json.dumps(self.signature, default=str)):
+            logger.warning("Checkpoint was written with different settings, starting a new scan")
+            return None
+        logger.info(f"Resuming from checkpoint of {state['saved_at']} "
+                    f"({len(state.get('processed', []))} files already processed)")
+        return state
+
+    def documents(self) -> Iterator[Dict[str, Any]]:
+        """Documents recorded up to the current position (used to restore a resumed scan)."""
+        self._documents.flush()
+        end = self._documents.tell()
+        with open(self.documents_path, 'rb') as f:
+            while f.tell() < end:
+                yield json.loads(f.readline())
+
+    def add_document(self, document: Dict[str, Any]) -> None:
+        self._documents.write(json.dumps(document, ensure_ascii=False, default=str) + '\n')
+
+    def due(self) -> bool:
+        """Whether ``interval`` seconds have passed since the last snapshot."""
+        return time.monotonic() - self._last_save >= self.interval
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """Write a snapshot of ``state`` matching the documents written so far."""
+        self._documents.flush()
+        os.fsync(self._documents.fileno())
+        state = dict(state, signature=self.signature, documents_offset=self._documents.tell(),
+                     saved_at=time.strftime('%Y-%m-%d %H:%M:%S'))
+        tmp_path = self.state_path.with_name('state.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+        self._last_save = time.monotonic()
+
+    def clear(self) -> None:
+        """Remove the checkpoint after the scan completed."""
+        self.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def close(self) -> None:
+        if self._documents is not None:
+            self._documents.close()
+            self._documents = None
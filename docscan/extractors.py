@@ -0,0 +1,246 @@
+"""Text extractors keyed by file extension, with their libraries imported on first use.
+
+The scanners dispatch every file through ``extract``, so a text-only scan
+never imports PyPDF2, Pillow, the OCR engine, docx2txt, openpyxl or
+python-pptx, and a missing library only fails the files that need it (with
+an ImportError the scanners log like any other extraction error). Legacy
+Word files (.doc) need the ``antiword`` program on the PATH; OpenDocument
+text (.odt) is read with the standard library.
+
+Every extractor is called as ``extractor(source, **options)``, where
+``source`` is a path or a seekable binary stream (e.g. a zip member from
+docscan.archive). Extractors pick the options they understand and ignore
+the rest:
+
+- ``ocr_scanned``: OCR PDF pages without a text layer (see docscan.pdf)
+- ``grayscale``: convert images to grayscale before OCR (default True)
+- ``strip``: strip leading and trailing whitespace from plain text files
+"""
+import logging
+import shutil
+import subprocess
+import tempfile
+import zipfile
+from pathlib import Path, PurePath
+from xml.etree import ElementTree
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from .textfile import PLAIN_TEXT_EXTENSIONS, decode_bytes
+
+logger = logging.getLogger(__name__)
+
+# Spreadsheet text beyond this many characters is dropped (huge data exports)
+SPREADSHEET_MAX_CHARS = 16 * 1024 * 1024
+
+# Image formats that are OCR'd (see docscan.ocr)
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif'})
+
+Source = Union[str, Path, BinaryIO]
+Extractor = Callable[..., str]
+
+
+class UnsupportedFormat(ValueError):
+    """No extractor is registered for the file's extension."""
+
+
+def _is_stream(source: Source) -> bool:
+    return hasattr(source, 'read')
+
+
+def _read_bytes(source: Source) -> bytes:
+    if _is_stream(source):
+        return source.read()
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def extract_plain_text(source: Source, strip: bool = False, **options) -> str:
+    """Plain text decoded as in docscan.textfile; newlines normalized to ``\\n``."""
+    text = decode_bytes(_read_bytes(source))
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text.strip() if strip else text
+
+
+def extract_docx(source: Source, **options) -> str:
+    """Word documents via docx2txt, or python-docx if docx2txt is not installed."""
+    try:
+        import docx2txt
+    except ImportError:
+        docx2txt = None
+    if docx2txt is not None:
+        return docx2txt.process(source if _is_stream(source) else str(source))
+
+    try:
+        import docx
+    except ImportError:
+        raise ImportError("Reading Word documents needs docx2txt or python-docx") from None
+    document = docx.Document(source if _is_stream(source) else str(source))
+    return '\n'.join(paragraph.text for paragraph in document.paragraphs)
+
+
+def extract_doc(source: Source, **options) -> str:
+    """Legacy (OLE) Word documents via the antiword program."""
+    antiword = shutil.which('antiword')
+    if antiword is None:
+        raise ImportError("Reading legacy .doc files needs antiword on the PATH")
+    if not _is_stream(source):
+        return _run_antiword(antiword, str(source))
+    # antiword only reads files; a zip member goes through a temporary copy
+    with tempfile.NamedTemporaryFile(suffix='.doc') as f:
+        shutil.copyfileobj(source, f)
+        f.flush()
+        return _run_antiword(antiword, f.name)
+
+
+def _run_antiword(antiword: str, path: str) -> str:
+    result = subprocess.run([antiword, '-w', '0', path], capture_output=True)
+    if result.returncode != 0:
+        raise ValueError(f"antiword failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+    return result.stdout.decode('utf-8', 'replace')
+
+
+_ODF_TEXT = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+_ODF_BLOCKS = {_ODF_TEXT + 'p', _ODF_TEXT + 'h'}
+
+
+def _odf_text(element) -> str:
+    """Text of an ODF paragraph, with its space, tab and line-break elements expanded."""
+    parts = [element.text or '']
+    for child in element:
+        if child.tag == _ODF_TEXT + 's':
+            parts.append(' ' * int(child.get(_ODF_TEXT + 'c', 1)))
+        elif child.tag == _ODF_TEXT + 'tab':
+            parts.append('\t')
+        elif child.tag == _ODF_TEXT + 'line-break':
+            parts.append('\n')
+        elif child.tag not in _ODF_BLOCKS:
+            # Spans, links, fields; nested paragraphs (notes) were emitted on their own
+            parts.append(_odf_text(child))
+        parts.append(child.tail or '')
+    return ''.join(parts)
+
+
+def extract_odt(source: Source, **options) -> str:
+    """Paragraphs and headings of an OpenDocument text, one per line, from its content.xml.
+
+    The XML is parsed incrementally and every paragraph is dropped once its
+    text is taken, so a long document is never held as a whole tree.
+    """
+    lines: List[str] = []
+    with zipfile.ZipFile(source) as odt, odt.open('content.xml') as content:
+        for _, element in ElementTree.iterparse(content):
+            if element.tag in _ODF_BLOCKS:
+                lines.append(_odf_text(element))
+                element.clear()
+    return '\n'.join(lines)
+
+
+def extract_pdf(source: Source, ocr_scanned: bool = False, **options) -> str:
+    from .pdf import read_pdf_text
+    return read_pdf_text(source, ocr_scanned=ocr_scanned)
+
+
+def extract_image(source: Source, grayscale: bool = True, **options) -> str:
+    """Enhance and OCR an image; repeated images come from the OCR cache."""
+    from .ocr import ocr_image_bytes, ocr_image_file
+    if _is_stream(source):
+        return ocr_image_bytes(source.read(), grayscale=grayscale)
+    return ocr_image_file(source, grayscale=grayscale)
+
+
+def extract_spreadsheet(source: Source, max_chars: int = SPREADSHEET_MAX_CHARS, **options) -> str:
+    """Cell values of every worksheet, one tab-separated line per non-empty row.
+
+    The workbook is opened in openpyxl's read-only mode, which streams rows
+    out of the sheet XML instead of building every cell object in memory,
+    and formulas yield their cached values. Text beyond ``max_chars`` is
+    dropped, so a huge data export costs bounded memory.
+    """
+    import openpyxl
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    lines: List[str] = []
+    size = 0
+    try:
+        for sheet in workbook.worksheets:
+            lines.append(sheet.title)
+            size += len(sheet.title) + 1
+            for row in sheet.iter_rows(values_only=True):
+                cells = [str(value) for value in row if value is not None and value != '']
+                if not cells:
+                    continue
+                line = '\t'.join(cells)
+                size += len(line) + 1
+                if size > max_chars:
+                    logger.warning(f"Spreadsheet {getattr(source, 'name', source)} truncated "
+                                   f"after {max_chars:,} characters")
+                    return '\n'.join(lines)
+                lines.append(line)
+    finally:
+        workbook.close()
+    return '\n'.join(lines)
+
+
+def _shape_texts(shapes) -> Iterator[str]:
+    for shape in shapes:
+        if shape.has_text_frame:
+            yield shape.text_frame.text
+        elif shape.has_table:
+            for row in shape.table.rows:
+                yield '\t'.join(cell.text for cell in row.cells)
+        elif hasattr(shape, 'shapes'):
+            # Group shape
+            yield from _shape_texts(shape.shapes)
+
+
+def extract_presentation(source: Source, **options) -> str:
+    """Text frames, table cells and speaker notes, slide by slide (python-pptx)."""
+    from pptx import Presentation
+    presentation = Presentation(source)
+    lines: List[str] = []
+    for slide in presentation.slides:
+        lines.extend(_shape_texts(slide.shapes))
+        if slide.has_notes_slide and slide.notes_slide.notes_text_frame is not None:
+            lines.append(slide.notes_slide.notes_text_frame.text)
+    return '\n'.join(line for line in lines if line.strip())
+
+
+_registry: Dict[str, Extractor] = {}
+
+
+def register(extensions: Iterable[str], extractor: Extractor) -> None:
+    """Use ``extractor`` for files with the given (lower-case, dotted) extensions."""
+    for ext in extensions:
+        _registry[ext.lower()] = extractor
+
+
+def extractor_for(ext: str) -> Optional[Extractor]:
+    return _registry.get(ext.lower())
+
+
+def supports(ext: str) -> bool:
+    return ext.lower() in _registry
+
+
+def extract(source: Source, ext: Optional[str] = None, **options) -> str:
+    """Extract the text of a file or stream with the extractor for its extension.
+
+    ``ext`` defaults to the suffix of the path (or of the stream's ``name``).
+    Raises UnsupportedFormat for unregistered extensions; errors of the
+    extractor itself propagate to the caller.
+    """
+    if ext is None:
+        ext = PurePath(str(getattr(source, 'name', source))).suffix
+    extractor = extractor_for(ext)
+    if extractor is None:
+        raise UnsupportedFormat(f"No extractor for {ext or 'files without extension'}")
+    return extractor(source, **options)
+
+
+register(PLAIN_TEXT_EXTENSIONS, extract_plain_text)
+register(['.docx'], extract_docx)
+register(['.doc'], extract_doc)
+register(['.odt'], extract_odt)
+register(['.pdf'], extract_pdf)
+register(IMAGE_EXTENSIONS, extract_image)
+register(['.xlsx', '.xlsm'], extract_spreadsheet)
+register(['.pptx'], extract_presentation)
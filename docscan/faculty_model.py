@@ -0,0 +1,333 @@
+"""Faculty classifier: hashed word features and a calibrated linear model, trained on labeled folders.
+
+Train and evaluate on a directory with one subfolder of documents per
+faculty (the folder names are the labels)::
+
+    python -m docscan.faculty_model train labeled/
+    python -m docscan.faculty_model evaluate holdout/
+
+The model is written to (and evaluated from) ``DEFAULT_MODEL``,
+``University/document_analysis/faculty_model.joblib``, where the University
+scanners look for it; ``--model`` picks another file.
+
+The scanners load the model file when they start (with scikit-learn and
+joblib imported only then) and classify documents in batches with
+``FacultyBatch``. The model file is a pickle: only load files you trained.
+"""
+import argparse
+import logging
+import os
+import tempfile
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .extractors import extract, supports
+from .parallel import ExtractionPool, TaskFailure
+from .textstore import TextStore
+
+logger = logging.getLogger(__name__)
+
+# Where the University scanners (results in University/document_analysis/) load the model from
+DEFAULT_MODEL = Path(__file__).resolve().parent.parent / 'University' / 'document_analysis' / 'faculty_model.joblib'
+MODEL_VERSION = 1
+
+# Hashed feature space of the words; no vocabulary is stored
+N_FEATURES = 2 ** 18
+TOKEN_PATTERN = r"(?u)\b[^\W\d_]{2,}\b"
+# Only the start of a document is classified; a few pages decide the faculty
+# and keep vectorizing at a few milliseconds per document
+MAX_TEXT_CHARS = 20_000
+
+# Documents classified per batch, and the text kept in memory for a batch at
+# most (the first MAX_TEXT_CHARS of each document; the rest waits on disk)
+BATCH_SIZE = 2000
+BATCH_CHARS = 16 * 1024 * 1024
+# Predictions below this score are left to the keyword matching
+MIN_SCORE = 0.5
+
+Prediction = Tuple[str, float]
+
+
+def check_labels(labels: Sequence[str]) -> Counter:
+    """Documents per faculty; raises ValueError if there is too little to train on."""
+    counts = Counter(labels)
+    if len(counts) < 2:
+        raise ValueError("Training needs documents of at least two faculties")
+    too_few = [label for label, n in counts.items() if n < 2]
+    if too_few:
+        raise ValueError(f"Every faculty needs at least 2 documents ({', '.join(too_few)} has fewer)")
+    return counts
+
+
+class FacultyClassifier:
+    """A trained pipeline: HashingVectorizer, TF-IDF and a sigmoid-calibrated LinearSVC.
+
+    The hashing vectorizer needs no fitted vocabulary, so the model stays
+    small and transforms a batch in one pass; the calibrated scores are
+    probabilities, so one ``min_score`` means the same for every faculty.
+    Calibration is fitted on cross-validated predictions, but only one SVM
+    (trained on all documents) is kept.
+    """
+
+    def __init__(self, pipeline: Any, info: Optional[Dict[str, Any]] = None):
+        self.pipeline = pipeline
+        self.info = info or {}
+
+    @property
+    def labels(self) -> List[str]:
+        return [str(label) for label in self.pipeline.classes_]
+
+    @classmethod
+    def train(cls, texts: Sequence[str], labels: Sequence[str]) -> 'FacultyClassifier':
+        """Fit a model; every faculty needs at least two documents."""
+        from sklearn.calibration import CalibratedClassifierCV
+        from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+        from sklearn.pipeline import Pipeline
+        from sklearn.svm import LinearSVC
+
+        counts = check_labels(labels)
+        smallest = min(counts.values())
+        pipeline = Pipeline([
+            ('features', HashingVectorizer(n_features=N_FEATURES, token_pattern=TOKEN_PATTERN,
+                                           alternate_sign=False, norm=None)),
+            ('tfidf', TfidfTransformer(sublinear_tf=True)),
+            ('model', CalibratedClassifierCV(LinearSVC(), method='sigmoid', cv=min(smallest, 3),
+                                             ensemble=False)),
+        ])
+        pipeline.fit([text[:MAX_TEXT_CHARS] for text in texts], list(labels))
+        return cls(pipeline, {'trained': datetime.now().isoformat(), 'documents': dict(counts)})
+
+    def predict(self, texts: Sequence[str]) -> List[Prediction]:
+        """The most likely faculty of every text and its calibrated probability."""
+        if not texts:
+            return []
+        probabilities = self.pipeline.predict_proba([text[:MAX_TEXT_CHARS] for text in texts])
+        best = probabilities.argmax(axis=1)
+        labels = self.labels
+        return [(labels[i], float(probabilities[row, i])) for row, i in enumerate(best)]
+
+    def save(self, path: Union[str, Path]) -> None:
+        import joblib
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + '.tmp')
+        joblib.dump({'version': MODEL_VERSION, 'pipeline': self.pipeline, 'info': self.info}, temp_path, compress=3)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'FacultyClassifier':
+        import joblib
+        stored = joblib.load(path)
+        if stored.get('version') != MODEL_VERSION:
+            raise ValueError(f"{path} was written by another version of the faculty model, train it again")
+        return cls(stored['pipeline'], stored['info'])
+
+
+_loaded: Dict[Path, Optional[FacultyClassifier]] = {}
+
+
+def load_classifier(path: Union[str, Path]) -> Optional[FacultyClassifier]:
+    """The model stored at ``path``, loaded once per process; None (logged once) if it cannot be used."""
+    path = Path(path)
+    if path not in _loaded:
+        try:
+            _loaded[path] = FacultyClassifier.load(path)
+            logger.info(f"Faculty model loaded from {path} ({', '.join(_loaded[path].labels)})")
+        except FileNotFoundError:
+            _loaded[path] = None
+        except (ImportError, ValueError, OSError) as e:
+            logger.warning(f"Faculty model {path} not used, falling back to keywords: {e}")
+            _loaded[path] = None
+    return _loaded[path]
+
+
+class FacultyBatch:
+    """Classify documents in batches, holding back only what the model needs.
+
+    The model at ``model_path`` is loaded when the batch is created. Without
+    one, ``add(text, *args, classify=...)`` calls ``handle(text, *args, None)``
+    right away, so streamed reports and spilled texts see every document as
+    soon as it is extracted. With a model, a document is queued: the start
+    of its text (``MAX_TEXT_CHARS``, all the model reads) stays in memory and
+    the full text goes to a temporary ``TextStore``. ``flush`` (also called
+    when ``batch_size`` documents or ``batch_chars`` characters are queued)
+    runs the model once over the queue and calls ``handle`` with the text
+    read back and the ``(faculty, score)`` prediction, in the order the
+    documents were added. Documents added with ``classify=False`` get None;
+    they only wait while documents ahead of them are queued.
+
+    Args:
+        model_path: Trained model file (see ``load_classifier``)
+        handle: Called as ``handle(text, *args, prediction)`` for every document
+        spill_dir: Directory for the temporary text store (system default if None)
+    """
+
+    def __init__(self, model_path: Union[str, Path], handle: Callable[..., None],
+                 batch_size: int = BATCH_SIZE, batch_chars: int = BATCH_CHARS,
+                 spill_dir: Optional[Union[str, Path]] = None):
+        self.classifier = load_classifier(model_path)
+        self.handle = handle
+        self.batch_size = batch_size
+        self.batch_chars = batch_chars
+        self.spill_dir = spill_dir
+        self._queue: List[Tuple[Optional[str], List[int], tuple]] = []
+        self._chars = 0
+        self._store: Optional[TextStore] = None
+
+    def add(self, text: str, *args: Any, classify: bool = True) -> None:
+        if self.classifier is None or (not classify and not self._queue):
+            self.handle(text, *args, None)
+            return
+        if self._store is None:
+            self._store = TextStore(tempfile.mkdtemp(prefix='faculty_batch_', dir=self.spill_dir))
+        head = text[:MAX_TEXT_CHARS] if classify else None
+        self._queue.append((head, self._store.put(text), args))
+        self._chars += len(head or '')
+        if len(self._queue) >= self.batch_size or self._chars >= self.batch_chars:
+            self.flush()
+
+    def flush(self) -> None:
+        queue, self._queue, self._chars = self._queue, [], 0
+        if not queue:
+            return
+        predictions = iter(self.classifier.predict([head for head, _, _ in queue if head is not None]))
+        try:
+            for head, ref, args in queue:
+                self.handle(self._store.get(ref), *args, next(predictions) if head is not None else None)
+        finally:
+            self._store.remove()
+            self._store = None
+
+
+class _LabeledReader:
+    """Extraction worker for the labeled training documents."""
+
+    def read(self, file_path: Path) -> str:
+        try:
+            return extract(file_path, file_path.suffix.lower(), strip=True)
+        except Exception as e:
+            logger.error(f"Error extracting text from {file_path}: {e}")
+            return ''
+
+
+def read_labeled(root: Union[str, Path], workers: int = 1) -> Tuple[List[str], List[str]]:
+    """Texts and labels of the documents in ``root/<faculty>/**`` (files without text are skipped)."""
+    root = Path(root)
+    files: List[Path] = []
+    labels: List[str] = []
+    for folder in sorted(path for path in root.iterdir() if path.is_dir()):
+        for dirpath, _, filenames in os.walk(folder):
+            for filename in sorted(filenames):
+                file_path = Path(dirpath) / filename
+                if supports(file_path.suffix):
+                    files.append(file_path)
+                    labels.append(folder.name)
+    logger.info(f"Reading {len(files):,} labeled documents of {len(set(labels))} faculties from {root}")
+
+    texts, text_labels = [], []
+    pool = ExtractionPool(_LabeledReader, 'read', workers=workers)
+    for file_path, label, text in zip(files, labels, pool.map((file_path,) for file_path in files)):
+        if isinstance(text, TaskFailure):
+            logger.warning(f"Skipped {file_path}: {text.reason}")
+        elif text:
+            texts.append(text)
+            text_labels.append(label)
+    return texts, text_labels
+
+
+def evaluate(classifier: FacultyClassifier, texts: Sequence[str], labels: Sequence[str],
+             min_score: float = MIN_SCORE) -> Dict[str, Any]:
+    """Accuracy, per-faculty precision/recall and calibration of the model on labeled texts.
+
+    ``calibration_error`` is the expected calibration error over ten score
+    bins (how far the scores are from the observed accuracy); ``coverage``
+    and ``confident_accuracy`` describe the predictions at or above
+    ``min_score``, the ones the scanners use.
+    """
+    from sklearn.metrics import accuracy_score, classification_report
+
+    predictions = classifier.predict(texts)
+    predicted = [label for label, _ in predictions]
+    scores = [score for _, score in predictions]
+    correct = [p == t for p, t in zip(predicted, labels)]
+    bins: Dict[int, List[Tuple[float, bool]]] = {}
+    for score, hit in zip(scores, correct):
+        bins.setdefault(min(int(score * 10), 9), []).append((score, hit))
+    # Per bin |accuracy - mean score| weighted by its share of the documents
+    calibration_error = sum(abs(sum(hit for _, hit in members) - sum(score for score, _ in members))
+                            for members in bins.values()) / max(len(scores), 1)
+    confident = [hit for score, hit in zip(scores, correct) if score >= min_score]
+    return {
+        'documents': len(labels),
+        'accuracy': accuracy_score(labels, predicted),
+        'coverage': len(confident) / max(len(labels), 1),
+        'confident_accuracy': sum(confident) / len(confident) if confident else None,
+        'calibration_error': calibration_error,
+        'faculties': classification_report(labels, predicted, output_dict=True, zero_division=0),
+    }
+
+
+def format_evaluation(result: Dict[str, Any]) -> str:
+    lines = [f"Documents: {result['documents']:,}",
+             f"Accuracy: {result['accuracy']:.1%}",
+             f"Scored >= {MIN_SCORE:.0%}: {result['coverage']:.1%} of documents"
+             + (f", {result['confident_accuracy']:.1%} of them correct"
+                if result['confident_accuracy'] is not None else ""),
+             f"Calibration error: {result['calibration_error']:.3f}",
+             "",
+             f"{'Faculty':<32} {'Precision':>9} {'Recall':>7} {'F1':>6} {'Docs':>6}"]
+    for label, metrics in result['faculties'].items():
+        if isinstance(metrics, dict) and label not in ('macro avg', 'weighted avg'):
+            lines.append(f"{label:<32} {metrics['precision']:>9.2f} {metrics['recall']:>7.2f} "
+                         f"{metrics['f1-score']:>6.2f} {int(metrics['support']):>6}")
+    return '\n'.join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Train or evaluate the faculty classifier on labeled folders.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    train = commands.add_parser('train', help="Train a model on <folder>/<faculty>/** and save it")
+    train.add_argument('folder', type=Path, help="Directory with one subfolder of documents per faculty")
+    train.add_argument('--test-size', type=float, default=0.2,
+                       help="Share of the documents held out to evaluate before the final fit (0 = none)")
+    evaluate_command = commands.add_parser('evaluate', help="Evaluate a saved model on labeled folders")
+    evaluate_command.add_argument('folder', type=Path, help="Directory with one subfolder of documents per faculty")
+    for command in (train, evaluate_command):
+        command.add_argument('--model', type=Path, default=DEFAULT_MODEL,
+                             help="Model file (default: %(default)s)")
+        command.add_argument('--workers', type=int, default=1,
+                             help="Parallel extraction processes (0 = one per CPU core)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    try:
+        texts, labels = read_labeled(args.folder, workers=args.workers)
+        if args.command == 'evaluate':
+            print(format_evaluation(evaluate(FacultyClassifier.load(args.model), texts, labels)))
+            return 0
+
+        check_labels(labels)
+        if args.test_size > 0:
+            from sklearn.model_selection import train_test_split
+            train_texts, test_texts, train_labels, test_labels = train_test_split(
+                texts, labels, test_size=args.test_size, stratify=labels, random_state=0)
+            print(f"Held-out evaluation ({len(train_texts):,} training documents)")
+            print(format_evaluation(evaluate(FacultyClassifier.train(train_texts, train_labels),
+                                             test_texts, test_labels)))
+            print()
+        classifier = FacultyClassifier.train(texts, labels)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Faculty model {args.command} failed: {e}")
+        return 1
+    classifier.save(args.model)
+    print(f"Model trained on {len(texts):,} documents ({', '.join(classifier.labels)}) saved to {args.model}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
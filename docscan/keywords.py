@@ -0,0 +1,101 @@
+"""Multi-keyword matching for faculty and topic detection."""
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Optional
+
+# Letters and digits; underscores and punctuation separate words (file names!)
+WORD_RE = re.compile(r'[^\W_]+')
+_START = r'(?<![^\W_])'
+_END = r'(?![^\W_])'
+
+
+class KeywordMatcher:
+    """Count groups of keywords (e.g. per faculty) in one pass over a text.
+
+    Matching is case-insensitive. With ``word_boundary`` (the default) a
+    keyword only matches whole words, so 'it' no longer matches 'university';
+    a trailing '*' matches any word starting with the keyword (German
+    compounds: 'wirtschaft*' matches 'Wirtschaftsinformatik'), and multi-word
+    keywords match their words separated by any whitespace. Without
+    ``word_boundary`` keywords are counted as plain substrings.
+
+    The text is split into words once; keywords are then looked up per
+    distinct word, so the cost no longer grows with the number of keywords.
+
+    Args:
+        groups: Keywords by group label, in priority order
+        word_boundary: Match whole words instead of substrings
+    """
+
+    def __init__(self, groups: Mapping[str, Iterable[str]], word_boundary: bool = True):
+        self.groups = {label: [keyword.lower() for keyword in keywords] for label, keywords in groups.items()}
+        self.word_boundary = word_boundary
+        self.keywords = list(dict.fromkeys(k for keywords in self.groups.values() for k in keywords))
+
+        self._words: Dict[str, List[str]] = {}
+        self._prefixes: Dict[str, List[str]] = {}
+        phrases = []
+        for keyword in self.keywords:
+            stem = keyword.rstrip('*')
+            parts = WORD_RE.findall(stem)
+            if len(parts) > 1:
+                phrases.append(keyword)
+            elif keyword.endswith('*'):
+                self._prefixes.setdefault(stem, []).append(keyword)
+            else:
+                self._words.setdefault(stem, []).append(keyword)
+        self._prefix_lengths = sorted({len(prefix) for prefix in self._prefixes})
+
+        # Phrases are rare; one alternation finds them all, the group name says which
+        self._phrase_keywords = phrases
+        self._phrase_re = None
+        if phrases:
+            alternatives = []
+            for i, keyword in enumerate(phrases):
+                body = r'\s+'.join(re.escape(part) for part in WORD_RE.findall(keyword))
+                end = r'[^\W_]*' if keyword.endswith('*') else _END
+                alternatives.append(f"(?P<k{i}>{body}{end})")
+            # Anchor once at word starts so the alternatives are only tried there
+            self._phrase_re = re.compile(f"{_START}(?=[^\\W_])(?:{'|'.join(alternatives)})", re.IGNORECASE)
+
+    def keyword_counts(self, text: str) -> Dict[str, int]:
+        """Occurrences of every keyword."""
+        counts = dict.fromkeys(self.keywords, 0)
+        if not text:
+            return counts
+        if not self.word_boundary:
+            text_lower = text.lower()
+            for keyword in self.keywords:
+                counts[keyword] = text_lower.count(keyword)
+            return counts
+
+        # Whitespace tokens may still hold several words ("it's", "a/b.pdf"),
+        # but that is resolved once per distinct token, not once per occurrence
+        for token, occurrences in Counter(text.split()).items():
+            for word in WORD_RE.findall(token.lower()):
+                for keyword in self._words.get(word, ()):
+                    counts[keyword] += occurrences
+                for length in self._prefix_lengths:
+                    if length > len(word):
+                        break
+                    for keyword in self._prefixes.get(word[:length], ()):
+                        counts[keyword] += occurrences
+
+        if self._phrase_re is not None:
+            for match in self._phrase_re.finditer(text):
+                counts[self._phrase_keywords[int(match.lastgroup[1:])]] += 1
+        return counts
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """Total keyword occurrences per group."""
+        keyword_counts = self.keyword_counts(text)
+        return {label: sum(keyword_counts[k] for k in keywords) for label, keywords in self.groups.items()}
+
+    def found(self, text: str) -> List[str]:
+        """Groups with at least one match, in priority order."""
+        return [label for label, count in self.counts(text).items() if count]
+
+    def first(self, text: str) -> Optional[str]:
+        """Highest-priority group with a match, or None."""
+        found = self.found(text)
+        return found[0] if found else None
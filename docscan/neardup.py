@@ -0,0 +1,188 @@
+"""Near-duplicate detection: MinHash signatures of word shingles and an LSH index."""
+import base64
+import zlib
+from array import array
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .keywords import WORD_RE
+
+# Shingles are runs of this many consecutive words
+SHINGLE_WORDS = 5
+# Positions of a signature; similarity is estimated in steps of 1/NUM_BINS
+NUM_BINS = 128
+# Only the first this many shingles of a huge text go into its signature
+MAX_SHINGLES = 1_000_000
+# Stored with the signatures; changing any of them makes old signatures incomparable
+MINHASH_SETTINGS = (SHINGLE_WORDS, NUM_BINS, MAX_SHINGLES)
+
+# LSH: NUM_BINS positions in BANDS bands of NUM_BINS // BANDS rows. Pairs with
+# a similarity of 0.8 share a band with probability ~0.95, pairs at 0.5 with ~0.06
+BANDS = 16
+DEFAULT_THRESHOLD = 0.8
+
+# Shingle hashes are a rolling polynomial hash of the words' CRC-32 modulo a
+# Mersenne prime; the low bits pick the bin, the next 32 bits are the value
+_PRIME = (1 << 61) - 1
+_BASE = 1_000_003
+_BIN_BITS = NUM_BINS.bit_length() - 1
+_EMPTY = 0xFFFFFFFF
+# Weight of the word that leaves the shingle window
+_DROP = pow(_BASE, SHINGLE_WORDS, _PRIME)
+_DENSIFY_STEP = 0x9E3779B1
+
+# CRC-32 (+1) of recently seen words; cleared when it grows past _WORD_CACHE_SIZE
+_word_hashes: Dict[str, int] = {}
+_WORD_CACHE_SIZE = 200_000
+
+
+def _hash_word(word: str) -> int:
+    if len(_word_hashes) >= _WORD_CACHE_SIZE:
+        _word_hashes.clear()
+    value = _word_hashes[word] = zlib.crc32(word.encode('utf-8')) + 1
+    return value
+
+
+class MinHash:
+    """One-permutation MinHash of the word shingles of a text fed in chunks.
+
+    Every shingle is hashed once and only lowers the minimum of the bin its
+    hash falls into (one-permutation hashing), so the cost per word does not
+    grow with ``NUM_BINS``; bins no shingle fell into are filled from their
+    right neighbour when the signature is taken. Words are lower-cased and
+    punctuation is ignored, so reflowed or re-punctuated copies still match.
+    Chunks must not end inside a word.
+    """
+
+    def __init__(self):
+        self.mins = [_EMPTY] * NUM_BINS
+        self.shingles = 0
+        # Word hashes of the current shingle (the last SHINGLE_WORDS words)
+        self._tail: List[int] = []
+        self._hash = 0
+
+    def update(self, text: str) -> 'MinHash':
+        if self.shingles >= MAX_SHINGLES:
+            return self
+        cached = _word_hashes.get
+        hashes = self._tail + [cached(word) or _hash_word(word) for word in WORD_RE.findall(text.lower())]
+        mins = self.mins
+        h = self._hash
+        drop = _DROP
+        bin_mask = NUM_BINS - 1
+        shingles = self.shingles
+        for i in range(len(self._tail), len(hashes)):
+            if i >= SHINGLE_WORDS:
+                h = (h * _BASE + hashes[i] - hashes[i - SHINGLE_WORDS] * drop) % _PRIME
+            else:
+                h = (h * _BASE + hashes[i]) % _PRIME
+            if i >= SHINGLE_WORDS - 1:
+                position = h & bin_mask
+                value = (h >> _BIN_BITS) & _EMPTY
+                if value < mins[position]:
+                    mins[position] = value
+                shingles += 1
+                if shingles >= MAX_SHINGLES:
+                    break
+        self._tail = hashes[-SHINGLE_WORDS:]
+        self._hash = h
+        self.shingles = shingles
+        return self
+
+    def digest(self) -> Optional[str]:
+        """The signature as a base64 string (JSON-friendly), or None for a text without words."""
+        mins = list(self.mins)
+        if not self.shingles:
+            if not self._tail:
+                return None
+            # Fewer words than one shingle: the words themselves are the only shingle
+            mins[self._hash & (NUM_BINS - 1)] = (self._hash >> _BIN_BITS) & _EMPTY
+
+        # Densify: an empty bin takes the next non-empty bin's value, shifted by the distance
+        dense = list(mins)
+        for i in range(NUM_BINS):
+            if mins[i] == _EMPTY:
+                distance = 1
+                while mins[(i + distance) % NUM_BINS] == _EMPTY:
+                    distance += 1
+                dense[i] = (mins[(i + distance) % NUM_BINS] + distance * _DENSIFY_STEP) & _EMPTY
+        return base64.b64encode(array('I', dense).tobytes()).decode('ascii')
+
+
+def decode_signature(signature: str) -> array:
+    values = array('I')
+    values.frombytes(base64.b64decode(signature))
+    return values
+
+
+def similarity(a: str, b: str) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return _similarity(decode_signature(a), decode_signature(b))
+
+
+def _similarity(a: array, b: array) -> float:
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class NearDuplicateIndex:
+    """LSH index over MinHash signatures for finding near-duplicate clusters.
+
+    Signatures are cut into ``BANDS`` bands; documents that agree on a whole
+    band land in the same bucket and become candidates, which are confirmed
+    by their estimated similarity. Each bucket is only compared against the
+    distinct documents already confirmed in it, so a group of n identical
+    copies costs n comparisons instead of n², and the total stays close to
+    linear in the number of documents.
+
+    Args:
+        threshold: Minimum estimated similarity of two near-duplicates
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.keys: List[Hashable] = []
+        self._signatures: List[array] = []
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(BANDS)]
+        self._parent: List[int] = []
+
+    def _find(self, i: int) -> int:
+        while self._parent[i] != i:
+            self._parent[i] = self._parent[self._parent[i]]
+            i = self._parent[i]
+        return i
+
+    def add(self, key: Hashable, signature: str) -> None:
+        """Add a document and link it to the near-duplicates among those added before."""
+        index = len(self.keys)
+        values = decode_signature(signature)
+        self.keys.append(key)
+        self._signatures.append(values)
+        self._parent.append(index)
+
+        data = values.tobytes()
+        band_bytes = len(data) // BANDS
+        for band, buckets in enumerate(self._buckets):
+            representatives = buckets.setdefault(data[band * band_bytes:(band + 1) * band_bytes], [])
+            for other in representatives:
+                if _similarity(values, self._signatures[other]) >= self.threshold:
+                    root, other_root = self._find(index), self._find(other)
+                    if root != other_root:
+                        self._parent[max(root, other_root)] = min(root, other_root)
+                    break
+            else:
+                representatives.append(index)
+
+    def clusters(self) -> List[List[Hashable]]:
+        """Groups of two or more near-duplicates, each in the order the documents were added."""
+        groups: Dict[int, List[Hashable]] = {}
+        for index, key in enumerate(self.keys):
+            groups.setdefault(self._find(index), []).append(key)
+        return [members for members in groups.values() if len(members) > 1]
+
+
+def find_clusters(signatures: Iterable[Tuple[Hashable, str]],
+                  threshold: float = DEFAULT_THRESHOLD) -> List[List[Hashable]]:
+    """Near-duplicate clusters among ``(key, signature)`` pairs (see NearDuplicateIndex)."""
+    index = NearDuplicateIndex(threshold)
+    for key, signature in signatures:
+        index.add(key, signature)
+    return index.clusters()
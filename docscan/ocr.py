@@ -0,0 +1,353 @@
+"""OCR backend shared by the scanners.
+
+Prefers a long-lived in-process tesseract binding (``tesserocr``), which keeps
+the engine and language data loaded between images. Falls back to
+``pytesseract``, which starts one tesseract process per call; in that case
+batches are sent as a single tesseract run over an image list file. Both
+are listed in requirements.txt; tesserocr additionally needs the tesseract
+development files to build. Image files reach the batch API through
+``prefetch_image_files`` (see docscan.parallel.ImageBatch).
+"""
+import atexit
+import io
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from PIL import Image, ImageEnhance
+
+from . import stats
+from .ocr_cache import get_ocr_cache, image_digest
+
+logger = logging.getLogger(__name__)
+
+# Preprocessing used by the scanners before OCR
+DEFAULT_CONTRAST = 2
+DEFAULT_SHARPNESS = 2
+
+# "Has text?" prefilter: densest-tile edge ratio of a small grayscale thumbnail
+PREFILTER_SIZE = 256
+PREFILTER_TILES = 8
+EDGE_STRENGTH = 48
+DEFAULT_TEXT_THRESHOLD = 0.04
+
+
+def enhance_for_ocr(image, contrast: float = DEFAULT_CONTRAST, sharpness: float = DEFAULT_SHARPNESS,
+                    grayscale: bool = True):
+    """Apply the grayscale/contrast/sharpness pass the scanners use before OCR."""
+    if grayscale and image.mode != 'L':
+        image = image.convert('L')
+    image = ImageEnhance.Contrast(image).enhance(contrast)
+    image = ImageEnhance.Sharpness(image).enhance(sharpness)
+    return image
+
+
+def text_score(data: bytes) -> Optional[float]:
+    """Estimate how likely an encoded image contains text (None without NumPy).
+
+    Pixels sitting on a strong horizontal+vertical intensity step are counted
+    per tile of a small grayscale thumbnail and the densest tile is returned.
+    Printed text produces dense, high-contrast strokes even when it covers a
+    small part of the image; photos are dominated by smooth gradients.
+    """
+    if np is None:
+        return None
+    thumb = Image.open(io.BytesIO(data))
+    # Let the JPEG decoder downscale while decoding
+    thumb.draft('L', (PREFILTER_SIZE, PREFILTER_SIZE))
+    thumb = thumb.convert('L')
+    thumb.thumbnail((PREFILTER_SIZE, PREFILTER_SIZE))
+    pixels = np.asarray(thumb, dtype=np.int16)
+    if pixels.shape[0] < 3 or pixels.shape[1] < 3:
+        return 0.0
+    dx = np.abs(np.diff(pixels, axis=1))[:-1, :]
+    dy = np.abs(np.diff(pixels, axis=0))[:, :-1]
+    edges = (dx + dy) > EDGE_STRENGTH
+
+    # Crop to a multiple of the tile grid and take the densest tile
+    rows = edges.shape[0] // PREFILTER_TILES * PREFILTER_TILES or edges.shape[0]
+    cols = edges.shape[1] // PREFILTER_TILES * PREFILTER_TILES or edges.shape[1]
+    tiles_y = PREFILTER_TILES if rows >= PREFILTER_TILES else 1
+    tiles_x = PREFILTER_TILES if cols >= PREFILTER_TILES else 1
+    tiles = edges[:rows, :cols].reshape(tiles_y, rows // tiles_y, tiles_x, cols // tiles_x)
+    return float(tiles.mean(axis=(1, 3)).max())
+
+
+def text_threshold() -> float:
+    """Prefilter threshold from ``KEAN_OCR_TEXT_THRESHOLD`` (0 disables the prefilter)."""
+    return float(os.environ.get('KEAN_OCR_TEXT_THRESHOLD', DEFAULT_TEXT_THRESHOLD))
+
+
+def set_text_threshold(value: float) -> None:
+    """Set the prefilter threshold for this process and the workers it starts."""
+    os.environ['KEAN_OCR_TEXT_THRESHOLD'] = str(value)
+
+
+class OcrEngine:
+    """Warm OCR engine for one process.
+
+    Args:
+        lang: Tesseract language string, e.g. ``'eng'`` or ``'deu+eng'``
+        backend: ``'auto'``, ``'tesserocr'`` or ``'pytesseract'``
+    """
+
+    def __init__(self, lang: str = 'eng', backend: str = 'auto'):
+        self.lang = lang
+        self._api = None
+
+        if backend in ('auto', 'tesserocr') and tesserocr is not None:
+            try:
+                self._api = tesserocr.PyTessBaseAPI(lang=lang)
+                self.backend = 'tesserocr'
+                return
+            except Exception as e:
+                logger.warning(f"tesserocr unavailable ({e}), falling back to pytesseract")
+        elif backend == 'tesserocr':
+            logger.warning("tesserocr is not installed, falling back to pytesseract")
+
+        if pytesseract is None:
+            raise RuntimeError("No OCR backend available: install tesserocr or pytesseract")
+        self.backend = 'pytesseract'
+
+    def recognize(self, image) -> str:
+        """Return the text found in a PIL image."""
+        if self._api is not None:
+            self._api.SetImage(image)
+            return self._api.GetUTF8Text().strip()
+        return pytesseract.image_to_string(image, lang=self.lang).strip()
+
+    def recognize_batch(self, images: Iterable) -> List[str]:
+        """Recognize several images; results are in input order."""
+        images = list(images)
+        if self._api is not None or len(images) <= 1:
+            return [self.recognize(image) for image in images]
+
+        texts = self._recognize_list_file(images)
+        if texts is None:
+            texts = [self.recognize(image) for image in images]
+        return texts
+
+    def _recognize_list_file(self, images: List) -> Optional[List[str]]:
+        """OCR a batch in one tesseract process via an image list file."""
+        try:
+            with tempfile.TemporaryDirectory(prefix='kean_ocr_') as tmp_dir:
+                paths = []
+                for i, image in enumerate(images):
+                    path = os.path.join(tmp_dir, f"{i:05d}.png")
+                    image.save(path)
+                    paths.append(path)
+                list_file = os.path.join(tmp_dir, 'batch.txt')
+                with open(list_file, 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(paths) + '\n')
+                output = pytesseract.image_to_string(list_file, lang=self.lang)
+        except Exception as e:
+            logger.warning(f"Batch OCR failed, retrying images one by one: {e}")
+            return None
+
+        # Tesseract terminates every page with a form feed
+        pages = output.split('\f')
+        if pages and not pages[-1].strip():
+            pages.pop()
+        if len(pages) != len(images):
+            logger.warning("Batch OCR returned an unexpected page count, retrying one by one")
+            return None
+        return [page.strip() for page in pages]
+
+    def close(self) -> None:
+        """Release the tesseract handle."""
+        if self._api is not None:
+            self._api.End()
+            self._api = None
+
+
+_engine: Optional[OcrEngine] = None
+
+
+def get_ocr_engine() -> OcrEngine:
+    """Return this process's OCR engine, creating it on first use.
+
+    The backend can be forced with the ``KEAN_OCR_BACKEND`` environment
+    variable and the language with ``KEAN_OCR_LANG``.
+    """
+    global _engine
+    if _engine is None:
+        _engine = OcrEngine(
+            lang=os.environ.get('KEAN_OCR_LANG', 'eng'),
+            backend=os.environ.get('KEAN_OCR_BACKEND', 'auto')
+        )
+        atexit.register(_engine.close)
+    return _engine
+
+
+def _reset_after_fork() -> None:
+    # Forked workers build their own tesseract handle on first use
+    global _engine
+    _engine = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def pixel_digest(image) -> str:
+    """Hash decoded pixels, for images that do not come from a file (e.g. rendered PDF pages)."""
+    return image_digest(f"{image.mode}:{image.size}:".encode('ascii') + image.tobytes())
+
+
+def _ocr_params(engine: OcrEngine, contrast: float, sharpness: float, grayscale: bool) -> Dict[str, Any]:
+    """OCR cache parameters: everything besides the image that the text depends on."""
+    return {
+        'contrast': contrast,
+        'sharpness': sharpness,
+        'grayscale': grayscale,
+        'lang': engine.lang,
+        'backend': engine.backend
+    }
+
+
+def ocr_images(images: Sequence, contrast: float = DEFAULT_CONTRAST, sharpness: float = DEFAULT_SHARPNESS,
+               grayscale: bool = True) -> List[str]:
+    """OCR several PIL images as one batch, consulting the OCR cache per image."""
+    engine = get_ocr_engine()
+    cache = get_ocr_cache()
+    params = _ocr_params(engine, contrast, sharpness, grayscale)
+
+    texts: List[Optional[str]] = [None] * len(images)
+    hashes = [pixel_digest(image) for image in images]
+    if cache is not None:
+        for i, content_hash in enumerate(hashes):
+            texts[i] = cache.get(content_hash, params)
+    todo = [i for i, text in enumerate(texts) if text is None]
+    stats.increment('ocr_cache_hits', len(images) - len(todo))
+
+    recognized = engine.recognize_batch(
+        enhance_for_ocr(images[i], contrast, sharpness, grayscale) for i in todo
+    )
+    stats.increment('ocr_runs', len(todo))
+    for i, text in zip(todo, recognized):
+        texts[i] = text
+        if cache is not None:
+            cache.put(hashes[i], params, text)
+    return texts
+
+
+# Texts recognised ahead of the per-file calls by prefetch_image_files,
+# keyed by image digest and preprocessing
+_prefetched: Dict[Tuple[str, float, float, bool], str] = {}
+
+
+@contextmanager
+def prefetch_image_files(file_paths: Iterable, contrast: float = DEFAULT_CONTRAST,
+                         sharpness: float = DEFAULT_SHARPNESS, grayscale: bool = True) -> Iterator[None]:
+    """OCR several image files as one engine batch ahead of their per-file calls.
+
+    Inside the block, ``ocr_image_file`` and ``ocr_image_bytes`` return the
+    prefetched text of these images, so the pytesseract fallback starts one
+    tesseract process for the whole batch instead of one per image. A file
+    that cannot be read or decoded is left to its per-file call, which
+    raises the error as usual.
+    """
+    engine = get_ocr_engine()
+    params = _ocr_params(engine, contrast, sharpness, grayscale)
+    keys = []
+    images = []
+    for file_path in file_paths:
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            content_hash = image_digest(data)
+            key = (content_hash, contrast, sharpness, grayscale)
+            if key in _prefetched or key in keys:
+                continue
+            text = _known_text(data, content_hash, params)
+            if text is None:
+                images.append(enhance_for_ocr(Image.open(io.BytesIO(data)), contrast, sharpness, grayscale))
+                keys.append(key)
+            else:
+                _prefetched[key] = text
+        except Exception as e:
+            logger.debug(f"Not prefetching OCR for {file_path}: {e}")
+
+    try:
+        texts = engine.recognize_batch(images)
+    except Exception as e:
+        logger.warning(f"Batch OCR failed, recognizing images one by one: {e}")
+        texts = []
+    # The decoded images are not needed by the per-file calls
+    del images
+    cache = get_ocr_cache()
+    for key, text in zip(keys, texts):
+        _prefetched[key] = text
+        stats.increment('ocr_runs')
+        if cache is not None:
+            cache.put(key[0], params, text)
+    try:
+        yield
+    finally:
+        _prefetched.clear()
+
+
+def _known_text(data: bytes, content_hash: str, params: Dict[str, Any]) -> Optional[str]:
+    """Text of an image without running the engine: cached, or "" if the prefilter finds no text (else None)."""
+    cache = get_ocr_cache()
+    if cache is not None:
+        text = cache.get(content_hash, params)
+        if text is not None:
+            stats.increment('ocr_cache_hits')
+            return text
+
+    threshold = text_threshold()
+    if threshold > 0:
+        score = text_score(data)
+        if score is not None and score < threshold:
+            stats.increment('ocr_prefilter_skipped')
+            return ""
+    return None
+
+
+def ocr_image_file(file_path, contrast: float = DEFAULT_CONTRAST, sharpness: float = DEFAULT_SHARPNESS,
+                   grayscale: bool = True) -> str:
+    """Enhance and OCR an image file, reusing cached text for identical bytes."""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    return ocr_image_bytes(data, contrast, sharpness, grayscale)
+
+
+def ocr_image_bytes(data: bytes, contrast: float = DEFAULT_CONTRAST, sharpness: float = DEFAULT_SHARPNESS,
+                    grayscale: bool = True) -> str:
+    """``ocr_image_file`` for an encoded image held in memory (e.g. a zip member)."""
+    content_hash = image_digest(data)
+    text = _prefetched.get((content_hash, contrast, sharpness, grayscale))
+    if text is not None:
+        return text
+
+    engine = get_ocr_engine()
+    params = _ocr_params(engine, contrast, sharpness, grayscale)
+    text = _known_text(data, content_hash, params)
+    if text is not None:
+        return text
+
+    image = enhance_for_ocr(Image.open(io.BytesIO(data)), contrast, sharpness, grayscale)
+    text = engine.recognize(image)
+    stats.increment('ocr_runs')
+    cache = get_ocr_cache()
+    if cache is not None:
+        cache.put(content_hash, params, text)
+    return text
@@ -0,0 +1,156 @@
+"""Content-addressed OCR result cache with size-bounded LRU eviction."""
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "kean" / "ocr_cache.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# How many inserts between two eviction passes
+EVICT_EVERY = 50
+# Cache hits whose last_used update is buffered before it is written
+TOUCH_BATCH = 256
+
+
+def image_digest(data: bytes) -> str:
+    """Hash raw image bytes (file contents or decoded pixels)."""
+    return hashlib.sha1(data).hexdigest()
+
+
+class OcrCache:
+    """Map (image content hash, preprocessing parameters) to recognized text.
+
+    The parameters (enhancement factors, grayscale flag, OCR language and
+    backend) are part of the key, so changing any of them misses instead of
+    returning text produced under other settings. Entries are evicted
+    least-recently-used once the stored text exceeds ``max_bytes``. The
+    database is shared by all worker processes and all scanned trees, so a
+    logo copied into five folders is recognized once.
+
+    A hit does not write to the database: its ``last_used`` time is
+    buffered and written together with the next insert or eviction pass,
+    on ``close``, or once ``TOUCH_BATCH`` hits are pending.
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.db_path = Path(db_path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._inserts = 0
+        self._touched: Dict[str, float] = {}
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS ocr (
+                key TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                params TEXT NOT NULL,
+                text TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ocr_last_used ON ocr (last_used)")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(content_hash: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps(params, sort_keys=True)
+        return hashlib.sha1(f"{content_hash}:{payload}".encode('utf-8')).hexdigest()
+
+    def get(self, content_hash: str, params: Dict[str, Any]) -> Optional[str]:
+        """Return cached text and mark the entry as recently used."""
+        key = self.make_key(content_hash, params)
+        row = self.conn.execute("SELECT text FROM ocr WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched[key] = time.time()
+        if len(self._touched) >= TOUCH_BATCH:
+            self._write_touched()
+            self.conn.commit()
+        return row[0]
+
+    def _write_touched(self) -> None:
+        """Write the buffered ``last_used`` times (the caller commits)."""
+        if self._touched:
+            self.conn.executemany("UPDATE ocr SET last_used = ? WHERE key = ?",
+                                  [(last_used, key) for key, last_used in self._touched.items()])
+            self._touched.clear()
+
+    def put(self, content_hash: str, params: Dict[str, Any], text: str) -> None:
+        """Store recognized text for an image."""
+        self._write_touched()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO ocr (key, content_hash, params, text, size, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (self.make_key(content_hash, params), content_hash, json.dumps(params, sort_keys=True),
+             text, len(text.encode('utf-8')), time.time())
+        )
+        self.conn.commit()
+        self._inserts += 1
+        if self._inserts % EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries until the cache fits ``max_bytes``."""
+        if self._touched:
+            self._write_touched()
+            self.conn.commit()
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        removed = 0
+        for key, size in self.conn.execute("SELECT key, size FROM ocr ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM ocr WHERE key = ?", (key,))
+            total -= size
+            removed += 1
+        self.conn.commit()
+        return removed
+
+    def close(self) -> None:
+        if self.conn:
+            self.evict()
+            self.conn.close()
+            self.conn = None
+
+
+_cache: Optional[OcrCache] = None
+
+
+def get_ocr_cache() -> Optional[OcrCache]:
+    """Return this process's OCR cache, or None when disabled.
+
+    ``KEAN_OCR_CACHE`` overrides the database path (``off`` disables the
+    cache) and ``KEAN_OCR_CACHE_MB`` the size budget.
+    """
+    global _cache
+    setting = os.environ.get('KEAN_OCR_CACHE', '')
+    if setting.lower() == 'off':
+        return None
+    if _cache is None:
+        max_mb = int(os.environ.get('KEAN_OCR_CACHE_MB', DEFAULT_MAX_BYTES // (1024 * 1024)))
+        _cache = OcrCache(Path(setting) if setting else DEFAULT_CACHE_PATH, max_bytes=max_mb * 1024 * 1024)
+        atexit.register(_cache.close)
+    return _cache
+
+
+def _reset_after_fork() -> None:
+    # SQLite connections must not be shared with forked worker processes
+    global _cache
+    _cache = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
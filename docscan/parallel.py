@@ -0,0 +1,653 @@
+"""Process-pool fan-out for the per-file extraction step of the scanners."""
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor
+from concurrent.futures import wait as futures_wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.connection import wait
+from typing import (Any, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence,
+                    Tuple, Union)
+
+from . import stats
+
+logger = logging.getLogger(__name__)
+
+# Scanner instance owned by each worker process (set by _init_worker)
+_worker_scanner = None
+
+# PDFs smaller than this are extracted whole without counting their pages first
+SPLIT_MIN_BYTES = 256 * 1024
+
+# Larger images are OCR'd in a task of their own
+BATCH_MAX_BYTES = 4 * 1024 * 1024
+
+# TaskFailure reasons
+TIMED_OUT = 'timed out'
+MEMORY_EXCEEDED = 'memory limit exceeded'
+WORKER_CRASHED = 'worker crashed'
+EXTRACTION_ERROR = 'extraction error'
+
+
+# A task for a worker: scanner method name (or a module-level function) and its arguments
+Task = Tuple[Union[str, Callable], Sequence[Any]]
+# A task's result, the stats counters it incremented and its duration
+Reply = Tuple[Any, Dict[str, int], float]
+
+
+class TaskFailure(NamedTuple):
+    """Result of a file whose extraction was aborted or raised (see ExtractionPool)."""
+    reason: str
+
+
+def _task_error(error: BaseException) -> TaskFailure:
+    return TaskFailure(f"{EXTRACTION_ERROR}: {error!r}")
+
+
+def _init_worker(factory: Callable[[], Any]) -> None:
+    """Build one scanner per worker so tasks only ship (path, ext) tuples."""
+    global _worker_scanner
+    # A forked worker inherits the parent's counters; only report its own
+    stats.reset()
+    _worker_scanner = factory()
+
+
+def _call_worker(task: Task) -> Reply:
+    """Run one task; returns its result, the counters it incremented and its duration.
+
+    An exception the task does not handle becomes a TaskFailure, so one bad
+    file never ends the map; MemoryError is left to the sandbox.
+    """
+    method, args = task
+    func = getattr(_worker_scanner, method) if isinstance(method, str) else method
+    start = time.perf_counter()
+    try:
+        result = func(*args)
+    except MemoryError:
+        raise
+    except Exception as e:
+        result = _task_error(e)
+    return result, stats.drain(), time.perf_counter() - start
+
+
+class _PageCount(NamedTuple):
+    """Reply of a probe task: the PDF has this many pages and is to be split."""
+    pages: int
+
+
+def _split_or_extract(method: str, args: Sequence[Any], min_pages: int) -> Any:
+    """Probe task for a large PDF: its page count if it is to be split, else its extraction.
+
+    Runs in the worker, so a PDF that hangs or crashes the parser while its
+    pages are counted is subject to the sandbox like any other task.
+    """
+    try:
+        from .pdf import pdf_page_count
+        page_count = pdf_page_count(args[0])
+    except Exception:
+        # Let the extractor report the broken file
+        page_count = 0
+    if page_count >= min_pages:
+        return _PageCount(page_count)
+    return getattr(_worker_scanner, method)(*args)
+
+
+def _batch_results(scanner: Any, method: str, args_list: Sequence[Sequence[Any]], grayscale: bool) -> List[Any]:
+    """``method(*args)`` for several image files whose OCR is prefetched as one batch.
+
+    A file whose call raises gets a TaskFailure, so it does not fail the
+    rest of its batch.
+    """
+    from .ocr import prefetch_image_files
+    func = getattr(scanner, method)
+    results = []
+    with prefetch_image_files([args[0] for args in args_list], grayscale=grayscale):
+        for args in args_list:
+            try:
+                results.append(func(*args))
+            except MemoryError:
+                raise
+            except Exception as e:
+                results.append(_task_error(e))
+    return results
+
+
+def _extract_images(method: str, args_list: Sequence[Sequence[Any]], grayscale: bool) -> List[Any]:
+    """Worker task for a batch of image files (see ImageBatch)."""
+    return _batch_results(_worker_scanner, method, args_list, grayscale)
+
+
+def _task_subject(task: Task) -> Any:
+    """What a task works on, for log messages: its file, or the files of an image batch."""
+    func, args = task
+    if func is _extract_images:
+        return ', '.join(str(file_args[0]) for file_args in args[1])
+    if func is _split_or_extract:
+        return args[1][0]
+    return args[0]
+
+
+def _limit_memory(memory_mb: Optional[int]) -> None:
+    """Cap the address space of the current process (POSIX only)."""
+    if not memory_mb:
+        return
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows; the timeout still applies there
+        return
+    limit = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _sandbox_worker(factory: Callable[[], Any], memory_mb: Optional[int], conn) -> None:
+    """Main loop of a sandboxed worker: run tasks one at a time until sent None."""
+    _limit_memory(memory_mb)
+    _init_worker(factory)
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        try:
+            reply = _call_worker(task)
+        except MemoryError:
+            stats.drain()
+            reply = (TaskFailure(MEMORY_EXCEEDED), {}, 0.0)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # The result could not be pickled; report the file as failed instead
+            conn.send((_task_error(e), reply[1], reply[2]))
+
+
+class _Sandbox:
+    """One isolated worker process, running at most one task at a time."""
+
+    def __init__(self, context, factory: Callable[[], Any], memory_mb: Optional[int]):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_sandbox_worker, args=(factory, memory_mb, child_conn),
+                                       daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.index: Optional[int] = None
+        self.subject: Any = None
+        self.deadline: Optional[float] = None
+
+    def submit(self, index: int, task: Task, timeout: Optional[float]) -> None:
+        self.index = index
+        self.subject = _task_subject(task)
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.conn.send(task)
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        if self.index is not None:
+            self.kill()
+            return
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class _Runner:
+    """Queue of tasks for worker processes; ``results`` hands back finished ones as they arrive."""
+
+    def __init__(self):
+        self.pending: Deque[Tuple[int, Task]] = deque()
+        self._next_id = 0
+
+    def submit(self, tasks: Sequence[Task], urgent: bool = False) -> List[int]:
+        """Queue tasks (``urgent`` ones ahead of the others); returns their ids."""
+        ids = list(range(self._next_id, self._next_id + len(tasks)))
+        self._next_id += len(tasks)
+        if urgent:
+            self.pending.extendleft(reversed(list(zip(ids, tasks))))
+        else:
+            self.pending.extend(zip(ids, tasks))
+        return ids
+
+    def results(self) -> List[Tuple[int, Reply]]:
+        """Wait until at least one task is done; returns ``(task id, reply)`` pairs."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+
+class _SandboxRunner(_Runner):
+    """Runs tasks in sandboxed workers, killing and replacing stuck or dead ones."""
+
+    def __init__(self, factory: Callable[[], Any], workers: int, timeout: Optional[float],
+                 memory_mb: Optional[int]):
+        super().__init__()
+        self.factory = factory
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.context = multiprocessing.get_context()
+        self.sandboxes: List[_Sandbox] = []
+
+    def results(self) -> List[Tuple[int, Reply]]:
+        for sandbox in self.sandboxes:
+            if sandbox.index is None:
+                self._dispatch(sandbox)
+        while self.pending and len(self.sandboxes) < self.workers:
+            sandbox = _Sandbox(self.context, self.factory, self.memory_mb)
+            self.sandboxes.append(sandbox)
+            self._dispatch(sandbox)
+        replies: List[Tuple[int, Reply]] = []
+        self._collect(replies)
+        return replies
+
+    def _dispatch(self, sandbox: _Sandbox) -> None:
+        """Give an idle sandbox the next task, if any."""
+        sandbox.index = None
+        if self.pending:
+            index, task = self.pending.popleft()
+            # A batch of images gets the timeout of each of its files
+            scale = len(task[1][1]) if task[0] is _extract_images else 1
+            sandbox.submit(index, task, self.timeout and self.timeout * scale)
+
+    def _collect(self, replies: List[Tuple[int, Reply]]) -> None:
+        """Wait for results or the next deadline; kill and replace stuck or dead workers."""
+        busy = {sandbox.conn: sandbox for sandbox in self.sandboxes if sandbox.index is not None}
+        if not busy:
+            return
+        deadlines = [sandbox.deadline for sandbox in busy.values() if sandbox.deadline is not None]
+        wait_time = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+
+        for conn in wait(list(busy), timeout=wait_time):
+            sandbox = busy[conn]
+            try:
+                reply = conn.recv()
+            except (EOFError, OSError):
+                logger.error(f"Extraction worker died while processing {sandbox.subject}")
+                stats.increment('extraction_crashes')
+                replies.append((sandbox.index, (TaskFailure(WORKER_CRASHED), {}, 0.0)))
+                self._replace(sandbox)
+                continue
+            if isinstance(reply[0], TaskFailure):
+                logger.error(f"Extraction of {sandbox.subject} failed: {reply[0].reason}")
+            replies.append((sandbox.index, reply))
+            self._dispatch(sandbox)
+
+        now = time.monotonic()
+        for sandbox in list(self.sandboxes):
+            if sandbox.index is not None and sandbox.deadline is not None and sandbox.deadline <= now:
+                logger.error(f"Extraction of {sandbox.subject} timed out after {self.timeout}s, "
+                             f"restarting the worker")
+                stats.increment('extraction_timeouts')
+                replies.append((sandbox.index, (TaskFailure(TIMED_OUT), {}, 0.0)))
+                self._replace(sandbox)
+
+    def _replace(self, sandbox: _Sandbox) -> None:
+        """Kill a worker and start a fresh one in its slot."""
+        sandbox.kill()
+        fresh = _Sandbox(self.context, self.factory, self.memory_mb)
+        self.sandboxes[self.sandboxes.index(sandbox)] = fresh
+        self._dispatch(fresh)
+
+    def close(self) -> None:
+        for sandbox in self.sandboxes:
+            sandbox.stop()
+
+
+class _PoolRunner(_Runner):
+    """Runs tasks in a ProcessPoolExecutor, keeping ``in_flight`` tasks per worker submitted.
+
+    A result that cannot be sent back (e.g. unpicklable) fails only its own
+    task. A worker that dies breaks the whole executor and every running
+    task with it; the executor is restarted and those tasks are retried one
+    at a time, so only the task that crashes a worker on its own fails.
+    """
+
+    def __init__(self, factory: Callable[[], Any], workers: int, in_flight: int):
+        super().__init__()
+        self.factory = factory
+        self.workers = workers
+        self.max_running = workers * max(1, in_flight)
+        self.running: Dict[Future, Tuple[int, Task, bool]] = {}
+        self.suspects: Deque[Tuple[int, Task]] = deque()
+        self.executor = self._start()
+
+    def _start(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.factory,))
+
+    def _fill(self) -> None:
+        if self.suspects:
+            if not self.running:
+                index, task = self.suspects.popleft()
+                self.running[self.executor.submit(_call_worker, task)] = (index, task, True)
+            return
+        while self.pending and len(self.running) < self.max_running:
+            index, task = self.pending.popleft()
+            self.running[self.executor.submit(_call_worker, task)] = (index, task, False)
+
+    def results(self) -> List[Tuple[int, Reply]]:
+        self._fill()
+        if not self.running:
+            return []
+        finished, _ = futures_wait(list(self.running), return_when=FIRST_COMPLETED)
+        broken = False
+        replies: List[Tuple[int, Reply]] = []
+        for future in finished:
+            index, task, suspect = self.running.pop(future)
+            try:
+                reply = future.result()
+            except BrokenProcessPool:
+                broken = True
+                if suspect:
+                    logger.error(f"Extraction worker died while processing {_task_subject(task)}")
+                    stats.increment('extraction_crashes')
+                    replies.append((index, (TaskFailure(WORKER_CRASHED), {}, 0.0)))
+                else:
+                    self.suspects.append((index, task))
+                continue
+            except Exception as e:
+                # Raised while sending the result back, e.g. an unpicklable result
+                reply = (_task_error(e), {}, 0.0)
+            if isinstance(reply[0], TaskFailure):
+                logger.error(f"Extraction of {_task_subject(task)} failed: {reply[0].reason}")
+            replies.append((index, reply))
+
+        if broken:
+            # Every task still running went down with the executor; retry them one by one
+            for future, (index, task, _) in self.running.items():
+                future.cancel()
+                self.suspects.append((index, task))
+            self.running.clear()
+            self.executor.shutdown(wait=True)
+            self.executor = self._start()
+        return replies
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """Translate a --workers value: 0 or None means one worker per core."""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, workers)
+
+
+class PdfSplit:
+    """Settings for splitting very large PDFs into page-range tasks.
+
+    Args:
+        merge: Called in the parent as ``merge(file_path, pages)`` with the
+            page texts in order (``None`` if a range failed); its return
+            value stands in for the scanner method's result for that file.
+        min_pages: Only PDFs with at least this many pages are split (0 = never).
+        pages_per_task: Pages extracted by one task.
+        ocr_scanned: OCR image-only pages inside the ranges (see docscan.pdf).
+    """
+
+    def __init__(self, merge: Callable[[Any, Optional[List[str]]], Any], min_pages: int = 200,
+                 pages_per_task: int = 50, ocr_scanned: bool = False):
+        self.merge = merge
+        self.min_pages = min_pages
+        self.pages_per_task = pages_per_task
+        self.ocr_scanned = ocr_scanned
+
+    def candidate(self, file_path) -> bool:
+        """Whether a file is large enough to be probed for its page count (see _split_or_extract)."""
+        if self.min_pages <= 0 or str(file_path).lower()[-4:] != '.pdf':
+            return False
+        try:
+            return os.path.getsize(file_path) >= SPLIT_MIN_BYTES
+        except OSError:
+            return False
+
+    def ranges(self, page_count: int) -> List[Tuple[int, int]]:
+        """Page ranges of a PDF with ``page_count`` pages."""
+        return [(start, min(start + self.pages_per_task, page_count))
+                for start in range(0, page_count, self.pages_per_task)]
+
+
+class ImageBatch:
+    """Settings for OCR-ing image files several to a task.
+
+    The scanner method still runs once per file, but the images of a task
+    are recognised as one engine batch first (see
+    docscan.ocr.prefetch_image_files), so the pytesseract fallback starts
+    one tesseract process per batch instead of one per image.
+
+    Args:
+        size: Image files per task (1 = no batching).
+        grayscale: The ``grayscale`` option the scanner OCRs images with.
+    """
+
+    def __init__(self, size: int = 8, grayscale: bool = True):
+        self.size = size
+        self.grayscale = grayscale
+
+    def candidate(self, file_path) -> bool:
+        """Whether a file is an image small enough to share a task."""
+        from .extractors import IMAGE_EXTENSIONS
+        if self.size <= 1 or os.path.splitext(str(file_path))[1].lower() not in IMAGE_EXTENSIONS:
+            return False
+        try:
+            return os.path.getsize(file_path) <= BATCH_MAX_BYTES
+        except OSError:
+            return False
+
+    def groups(self, args_list: Sequence[Sequence[Any]]) -> List[List[int]]:
+        """Positions in ``args_list`` of the image files, in batches."""
+        images = [file for file, args in enumerate(args_list) if self.candidate(args[0])]
+        return [images[start:start + self.size] for start in range(0, len(images), self.size)]
+
+
+class ExtractionPool:
+    """Run a scanner's extraction method over many files on several cores.
+
+    ``factory`` must be picklable (e.g. ``functools.partial(DocumentScanner, base_dir)``)
+    and builds the scanner instance inside every worker. Results are yielded
+    in input order, so callers can merge them into ``text_data`` and
+    ``file_types`` exactly as a sequential scan would. With a single worker
+    the calls run in-process on ``local`` (or a fresh ``factory()`` instance).
+
+    With ``pdf_split`` set and more than one worker, PDFs above its page
+    threshold are cut into page ranges that run concurrently in the same
+    pool, so one huge manual no longer decides the total scan time. The
+    pages are counted by a probe task in a worker (under the sandbox, if
+    any), never in the parent. A single worker extracts every PDF whole:
+    its ranges would run one after another, each parsing the whole file
+    again.
+
+    With ``image_batch`` set, small image files are OCR'd several to a task
+    (see ImageBatch); if such a task fails as a whole (timeout, crash), its
+    files are retried one per task.
+
+    With ``timeout`` (seconds per task) or ``memory_mb`` set, every task runs
+    in a sandboxed worker process, even with a single worker. A worker that
+    exceeds the timeout is killed and replaced, one that dies is replaced,
+    and the file's result is a ``TaskFailure`` naming the reason, so a
+    malformed PDF or a giant TIFF cannot stall the scan. In every mode an
+    exception the method raises, or a result that cannot be sent back,
+    likewise becomes a ``TaskFailure`` for that file; without the sandbox a
+    worker that dies fails only the file that crashed it (see _PoolRunner).
+    The files after it are still extracted.
+
+    ``observe`` is called as ``observe(args, seconds)`` with the extraction
+    time of every successful file (summed over the page ranges of a split
+    PDF), e.g. to learn throughput for docscan.schedule.CostModel.
+    """
+
+    def __init__(self, factory: Callable[[], Any], method: str, workers: int = 1,
+                 chunksize: int = 4, local: Any = None, pdf_split: Optional[PdfSplit] = None,
+                 timeout: Optional[float] = None, memory_mb: Optional[int] = None,
+                 observe: Optional[Callable[[Sequence[Any], float], None]] = None,
+                 image_batch: Optional[ImageBatch] = None):
+        self.factory = factory
+        self.local = local
+        self.method = method
+        self.workers = resolve_workers(workers)
+        self.chunksize = chunksize
+        self.pdf_split = pdf_split
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.observe = observe
+        self.image_batch = image_batch
+
+    @property
+    def sandboxed(self) -> bool:
+        return bool(self.timeout or self.memory_mb)
+
+    def map(self, args_list: Iterable[Sequence[Any]]) -> Iterator[Any]:
+        """Yield ``method(*args)`` for every entry of ``args_list``, in order."""
+        args_list = list(args_list)
+        if not args_list:
+            return
+        batches = self.image_batch.groups(args_list) if self.image_batch else []
+        if self.workers == 1 and not self.sandboxed:
+            scanner = self.local if self.local is not None else self.factory()
+            first_of = {members[0]: members for members in batches}
+            # Results of batched files that come later in the order, with their share of the time
+            ready: Dict[int, Tuple[Any, float]] = {}
+            for file, args in enumerate(args_list):
+                if file in first_of:
+                    members = first_of[file]
+                    start = time.perf_counter()
+                    results = _batch_results(scanner, self.method, [args_list[member] for member in members],
+                                             self.image_batch.grayscale)
+                    seconds = (time.perf_counter() - start) / len(members)
+                    for member, result in zip(members, results):
+                        if isinstance(result, TaskFailure):
+                            logger.error(f"Extraction of {args_list[member][0]} failed: {result.reason}")
+                        ready[member] = (result, seconds)
+                if file in ready:
+                    result, seconds = ready.pop(file)
+                else:
+                    start = time.perf_counter()
+                    try:
+                        result = getattr(scanner, self.method)(*args)
+                    except Exception as e:
+                        result = _task_error(e)
+                        logger.error(f"Extraction of {args[0]} failed: {result.reason}")
+                    seconds = time.perf_counter() - start
+                self._observe(args, result, seconds)
+                yield result
+            return
+
+        runner = (_SandboxRunner(self.factory, self.workers, self.timeout, self.memory_mb) if self.sandboxed
+                  else _PoolRunner(self.factory, self.workers, self.chunksize))
+        try:
+            yield from self._run(runner, args_list, self.pdf_split if self.workers > 1 else None, batches)
+        finally:
+            runner.close()
+
+    def _observe(self, args: Sequence[Any], result: Any, seconds: float) -> None:
+        if self.observe is not None and not isinstance(result, TaskFailure):
+            self.observe(args, seconds)
+
+    def _run(self, runner: _Runner, args_list: List[Sequence[Any]], split: Optional[PdfSplit],
+             batches: List[List[int]]) -> Iterator[Any]:
+        """Queue a task per file (or per batch of images) and yield the files' results in order.
+
+        A large PDF starts with a probe task (see _split_or_extract); when it
+        reports a page count, the page ranges are queued ahead of the other
+        files and their texts merged into the file's result.
+        """
+        # Every file has one task; a batch of images has one task, queued at its first file
+        first_of = {members[0]: members for members in batches}
+        batched = {member for members in batches for member in members}
+        tasks: List[Task] = []
+        task_files: List[List[int]] = []
+        for file, args in enumerate(args_list):
+            if file in first_of:
+                tasks.append((_extract_images, (self.method, [args_list[member] for member in first_of[file]],
+                                                self.image_batch.grayscale)))
+                task_files.append(first_of[file])
+            elif file not in batched:
+                tasks.append((_split_or_extract, (self.method, args, split.min_pages))
+                             if split and split.candidate(args[0]) else (self.method, args))
+                task_files.append([file])
+        file_tasks: List[List[int]] = [[] for _ in args_list]
+        owners: Dict[int, int] = {}
+        # Batch tasks and their files
+        batch_of: Dict[int, List[int]] = {}
+        for index, files in zip(runner.submit(tasks), task_files):
+            for file in files:
+                file_tasks[file] = [index]
+            if files[0] in first_of:
+                batch_of[index] = files
+            else:
+                owners[index] = files[0]
+        # Results of batched files, with their share of the batch's time
+        ready: Dict[int, Tuple[Any, float]] = {}
+        # Files being split, with the seconds their probe took
+        probed: Dict[int, float] = {}
+        done: Dict[int, Reply] = {}
+        for file, args in enumerate(args_list):
+            while file not in ready and any(index not in done for index in file_tasks[file]):
+                for index, reply in runner.results():
+                    if index in batch_of:
+                        members = batch_of.pop(index)
+                        if isinstance(reply[0], TaskFailure):
+                            # Nothing tells which image timed out or crashed the worker
+                            retries = runner.submit([(self.method, args_list[member]) for member in members],
+                                                    urgent=True)
+                            for member, retry in zip(members, retries):
+                                file_tasks[member] = [retry]
+                            continue
+                        stats.merge(reply[1])
+                        for member, result in zip(members, reply[0]):
+                            if isinstance(result, TaskFailure):
+                                logger.error(f"Extraction of {args_list[member][0]} failed: {result.reason}")
+                            ready[member] = (result, reply[2] / len(members))
+                        continue
+                    if not isinstance(reply[0], _PageCount):
+                        done[index] = reply
+                        continue
+                    owner = owners[index]
+                    stats.merge(reply[1])
+                    probed[owner] = reply[2]
+                    from .pdf import read_page_range
+                    file_tasks[owner] = runner.submit(
+                        [(read_page_range, (args_list[owner][0], start, stop, split.ocr_scanned))
+                         for start, stop in split.ranges(reply[0].pages)],
+                        urgent=True)
+            if file in ready:
+                result, seconds = ready.pop(file)
+                self._observe(args, result, seconds)
+                yield result
+                continue
+            replies = [done.pop(index) for index in file_tasks[file]]
+            if file in probed:
+                yield self._merge_pages(args, replies, probed.pop(file))
+                continue
+            result, delta, seconds = replies[0]
+            stats.merge(delta)
+            self._observe(args, result, seconds)
+            yield result
+
+    def _merge_pages(self, args: Sequence[Any], replies: List[Reply], seconds: float) -> Any:
+        """The result of a split PDF from the replies of its page-range tasks."""
+        pages = []
+        failure = None
+        for chunk, delta, elapsed in replies:
+            stats.merge(delta)
+            seconds += elapsed
+            if isinstance(chunk, TaskFailure):
+                failure = failure or chunk
+            elif chunk is None or pages is None:
+                pages = None
+            else:
+                pages.extend(chunk)
+        stats.increment('pdfs_split')
+        result = failure if failure else self.pdf_split.merge(args[0], pages)
+        self._observe(args, result, seconds)
+        return result
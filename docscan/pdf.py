@@ -0,0 +1,230 @@
+"""Page-wise PDF text extraction.
+
+Functions taking ``file_path`` also accept a seekable binary stream (e.g. a
+zip member read into ``io.BytesIO``); its ``name`` attribute, if set, is used
+in log messages.
+"""
+import io
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Union
+
+import PyPDF2
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+from . import stats
+from .textstats import TextStats, page_text_stats
+
+logger = logging.getLogger(__name__)
+
+# Pages whose text layer is shorter than this and that carry an image are treated as scanned
+SCANNED_PAGE_MAX_CHARS = 16
+RENDER_DPI = 300
+OCR_BATCH_SIZE = 8
+
+PdfSource = Union[Path, str, BinaryIO]
+
+
+def _is_stream(source: PdfSource) -> bool:
+    return hasattr(source, 'read')
+
+
+def _source_name(source: PdfSource):
+    return getattr(source, 'name', 'PDF stream') if _is_stream(source) else source
+
+
+@contextmanager
+def _open_pdf(source: PdfSource, on_bytes: Optional[Callable[[bytes], None]] = None) -> Iterator[BinaryIO]:
+    if _is_stream(source):
+        source.seek(0)
+        yield source
+    elif on_bytes is not None:
+        # Parse from the bytes handed to on_bytes (memory-mapped when large)
+        from .textfile import open_buffer
+        with open_buffer(source) as buffer:
+            on_bytes(buffer)
+            yield io.BytesIO(buffer) if isinstance(buffer, bytes) else buffer
+    else:
+        with open(source, 'rb') as file:
+            yield file
+
+
+def _image_xobjects(page) -> List:
+    """Image XObjects referenced by a page's resources (nothing is decoded)."""
+    resources = page.get('/Resources')
+    if resources is None:
+        return []
+    xobjects = resources.get_object().get('/XObject')
+    if xobjects is None:
+        return []
+    return [obj.get_object() for obj in xobjects.get_object().values()
+            if obj.get_object().get('/Subtype') == '/Image']
+
+
+def _page_has_images(page) -> bool:
+    try:
+        return bool(_image_xobjects(page))
+    except Exception:
+        return False
+
+
+def _largest_embedded_image(page):
+    """Decode the biggest image of a page; for scanned documents that is the scan itself."""
+    from PIL import Image
+
+    images = _image_xobjects(page)
+    if not images:
+        return None
+    xobject = max(images, key=lambda obj: int(obj.get('/Width', 0)) * int(obj.get('/Height', 0)))
+    data = xobject.get_data()
+
+    filters = xobject.get('/Filter')
+    if not isinstance(filters, list):
+        filters = [filters] if filters else []
+    if filters and filters[-1] in ('/DCTDecode', '/JPXDecode'):
+        return Image.open(io.BytesIO(data))
+
+    mode = {'/DeviceGray': 'L', '/DeviceRGB': 'RGB', '/DeviceCMYK': 'CMYK'}.get(xobject.get('/ColorSpace'))
+    if mode is None or xobject.get('/BitsPerComponent', 8) != 8:
+        return None
+    return Image.frombytes(mode, (int(xobject['/Width']), int(xobject['/Height'])), data)
+
+
+class _PageRasterizer:
+    """Render single pages of one PDF for OCR.
+
+    Uses pypdfium2 when installed; otherwise falls back to the largest image
+    embedded in the page, which for scanned documents is the page scan itself.
+    """
+
+    def __init__(self, file_path: PdfSource):
+        self.file_path = file_path
+        self._doc = None
+
+    def render(self, page, page_index: int):
+        if pdfium is not None:
+            if self._doc is None:
+                if _is_stream(self.file_path):
+                    # pdfium gets its own copy; PyPDF2 keeps seeking in the stream
+                    self.file_path.seek(0)
+                    self._doc = pdfium.PdfDocument(self.file_path.read())
+                else:
+                    self._doc = pdfium.PdfDocument(str(self.file_path))
+            return self._doc[page_index].render(scale=RENDER_DPI / 72).to_pil()
+        return _largest_embedded_image(page)
+
+    def close(self) -> None:
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+
+
+def _iter_pages(file_path: PdfSource, reader, indices: Iterable[int], ocr_scanned: bool) -> Iterator[str]:
+    """Yield page texts; with ``ocr_scanned`` image-only pages are OCR'd in batches.
+
+    Pages that have a text layer are never rasterized. Consecutive scanned
+    pages are collected (up to OCR_BATCH_SIZE) and recognized together, and
+    the output stays in page order.
+    """
+    rasterizer = _PageRasterizer(file_path) if ocr_scanned else None
+    batch = []
+    try:
+        for index in indices:
+            page = reader.pages[index]
+            text = page.extract_text() or ''
+            if rasterizer is None or len(text.strip()) >= SCANNED_PAGE_MAX_CHARS or not _page_has_images(page):
+                if batch:
+                    yield from _ocr_pages(file_path, batch)
+                    batch = []
+                yield text
+                continue
+
+            try:
+                image = rasterizer.render(page, index)
+            except Exception as e:
+                logger.warning(f"Could not rasterize page {index + 1} of {_source_name(file_path)}: {e}")
+                image = None
+            batch.append((index, text, image))
+            if len(batch) >= OCR_BATCH_SIZE:
+                yield from _ocr_pages(file_path, batch)
+                batch = []
+
+        if batch:
+            yield from _ocr_pages(file_path, batch)
+    finally:
+        if rasterizer is not None:
+            rasterizer.close()
+
+
+def _ocr_pages(file_path: PdfSource, batch) -> Iterator[str]:
+    """OCR a batch of rasterized pages, keeping the text layer where OCR is impossible."""
+    from .ocr import ocr_images
+
+    images = [image for _, _, image in batch if image is not None]
+    try:
+        texts = iter(ocr_images(images))
+        stats.increment('pdf_pages_ocred', len(images))
+    except Exception as e:
+        logger.error(f"OCR failed for scanned pages of {_source_name(file_path)}: {e}")
+        texts = iter([None] * len(images))
+
+    for _, layer_text, image in batch:
+        ocr_text = next(texts) if image is not None else None
+        yield ocr_text if ocr_text else layer_text
+
+
+def iter_pdf_pages(file_path: PdfSource, max_pages: Optional[int] = None,
+                   ocr_scanned: bool = False,
+                   on_bytes: Optional[Callable[[bytes], None]] = None) -> Iterator[str]:
+    """Yield the text of each page in order.
+
+    Only one page's text is held at a time. Stopping the iteration early (or
+    passing ``max_pages``) closes the file without parsing the remaining pages.
+    With ``ocr_scanned`` pages without a text layer are OCR'd. ``on_bytes``
+    gets the bytes of a PDF file (read or memory-mapped) before it is
+    parsed from them, e.g. to hash them.
+    """
+    with _open_pdf(file_path, on_bytes) as file:
+        reader = PyPDF2.PdfReader(file)
+        page_count = len(reader.pages)
+        if max_pages is not None:
+            page_count = min(page_count, max_pages)
+        yield from _iter_pages(file_path, reader, range(page_count), ocr_scanned)
+
+
+def pdf_page_count(file_path: PdfSource) -> int:
+    """Number of pages, without extracting any text."""
+    with _open_pdf(file_path) as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def read_page_range(file_path: PdfSource, start: int, stop: int,
+                    ocr_scanned: bool = False) -> Optional[List[str]]:
+    """Texts of pages ``start``..``stop - 1`` (None if the PDF cannot be read).
+
+    Used as a task for splitting very large PDFs across worker processes.
+    """
+    try:
+        with _open_pdf(file_path) as file:
+            reader = PyPDF2.PdfReader(file)
+            return list(_iter_pages(file_path, reader, range(start, stop), ocr_scanned))
+    except Exception as e:
+        logger.error(f"Error processing PDF {_source_name(file_path)} pages {start}-{stop}: {e}")
+        return None
+
+
+def read_pdf_text(file_path: PdfSource, ocr_scanned: bool = False) -> str:
+    """Return the whole document text (pages joined by newlines, stripped)."""
+    return '\n'.join(iter_pdf_pages(file_path, ocr_scanned=ocr_scanned)).strip()
+
+
+def pdf_text_stats(file_path: PdfSource, preview_chars: int = 500,
+                   on_page: Optional[Callable[[str], None]] = None,
+                   ocr_scanned: bool = False) -> TextStats:
+    """``page_text_stats`` over a PDF file, streaming its pages."""
+    return page_text_stats(iter_pdf_pages(file_path, ocr_scanned=ocr_scanned), preview_chars, on_page)
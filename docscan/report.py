@@ -0,0 +1,71 @@
+"""Streaming (NDJSON) scan reports."""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+
+class NdjsonReport:
+    """Write one JSON line per document while the scan is running.
+
+    Documents go to ``<stem>.ndjson`` and are flushed as they are written, so
+    memory stays flat and a crashed scan leaves every finished document on
+    disk. ``finish`` writes the small ``<stem>.summary.json`` at the end,
+    via a temporary file so a summary is either complete or absent.
+
+    Args:
+        results_dir: Directory the report files are written to
+        stem: File name without extension, e.g. ``document_analysis_20240101_120000``
+    """
+
+    def __init__(self, results_dir: Path, stem: str):
+        self.documents_path = Path(results_dir) / f"{stem}.ndjson"
+        self.summary_path = Path(results_dir) / f"{stem}.summary.json"
+        self.count = 0
+        self._file: Optional[TextIO] = None
+
+    def open(self) -> 'NdjsonReport':
+        self.documents_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.documents_path, 'w', encoding='utf-8')
+        self.count = 0
+        return self
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Append one document."""
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        self._file.flush()
+        self.count += 1
+
+    def finish(self, summary: Dict[str, Any]) -> None:
+        """Close the document stream and write the summary."""
+        self.close()
+        summary = dict(summary, documents_file=self.documents_path.name, documents_written=self.count)
+        tmp_path = self.summary_path.with_name(self.summary_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False, default=str)
+        os.replace(tmp_path, self.summary_path)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'NdjsonReport':
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def iter_ndjson(path: Path) -> Iterator[Dict[str, Any]]:
+    """Read the records of an NDJSON report back one at a time.
+
+    A truncated last line (the scan died mid-write) is ignored.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                if line.endswith('\n'):
+                    raise
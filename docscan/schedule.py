@@ -0,0 +1,112 @@
+"""Cost estimates for extraction tasks, and a progress line with an ETA."""
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default cost per extension: (seconds per file, seconds per MB). Plain text
+# is read at disk speed, office formats are unzipped and parsed, PDFs are
+# parsed page by page and images go through OCR.
+_TEXT = (0.001, 0.02)
+_OFFICE = (0.02, 0.2)
+_PDF = (0.05, 1.0)
+_IMAGE = (1.0, 0.5)
+DEFAULT_COSTS: Dict[str, Tuple[float, float]] = {
+    '.txt': _TEXT, '.md': _TEXT, '.json': _TEXT, '.html': _TEXT,
+    '.docx': _OFFICE, '.doc': _OFFICE, '.odt': _OFFICE, '.rtf': _OFFICE,
+    '.xlsx': _OFFICE, '.xlsm': _OFFICE, '.pptx': _OFFICE,
+    '.pdf': _PDF,
+    '.jpg': _IMAGE, '.jpeg': _IMAGE, '.png': _IMAGE, '.bmp': _IMAGE, '.tiff': _IMAGE,
+}
+UNKNOWN_COST = _OFFICE
+
+# Observed throughput replaces the default once this many files were timed
+MIN_OBSERVED_FILES = 3
+
+# Weight of older runs when this run's timings are folded into the stored ones
+HISTORY_DECAY = 0.5
+
+_MB = 1024 * 1024
+
+
+class CostModel:
+    """Estimate how many seconds a file takes to extract.
+
+    The estimate is ``per_file + per_mb * size`` for the file's extension.
+    Defaults come from ``DEFAULT_COSTS``; throughput observed in earlier runs
+    (``history``: extension -> ``[files, bytes, seconds]``, as stored by
+    ``ScanCatalog.store_throughput``) replaces the per-MB rate once enough
+    files of an extension were timed. ``observe`` records this run's timings,
+    ``merged_history`` folds them into the history for the next run.
+    """
+
+    def __init__(self, history: Optional[Dict[str, List[float]]] = None):
+        self.history = history or {}
+        self.observed: Dict[str, List[float]] = {}
+        self._costs: Dict[str, Tuple[float, float]] = {}
+        for ext, (files, size, seconds) in self.history.items():
+            if files >= MIN_OBSERVED_FILES and size > 0:
+                per_file = DEFAULT_COSTS.get(ext, UNKNOWN_COST)[0]
+                self._costs[ext] = (per_file, max(seconds - files * per_file, 0.0) / (size / _MB))
+
+    def estimate(self, ext: str, size: int) -> float:
+        per_file, per_mb = self._costs.get(ext) or DEFAULT_COSTS.get(ext, UNKNOWN_COST)
+        return per_file + per_mb * size / _MB
+
+    def observe(self, ext: str, size: int, seconds: float) -> None:
+        totals = self.observed.setdefault(ext, [0, 0, 0.0])
+        totals[0] += 1
+        totals[1] += size
+        totals[2] += seconds
+
+    def merged_history(self) -> Dict[str, List[float]]:
+        """History including this run; older timings of the extensions timed now are weighted down."""
+        merged = dict(self.history)
+        for ext, totals in self.observed.items():
+            previous = merged.get(ext, [0, 0, 0.0])
+            merged[ext] = [old * HISTORY_DECAY + new for old, new in zip(previous, totals)]
+        return merged
+
+
+class Progress:
+    """Log a progress line with an ETA at most every ``interval`` seconds.
+
+    Work is measured in estimated seconds (see ``CostModel``), and the ETA
+    scales the remaining estimate by how fast the estimated work has
+    actually been completed so far, so it corrects itself for the machine,
+    the worker count and a model that is off by a constant factor.
+    """
+
+    def __init__(self, total_files: int, total_cost: float, interval: float = 5.0):
+        self.total_files = total_files
+        self.total_cost = total_cost
+        self.interval = interval
+        self.files = 0
+        self.cost = 0.0
+        self.started = time.monotonic()
+        self._last_log = self.started
+
+    def advance(self, cost: float) -> None:
+        self.files += 1
+        self.cost += cost
+        now = time.monotonic()
+        if now - self._last_log >= self.interval or self.files == self.total_files:
+            self._last_log = now
+            logger.info(self.line(now))
+
+    def eta(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds until all work is done, or None before any estimated work is done."""
+        if self.cost <= 0:
+            return None
+        elapsed = (now or time.monotonic()) - self.started
+        return elapsed * max(self.total_cost - self.cost, 0.0) / self.cost
+
+    def line(self, now: Optional[float] = None) -> str:
+        now = now or time.monotonic()
+        percent = 100.0 * self.cost / self.total_cost if self.total_cost else 100.0
+        eta = self.eta(now)
+        return (f"Progress: {self.files:,}/{self.total_files:,} files ({percent:.1f}% of estimated work), "
+                f"elapsed {timedelta(seconds=round(now - self.started))}, "
+                f"ETA {timedelta(seconds=round(eta)) if eta is not None else 'unknown'}")
@@ -0,0 +1,331 @@
+"""Full-text index of scanned documents (SQLite FTS5) with BM25-ranked search.
+
+Run ``python -m docscan.search "query"`` to search an index from the command
+line; see ``main`` for the options.
+"""
+import argparse
+import re
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+DEFAULT_INDEX = Path('document_analysis') / 'search_index.sqlite'
+
+# Bump when the schema or the way texts are split changes
+INDEX_VERSION = 1
+
+# Texts are indexed in pieces of about this many characters; a document
+# ranks by its best piece, and snippets come from that piece
+INDEX_CHUNK_CHARS = 64 * 1024
+# Text of a document being extracted is spooled to disk beyond this size
+SPOOL_BYTES = 8 * 1024 * 1024
+
+# Piece rowids are ``doc_id << _CHUNK_BITS | piece number``, so the pieces of a
+# document are one rowid range (deleted without scanning the FTS table)
+_CHUNK_BITS = 20
+
+_TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+class SearchHit(NamedTuple):
+    path: str
+    faculty: Optional[str]
+    ext: str
+    score: float
+    snippet: str
+
+
+def _normalize_ext(ext: Optional[str]) -> Optional[str]:
+    if not ext:
+        return None
+    ext = ext.lower()
+    return ext if ext.startswith('.') else '.' + ext
+
+
+def match_expression(query: str) -> str:
+    """FTS5 expression for a plain query: all words must occur.
+
+    "Quoted words" match as a phrase, a trailing '*' makes a word a prefix
+    and OR between two terms matches either. Everything else is quoted, so
+    punctuation in a query (c++, e-mail) never is an FTS5 syntax error.
+    """
+    terms = []
+    for match in _TERM_RE.finditer(query):
+        phrase, word = match.groups()
+        if word == 'OR' and terms and terms[-1] != 'OR':
+            terms.append('OR')
+            continue
+        text = phrase if phrase is not None else word
+        prefix = phrase is None and text.endswith('*') and len(text) > 1
+        text = text.rstrip('*') if prefix else text
+        if not text.strip():
+            continue
+        terms.append('"' + text.replace('"', '""') + '"' + ('*' if prefix else ''))
+    if terms and terms[-1] == 'OR':
+        terms.pop()
+    return ' '.join(terms)
+
+
+class DocumentWriter:
+    """Collects the text of one document; ``commit`` replaces its index entry.
+
+    Text passed to ``write`` is spooled (in memory, on disk beyond
+    ``SPOOL_BYTES``) rather than written to the index as it arrives, so the
+    database is only locked for the short write in ``commit`` and not for
+    the whole extraction. Leaving the ``with`` block without ``commit``
+    discards the text and keeps the previous entry.
+    """
+
+    def __init__(self, index: 'SearchIndex', rel_path: str, ext: str, size: int, mtime_ns: int):
+        self.index = index
+        self.rel_path = rel_path
+        self.ext = ext
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self._spool = tempfile.SpooledTemporaryFile(SPOOL_BYTES, mode='w+', encoding='utf-8',
+                                                    errors='surrogatepass')
+
+    def __enter__(self) -> 'DocumentWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._spool.close()
+
+    def write(self, text: str) -> None:
+        self._spool.write(text)
+
+    def restart(self) -> None:
+        """Drop the text written so far; the document's text starts over."""
+        self._spool.seek(0)
+        self._spool.truncate()
+
+    def _pieces(self) -> Iterable[str]:
+        """The spooled text in pieces of about INDEX_CHUNK_CHARS, cut between words."""
+        self._spool.seek(0)
+        text = ''
+        while True:
+            data = self._spool.read(INDEX_CHUNK_CHARS)
+            if not data:
+                break
+            text += data
+            while len(text) >= INDEX_CHUNK_CHARS:
+                cut = max(text.rfind(' ', 0, INDEX_CHUNK_CHARS), text.rfind('\n', 0, INDEX_CHUNK_CHARS)) + 1
+                if cut == 0:
+                    cut = INDEX_CHUNK_CHARS
+                yield text[:cut]
+                text = text[cut:]
+        if text.strip():
+            yield text
+
+    def commit(self, faculty: Optional[str] = None) -> None:
+        """Replace the document's entry with the written text."""
+        conn = self.index.connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT id FROM documents WHERE rel_path = ?", (self.rel_path,)).fetchone()
+            if row is None:
+                doc_id = conn.execute(
+                    "INSERT INTO documents (rel_path, ext, faculty, size, mtime_ns, indexed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.rel_path, self.ext, faculty, self.size, self.mtime_ns, time.time())
+                ).lastrowid
+            else:
+                doc_id = row[0]
+                self.index._delete_pieces(doc_id)
+                conn.execute(
+                    "UPDATE documents SET ext = ?, faculty = ?, size = ?, mtime_ns = ?, indexed_at = ? "
+                    "WHERE id = ?",
+                    (self.ext, faculty, self.size, self.mtime_ns, time.time(), doc_id)
+                )
+            for number, piece in enumerate(self._pieces()):
+                if number >> _CHUNK_BITS:
+                    break
+                conn.execute("INSERT INTO chunks (rowid, text) VALUES (?, ?)",
+                             ((doc_id << _CHUNK_BITS) | number, piece))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+class SearchIndex:
+    """Inverted index of document texts in an SQLite FTS5 table.
+
+    Documents are keyed by their path relative to the scanned directory and
+    remember the size and mtime_ns of the indexed file, so scanners only
+    re-index files that changed (``indexed``) and drop the ones that are
+    gone (``prune``). Several processes may write to the same index (each
+    extraction worker indexes its own files); the database is in WAL mode,
+    so searches are not blocked by a running scan.
+
+    Args:
+        db_path: Index database (created if missing)
+        busy_timeout: Seconds a writer waits for another process's write to finish
+    """
+
+    def __init__(self, db_path: Path, busy_timeout: float = 300.0):
+        self.db_path = Path(db_path)
+        self.busy_timeout = busy_timeout
+        self.conn: Optional[sqlite3.Connection] = None
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the index (once), creating the schema if needed."""
+        if self.conn is not None:
+            return self.conn
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Transactions are explicit (see DocumentWriter.commit)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=self.busy_timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != INDEX_VERSION:
+            self.conn.execute("DROP TABLE IF EXISTS documents")
+            self.conn.execute("DROP TABLE IF EXISTS chunks")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                rel_path TEXT UNIQUE NOT NULL,
+                ext TEXT NOT NULL,
+                faculty TEXT,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                indexed_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS chunks "
+            "USING fts5(text, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        self.conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        return self.conn
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self) -> 'SearchIndex':
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def writer(self, rel_path: str, ext: str, size: int, mtime_ns: int) -> DocumentWriter:
+        """Start (re-)indexing a document; use as a context manager."""
+        return DocumentWriter(self, rel_path, ext, size, mtime_ns)
+
+    def indexed(self) -> Dict[str, Tuple[int, int]]:
+        """``(size, mtime_ns)`` of every indexed document by relative path."""
+        return {row[0]: (row[1], row[2])
+                for row in self.connect().execute("SELECT rel_path, size, mtime_ns FROM documents")}
+
+    def touch(self, rel_path: str, size: int, mtime_ns: int) -> None:
+        """Give an indexed document a new version without re-indexing it (its content is unchanged)."""
+        self.connect().execute("UPDATE documents SET size = ?, mtime_ns = ? WHERE rel_path = ?",
+                               (size, mtime_ns, rel_path))
+
+    def _delete_pieces(self, doc_id: int) -> None:
+        self.conn.execute("DELETE FROM chunks WHERE rowid BETWEEN ? AND ?",
+                          (doc_id << _CHUNK_BITS, ((doc_id + 1) << _CHUNK_BITS) - 1))
+
+    def prune(self, keep: Iterable[str]) -> int:
+        """Remove documents whose path is not in ``keep`` (files that no longer exist)."""
+        keep = set(keep)
+        conn = self.connect()
+        stale = [(doc_id, rel_path) for doc_id, rel_path in conn.execute("SELECT id, rel_path FROM documents")
+                 if rel_path not in keep]
+        if stale:
+            conn.execute("BEGIN IMMEDIATE")
+            for doc_id, _ in stale:
+                self._delete_pieces(doc_id)
+            conn.executemany("DELETE FROM documents WHERE id = ?", [(doc_id,) for doc_id, _ in stale])
+            conn.execute("COMMIT")
+        return len(stale)
+
+    def search(self, query: str, faculty: Optional[str] = None, ext: Optional[str] = None,
+               limit: int = 20, markers: Tuple[str, str] = ('[', ']'), snippet_words: int = 16) -> List[SearchHit]:
+        """Documents matching ``query`` (see ``match_expression``), best BM25 score first.
+
+        A document's score is that of its best-matching piece (higher is
+        better); the snippet shows the matched terms of that piece between
+        ``markers``.
+        """
+        expression = match_expression(query)
+        if not expression:
+            return []
+        conn = self.connect()
+        # Scores only; snippets are built for the hits that are returned
+        rows = conn.execute(
+            f"""
+            WITH hits AS MATERIALIZED (
+                SELECT rowid, -bm25(chunks) AS score FROM chunks WHERE chunks MATCH ?
+            )
+            SELECT d.rel_path, d.faculty, d.ext, MAX(hits.score) AS best, hits.rowid
+            FROM hits JOIN documents d ON d.id = hits.rowid >> {_CHUNK_BITS}
+            WHERE (? IS NULL OR d.faculty = ?) AND (? IS NULL OR d.ext = ?)
+            GROUP BY d.id
+            ORDER BY best DESC
+            LIMIT ?
+            """,
+            (expression, faculty, faculty, _normalize_ext(ext), _normalize_ext(ext), limit)
+        ).fetchall()
+
+        hits = []
+        for rel_path, doc_faculty, doc_ext, score, rowid in rows:
+            snippet = conn.execute(
+                "SELECT snippet(chunks, 0, ?, ?, '...', ?) FROM chunks WHERE chunks MATCH ? AND rowid = ?",
+                (markers[0], markers[1], snippet_words, expression, rowid)
+            ).fetchone()[0]
+            hits.append(SearchHit(rel_path, doc_faculty, doc_ext, score, ' '.join(snippet.split())))
+        return hits
+
+    def stats(self) -> Dict[str, int]:
+        conn = self.connect()
+        return {
+            'documents': conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0],
+            'pieces': conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        }
+
+
+def search(query: str, faculty: Optional[str] = None, ext: Optional[str] = None,
+           index_path: Path = DEFAULT_INDEX, limit: int = 20) -> List[SearchHit]:
+    """Search an index written by the scanners (see SearchIndex.search)."""
+    if not Path(index_path).exists():
+        raise FileNotFoundError(f"No search index at {index_path}; run a document scan first")
+    with SearchIndex(index_path) as index:
+        return index.search(query, faculty=faculty, ext=ext, limit=limit)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Search the full-text index of scanned documents.")
+    parser.add_argument('query', help='Words to find; "quoted words" for a phrase, word* for a prefix, '
+                                      'OR between two terms for either')
+    parser.add_argument('--index', type=Path, default=DEFAULT_INDEX,
+                        help="Index database written by a scan (default: %(default)s)")
+    parser.add_argument('--faculty', help="Only documents of this faculty")
+    parser.add_argument('--ext', help="Only files with this extension (e.g. pdf)")
+    parser.add_argument('--limit', type=int, default=20, help="Maximum number of results")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    started = time.perf_counter()
+    try:
+        hits = search(args.query, faculty=args.faculty, ext=args.ext, index_path=args.index, limit=args.limit)
+    except (FileNotFoundError, sqlite3.Error) as e:
+        print(f"Search failed: {e}")
+        return 1
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    for rank, hit in enumerate(hits, 1):
+        print(f"{rank}. {hit.path}  [{hit.faculty or '-'}, {hit.ext}]  score {hit.score:.3g}")
+        print(f"   {hit.snippet}")
+    print(f"{len(hits)} result{'s' if len(hits) != 1 else ''} in {elapsed_ms:.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
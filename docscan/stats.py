@@ -0,0 +1,34 @@
+"""Process-local scan counters.
+
+Extraction code increments counters wherever it runs; ExtractionPool ships
+each worker's increments back with the task result, so the parent scan can
+report totals (e.g. images skipped by the OCR prefilter) in one place.
+"""
+from collections import Counter
+from typing import Dict
+
+counters: Counter = Counter()
+
+
+def increment(name: str, amount: int = 1) -> None:
+    counters[name] += amount
+
+
+def drain() -> Dict[str, int]:
+    """Return and clear the counters accumulated in this process."""
+    snapshot = dict(counters)
+    counters.clear()
+    return snapshot
+
+
+def merge(delta: Dict[str, int]) -> None:
+    """Add counters reported by a worker process."""
+    counters.update(delta)
+
+
+def reset() -> None:
+    counters.clear()
+
+
+def snapshot() -> Dict[str, int]:
+    return dict(counters)
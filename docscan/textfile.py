@@ -0,0 +1,163 @@
+"""Single-pass reading of plain-text files: one read (or mmap), decoded while it is streamed."""
+import codecs
+import mmap
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Union
+
+from .textstats import TextStats
+
+PLAIN_TEXT_EXTENSIONS = {'.txt', '.md', '.json', '.html', '.csv', '.rtf'}
+
+# Files at least this large are memory-mapped instead of read into memory
+MMAP_MIN_BYTES = 16 * 1024 * 1024
+# Bytes decoded per chunk
+CHUNK_BYTES = 1024 * 1024
+# A run of letters and digits longer than this (base64, hex dumps) may be split across chunks
+MAX_WORD_CHARS = 64 * 1024
+
+_BOMS_UTF16 = (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+def decode_bytes(data: bytes) -> str:
+    """Decode a whole file's bytes like ``iter_text_chunks``: UTF-16 with its BOM, else UTF-8, else latin-1."""
+    if data[:2] in _BOMS_UTF16:
+        return data.decode('utf-16')
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('latin-1')
+
+
+@contextmanager
+def open_buffer(file_path: Union[str, Path]) -> Iterator[Buffer]:
+    """The file's bytes: read in one go, or memory-mapped from ``MMAP_MIN_BYTES`` on."""
+    with open(file_path, 'rb') as f:
+        size = f.seek(0, 2)
+        f.seek(0)
+        if size < MMAP_MIN_BYTES or size == 0:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def _split_point(text: str) -> int:
+    """Where to cut ``text`` so that no word and no '\\r\\n' straddles the cut."""
+    cut = max(text.rfind(' '), text.rfind('\n'), text.rfind('\t'), text.rfind('\r')) + 1
+    if cut == 0:
+        # No whitespace (minified JSON): cut in front of the trailing run of letters and digits
+        cut = len(text)
+        limit = max(cut - MAX_WORD_CHARS, 0)
+        while cut > limit and text[cut - 1].isalnum():
+            cut -= 1
+        if cut == limit:
+            # Keep carrying a short run, split an overlong one
+            return len(text) if limit else 0
+    if text[cut - 1] == '\r':
+        # Its '\n' may start the next slice
+        cut -= 1
+    return cut
+
+
+def _normalize_newlines(text: str) -> str:
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def iter_text_chunks(buffer: Buffer, encoding: Optional[str] = None,
+                     on_restart: Optional[Callable[[], None]] = None) -> Iterator[str]:
+    """Decode ``buffer`` slice by slice into chunks that end between words.
+
+    Newlines are normalized to '\\n' like text-mode ``open()`` does, so the
+    chunks joined equal the file read in text mode.
+
+    Without ``encoding`` the buffer is decoded as UTF-16 if it starts with
+    that byte order mark, else optimistically as UTF-8 in the same pass
+    (a UTF-8 byte order mark is kept as part of the text, as a text-mode
+    ``open(..., encoding='utf-8')`` does). At the first byte that is not
+    valid UTF-8 decoding switches to latin-1: in place if every byte before
+    the slice was ASCII, which both encodings decode alike, else from the
+    start of the buffer, after calling ``on_restart`` to say that the
+    chunks yielded so far are void.
+    """
+    optimistic = False
+    if encoding is None:
+        encoding = 'utf-16' if buffer[:2] in _BOMS_UTF16 else 'utf-8'
+        optimistic = encoding == 'utf-8'
+    decoder = codecs.getincrementaldecoder(encoding)()
+    carry = ''
+    ascii_prefix = True
+    start = 0
+    while start < len(buffer):
+        data = buffer[start:start + CHUNK_BYTES]
+        try:
+            text = decoder.decode(data)
+        except UnicodeDecodeError:
+            if not optimistic:
+                raise
+            optimistic = False
+            decoder = codecs.getincrementaldecoder('latin-1')()
+            if not ascii_prefix:
+                if on_restart is not None:
+                    on_restart()
+                carry = ''
+                start = 0
+                continue
+            text = decoder.decode(data)
+        if optimistic and ascii_prefix:
+            ascii_prefix = data.isascii()
+        start += CHUNK_BYTES
+        text = carry + text
+        cut = _split_point(text)
+        chunk, carry = text[:cut], text[cut:]
+        if chunk:
+            yield _normalize_newlines(chunk)
+    try:
+        text = carry + decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        # Truncated multi-byte sequence at the end of the file
+        if not optimistic:
+            raise
+        if on_restart is not None:
+            on_restart()
+        yield from iter_text_chunks(buffer, 'latin-1')
+        return
+    if text:
+        yield _normalize_newlines(text)
+
+
+def text_file_stats(file_path: Union[str, Path], preview_chars: int = 500,
+                    on_chunk: Optional[Callable[[str], None]] = None, strip: bool = True,
+                    on_bytes: Optional[Callable[[Buffer], None]] = None,
+                    on_restart: Optional[Callable[[], None]] = None) -> TextStats:
+    """Word/char/line counts and preview of a plain-text file in one streaming pass.
+
+    ``on_chunk`` sees every decoded chunk (e.g. to count keywords); no
+    chunk ends inside a word. ``on_bytes`` gets the file's bytes (read or
+    mapped) once, e.g. to hash them without reading the file again. With
+    ``strip=False`` leading and trailing whitespace is counted too (see
+    TextStats).
+
+    The file is decoded in the same pass (see iter_text_chunks). In the
+    rare case that it turns out not to be UTF-8 after non-ASCII text was
+    already passed on, ``on_restart`` is called and the chunks start over
+    from the beginning as latin-1; ``on_chunk`` consumers reset there.
+    """
+    text_stats = TextStats(preview_chars, strip=strip)
+
+    def restart() -> None:
+        nonlocal text_stats
+        text_stats = TextStats(preview_chars, strip=strip)
+        if on_restart is not None:
+            on_restart()
+
+    with open_buffer(file_path) as buffer:
+        if on_bytes is not None:
+            on_bytes(buffer)
+        for chunk in iter_text_chunks(buffer, on_restart=restart):
+            text_stats.feed(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk)
+    return text_stats
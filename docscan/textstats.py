@@ -0,0 +1,106 @@
+"""Incremental text metrics for extractors that produce text piece by piece."""
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class TextStats:
+    """Count words, characters and lines of a text fed in chunks.
+
+    The totals equal ``len(text.split())``, ``len(text)`` and
+    ``text.count('\\n') + 1`` of ``''.join(chunks).strip()``, and
+    ``preview`` equals its first ``preview_chars`` characters, without the
+    joined string ever being built. With ``strip=False`` they describe the
+    joined text as is, leading and trailing whitespace included.
+    """
+
+    def __init__(self, preview_chars: int = 500, strip: bool = True):
+        self.preview_chars = preview_chars
+        self.strip = strip
+        self.words = 0
+        self.chars = 0
+        self.newlines = 0
+        self._preview: List[str] = []
+        self._preview_len = 0
+        self._started = False
+        self._in_word = False
+        # Trailing whitespace is only counted once more text follows it (strip semantics)
+        self._pending = ''
+
+    def feed(self, chunk: str) -> None:
+        """Add the next piece of text."""
+        if not chunk:
+            return
+        if not self.strip:
+            self._count(chunk)
+            return
+        if not self._started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return
+            self._started = True
+
+        body = chunk.rstrip()
+        if not body:
+            self._pending += chunk
+            return
+
+        if self._pending:
+            self._count(self._pending)
+            self._pending = ''
+        self._count(body)
+        self._pending = chunk[len(body):]
+
+    def _count(self, text: str) -> None:
+        self.chars += len(text)
+        self.newlines += text.count('\n')
+
+        words = len(text.split())
+        if words and self._in_word and not text[0].isspace():
+            # The first token continues the word that ended the previous chunk
+            words -= 1
+        self.words += words
+        self._in_word = not text[-1].isspace()
+
+        if self._preview_len <= self.preview_chars:
+            piece = text[:self.preview_chars + 1 - self._preview_len]
+            self._preview.append(piece)
+            self._preview_len += len(piece)
+
+    @property
+    def empty(self) -> bool:
+        return self.chars == 0
+
+    @property
+    def lines(self) -> int:
+        return self.newlines + 1
+
+    @property
+    def preview(self) -> str:
+        """First ``preview_chars`` characters, with '...' appended if the text is longer."""
+        text = ''.join(self._preview)
+        if len(text) > self.preview_chars:
+            return text[:self.preview_chars] + '...'
+        return text
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'words': self.words,
+            'chars': self.chars,
+            'lines': self.lines,
+            'content_preview': self.preview
+        }
+
+
+def page_text_stats(pages: Iterable[str], preview_chars: int = 500,
+                    on_page: Optional[Callable[[str], None]] = None) -> TextStats:
+    """Compute word/char/line counts and a preview without joining the pages.
+
+    ``on_page`` is called with every page's text, e.g. to count keywords
+    page by page.
+    """
+    text_stats = TextStats(preview_chars)
+    for page_text in pages:
+        text_stats.feed(page_text)
+        text_stats.feed('\n')
+        if on_page is not None:
+            on_page(page_text)
+    return text_stats
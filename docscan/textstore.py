@@ -0,0 +1,78 @@
+"""Spill-to-disk storage for extracted texts."""
+import os
+import shutil
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional
+
+# Texts are encoded and compressed in slices of this many characters
+CHUNK_CHARS = 1024 * 1024
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+
+
+class TextStore:
+    """Append-only, compressed store for texts that should not stay in memory.
+
+    Every text is zlib-compressed (slice by slice, so a large text is never
+    encoded in one piece) and appended to the current segment file; segments
+    roll over at ``segment_bytes``. ``put`` returns a small JSON-serializable
+    reference ``[segment, offset, length]`` that ``get`` resolves, so callers
+    keep only references in memory.
+
+    Args:
+        directory: Directory for the segment files (created if missing)
+        segment_bytes: Size after which a new segment file is started
+    """
+
+    def __init__(self, directory: Path, segment_bytes: int = DEFAULT_SEGMENT_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self._segment = -1
+        self._writer: Optional[BinaryIO] = None
+        self._readers: Dict[int, BinaryIO] = {}
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.directory / f"segment_{segment:05d}.z"
+
+    def put(self, text: str) -> List[int]:
+        """Store a text and return its reference."""
+        if self._writer is None or self._writer.tell() >= self.segment_bytes:
+            if self._writer is not None:
+                self._writer.close()
+            self._segment += 1
+            self._writer = open(self._segment_path(self._segment), 'wb')
+
+        offset = self._writer.tell()
+        compressor = zlib.compressobj()
+        for start in range(0, len(text), CHUNK_CHARS):
+            self._writer.write(compressor.compress(text[start:start + CHUNK_CHARS].encode('utf-8', 'surrogatepass')))
+        self._writer.write(compressor.flush())
+        return [self._segment, offset, self._writer.tell() - offset]
+
+    def get(self, ref: List[int]) -> str:
+        """Load a stored text."""
+        segment, offset, length = ref
+        if segment == self._segment and self._writer is not None:
+            self._writer.flush()
+        reader = self._readers.get(segment)
+        if reader is None:
+            reader = self._readers[segment] = open(self._segment_path(segment), 'rb')
+        reader.seek(offset)
+        return zlib.decompress(reader.read(length)).decode('utf-8', 'surrogatepass')
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for reader in self._readers.values():
+            reader.close()
+        self._readers.clear()
+
+    def remove(self) -> None:
+        """Close the store and delete its segment files."""
+        self.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def size_on_disk(self) -> int:
+        return sum(os.path.getsize(path) for path in self.directory.glob('segment_*.z'))
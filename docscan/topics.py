@@ -0,0 +1,230 @@
+"""TF-IDF topic terms of documents and document groups, updated incrementally between scans.
+
+Needs scikit-learn (and with it numpy and scipy); the scanners import this
+module on first use, so a scan without topics does not need them.
+"""
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, CountVectorizer, TfidfTransformer
+
+from .catalog import config_signature
+
+logger = logging.getLogger(__name__)
+
+# Words of at least three letters; numbers, codes and dates are not topics
+TOKEN_PATTERN = r"(?u)\b[^\W\d_]{3,}\b"
+
+GERMAN_STOP_WORDS = frozenset("""
+    aber alle allem allen aller alles als also am an ander andere anderem anderen anderer anderes auch auf aus
+    bei beim bin bis bist da dabei damit dann das dass dein deine dem den denn der deren des dessen dich die dies
+    diese diesem diesen dieser dieses dir doch dort du durch ein eine einem einen einer eines einige er es etwas
+    euch euer für gegen gewesen hab habe haben hat hatte hatten hier hin hinter ich ihm ihn ihnen ihr ihre ihrem
+    ihren ihrer ihres im in indem ins ist jede jedem jeden jeder jedes jetzt kann kein keine keinem keinen keiner
+    können könnte machen man manche mehr mein meine mich mir mit muss musste nach nicht nichts noch nun nur ob
+    oder ohne sehr sein seine seinem seinen seiner sich sie sind so solche soll sollte sondern sonst über um und
+    uns unser unter viel vom von vor war waren warum was weil welche welchem welchen welcher welches wenn werde
+    werden wie wieder will wir wird wo wollen worden wurde wurden zu zum zur zwar zwischen
+""".split())
+STOP_WORDS = ENGLISH_STOP_WORDS | GERMAN_STOP_WORDS
+
+# Stored with the model; a model counted with other settings is started afresh
+MODEL_VERSION = 1
+TOPIC_SETTINGS = config_signature('topics', MODEL_VERSION, TOKEN_PATTERN, sorted(STOP_WORDS))
+
+DEFAULT_TOP_TERMS = 10
+# Scanners collect the texts of new and changed documents and hand them to
+# ``update`` in batches of about this many characters
+UPDATE_BATCH_CHARS = 64 * 1024 * 1024
+
+TermWeights = List[Tuple[str, float]]
+
+
+class TopicModel:
+    """Term counts of every document, kept between scans, and their TF-IDF top terms.
+
+    The expensive part, tokenizing and counting, only runs on new and
+    changed documents: ``update`` vectorizes them in one CountVectorizer
+    pass, maps their terms into the stored vocabulary and swaps their rows
+    in the stored count matrix. Documents are keyed like the scan catalog
+    (relative path) and carry a ``version`` (e.g. size and mtime, or a
+    content hash), so ``current`` tells the scanner which texts it can skip.
+    The IDF weights change with every delta, so ``top_terms`` and
+    ``group_top_terms`` weight the whole sparse matrix afresh; that is one
+    vectorized pass over the stored counts, not over the texts.
+
+    Args:
+        path: ``.npz`` file the model is loaded from and saved to
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.keys: List[str] = []
+        self.versions: List[str] = []
+        self.vocabulary: List[str] = []
+        self.counts = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self._rows: Dict[str, int] = {}
+        self._term_ids: Dict[str, int] = {}
+        self._weights_cache: Optional[sparse.csr_matrix] = None
+
+    def load(self) -> 'TopicModel':
+        """Read the stored counts; a missing, unreadable or outdated file leaves the model empty."""
+        if not self.path.exists():
+            return self
+        try:
+            with np.load(self.path, allow_pickle=False) as stored:
+                if str(stored['settings']) != TOPIC_SETTINGS:
+                    logger.info("Topic settings changed, recounting all documents")
+                    return self
+                keys = stored['keys'].tolist()
+                versions = stored['versions'].tolist()
+                vocabulary = stored['vocabulary'].tolist()
+                counts = sparse.csr_matrix((stored['data'], stored['indices'], stored['indptr']),
+                                           shape=(len(keys), len(vocabulary)))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not read topic model {self.path}, recounting all documents: {e}")
+            return self
+        self.keys, self.versions, self.vocabulary, self.counts = keys, versions, vocabulary, counts
+        self._rows = {key: row for row, key in enumerate(self.keys)}
+        self._term_ids = {term: column for column, term in enumerate(self.vocabulary)}
+        return self
+
+    def save(self) -> None:
+        """Write the model (to a temporary file first, so a crash keeps the previous one)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(temp_path, 'wb') as f:
+            np.savez_compressed(
+                f, settings=np.array(TOPIC_SETTINGS),
+                keys=np.array(self.keys, dtype=str), versions=np.array(self.versions, dtype=str),
+                vocabulary=np.array(self.vocabulary, dtype=str),
+                data=self.counts.data, indices=self.counts.indices, indptr=self.counts.indptr
+            )
+        os.replace(temp_path, self.path)
+
+    def current(self, key: str, version: str) -> bool:
+        """Whether this version of the document is already counted."""
+        row = self._rows.get(key)
+        return row is not None and self.versions[row] == version
+
+    def update(self, documents: Iterable[Tuple[str, str, str]], keep: Optional[Set[str]] = None) -> int:
+        """Count the terms of new and changed ``(key, version, text)`` documents.
+
+        ``documents`` is consumed once, so it can produce the texts lazily.
+        Documents whose key is not in ``keep`` (when given) are dropped.
+        Returns the number of documents counted.
+        """
+        keys: List[str] = []
+        versions: List[str] = []
+
+        def texts():
+            for key, version, text in documents:
+                keys.append(key)
+                versions.append(version)
+                yield text
+
+        vectorizer = CountVectorizer(token_pattern=TOKEN_PATTERN, stop_words=list(STOP_WORDS), dtype=np.int32)
+        try:
+            delta = vectorizer.fit_transform(texts())
+            delta_terms = vectorizer.get_feature_names_out()
+        except ValueError:
+            # No document, or none with a single term
+            delta = sparse.csr_matrix((len(keys), 0), dtype=np.int32)
+            delta_terms = []
+
+        # Column of every delta term in the stored vocabulary (new terms are appended)
+        columns = np.empty(len(delta_terms), dtype=np.int32)
+        for i, term in enumerate(delta_terms):
+            column = self._term_ids.get(term)
+            if column is None:
+                column = self._term_ids[term] = len(self.vocabulary)
+                self.vocabulary.append(term)
+            columns[i] = column
+        delta = sparse.csr_matrix((delta.data, columns[delta.indices], delta.indptr),
+                                  shape=(len(keys), len(self.vocabulary)))
+        delta.sort_indices()
+
+        # A key counted twice in the delta keeps its last version
+        last = {key: i for i, key in enumerate(keys)}
+        if len(last) != len(keys):
+            delta_rows = sorted(last.values())
+            delta = delta[delta_rows]
+            keys = [keys[i] for i in delta_rows]
+            versions = [versions[i] for i in delta_rows]
+
+        kept_rows = [row for row, key in enumerate(self.keys)
+                     if key not in last and (keep is None or key in keep)]
+        stored = self.counts[kept_rows]
+        stored.resize((len(kept_rows), len(self.vocabulary)))
+        self.counts = sparse.vstack([stored, delta], format='csr', dtype=np.int32)
+        self.keys = [self.keys[row] for row in kept_rows] + keys
+        self.versions = [self.versions[row] for row in kept_rows] + versions
+        self._rows = {key: row for row, key in enumerate(self.keys)}
+        self._compact()
+        self._weights_cache = None
+        return len(keys)
+
+    def _compact(self) -> None:
+        """Drop the terms no stored document contains any more."""
+        used = np.bincount(self.counts.indices, minlength=len(self.vocabulary)) > 0
+        if used.all():
+            return
+        columns = np.cumsum(used, dtype=np.int32) - 1
+        self.counts = sparse.csr_matrix((self.counts.data, columns[self.counts.indices], self.counts.indptr),
+                                        shape=(len(self.keys), int(used.sum())))
+        self.vocabulary = [term for term, is_used in zip(self.vocabulary, used) if is_used]
+        self._term_ids = {term: column for column, term in enumerate(self.vocabulary)}
+
+    def _weights(self) -> sparse.csr_matrix:
+        """TF-IDF weights of all documents (sublinear TF, rows L2-normalized)."""
+        if self._weights_cache is None:
+            self._weights_cache = TfidfTransformer(sublinear_tf=True).fit_transform(self.counts).tocsr()
+        return self._weights_cache
+
+    def _top(self, row_data: np.ndarray, row_indices: np.ndarray, n: int) -> TermWeights:
+        if len(row_data) > n:
+            best = np.argpartition(row_data, -n)[-n:]
+            row_data, row_indices = row_data[best], row_indices[best]
+        order = np.argsort(-row_data, kind='stable')
+        return [(self.vocabulary[row_indices[i]], round(float(row_data[i]), 4)) for i in order]
+
+    def top_terms(self, n: int = DEFAULT_TOP_TERMS, keys: Optional[Iterable[str]] = None) -> Dict[str, TermWeights]:
+        """The ``n`` highest-weighted terms of every document (or of ``keys``), with their weights."""
+        if not self.keys:
+            return {}
+        weights = self._weights()
+        rows = range(len(self.keys)) if keys is None else [self._rows[key] for key in keys if key in self._rows]
+        top = {}
+        for row in rows:
+            start, end = weights.indptr[row], weights.indptr[row + 1]
+            top[self.keys[row]] = self._top(weights.data[start:end], weights.indices[start:end], n)
+        return top
+
+    def group_top_terms(self, groups: Mapping[str, Hashable], n: int = DEFAULT_TOP_TERMS) -> Dict[Hashable, TermWeights]:
+        """The ``n`` terms with the highest mean weight in each group of documents.
+
+        ``groups`` maps document keys to their group (e.g. the faculty);
+        documents missing from it are left out.
+        """
+        members = [(row, groups[key]) for row, key in enumerate(self.keys) if key in groups]
+        if not members:
+            return {}
+        names = list(dict.fromkeys(group for _, group in members))
+        group_ids = {group: i for i, group in enumerate(names)}
+        rows = np.array([row for row, _ in members])
+        group_rows = np.array([group_ids[group] for _, group in members])
+        sizes = np.bincount(group_rows, minlength=len(names))
+        # Group-by-document matrix of 1/size entries: its product with the weights is the group means
+        means = sparse.csr_matrix((1.0 / sizes[group_rows], (group_rows, rows)),
+                                  shape=(len(names), len(self.keys))) @ self._weights()
+        means = means.tocsr()
+        return {group: self._top(means.data[means.indptr[i]:means.indptr[i + 1]],
+                                 means.indices[means.indptr[i]:means.indptr[i + 1]], n)
+                for i, group in enumerate(names)}
+
+    def __len__(self) -> int:
+        return len(self.keys)
@@ -0,0 +1,140 @@
+"""Directory walking for the scanners."""
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Collection, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DirNode:
+    """One walked directory with its files, walked subdirectories and fingerprint.
+
+    The fingerprint is a Merkle hash over the names, sizes and mtimes of the
+    files and the fingerprints of the subdirectories, so it changes whenever
+    anything below the directory changes and an equal fingerprint means the
+    whole subtree is unchanged.
+    """
+
+    __slots__ = ('path', 'files', 'children', 'fingerprint')
+
+    def __init__(self, path: str, files: List[os.DirEntry], children: List['DirNode']):
+        self.path = path
+        self.files = files
+        self.children = children
+        digest = hashlib.sha1()
+        for entry in files:
+            try:
+                file_stat = entry.stat()
+                digest.update(f"f\0{entry.name}\0{file_stat.st_size}\0{file_stat.st_mtime_ns}\n".encode())
+            except OSError:
+                digest.update(f"f\0{entry.name}\0?\n".encode())
+        for child in children:
+            digest.update(f"d\0{os.path.basename(child.path)}\0{child.fingerprint}\n".encode())
+        self.fingerprint = digest.hexdigest()
+
+    def iter_files(self) -> Iterator[os.DirEntry]:
+        """Files of the subtree in ``os.walk`` (top-down) order."""
+        yield from self.files
+        for child in self.children:
+            yield from child.iter_files()
+
+    def iter_nodes(self) -> Iterator['DirNode']:
+        """This directory and every directory below it, parents first."""
+        yield self
+        for child in self.children:
+            yield from child.iter_nodes()
+
+
+class WalkPlan:
+    """Files to scan below a set of target directories.
+
+    Target directories are normalized and deduplicated, and a directory that
+    another target's walk reaches anyway (e.g. ``regions`` next to the root
+    ``''``) is dropped, so no file is visited twice. Skipped and hidden
+    directories are pruned when they are listed, never entered, and files
+    are yielded as ``os.DirEntry`` objects whose cached ``stat()`` can be
+    used instead of stat'ing the path again. ``iter_trees`` returns the same
+    walk as ``DirNode`` trees carrying directory fingerprints.
+
+    Args:
+        base_dir: Directory the target directories are relative to
+        target_dirs: Relative directories to walk (``''`` is ``base_dir`` itself)
+        skip_dirs: Directory names that are never entered
+        extensions: Lower-case suffixes to yield (None yields every file)
+        skip_hidden: Also skip files and directories starting with '.'
+    """
+
+    def __init__(self, base_dir: Path, target_dirs: Iterable[str], skip_dirs: Collection[str],
+                 extensions: Optional[Collection[str]] = None, skip_hidden: bool = True):
+        self.base_dir = Path(base_dir)
+        self.skip_dirs = skip_dirs
+        self.extensions = extensions
+        self.skip_hidden = skip_hidden
+        self.roots = self._plan_roots(target_dirs)
+
+    def _is_pruned(self, name: str) -> bool:
+        return name in self.skip_dirs or (self.skip_hidden and name.startswith('.'))
+
+    def _reaches(self, outer: Path, inner: Path) -> bool:
+        """Whether walking ``outer`` visits ``inner``."""
+        try:
+            rel = inner.relative_to(outer)
+        except ValueError:
+            return False
+        return not any(self._is_pruned(part) for part in rel.parts)
+
+    def _plan_roots(self, target_dirs: Iterable[str]) -> List[Path]:
+        roots: List[Path] = []
+        for rel_dir in target_dirs:
+            root = Path(os.path.normpath(self.base_dir / rel_dir))
+            if root in roots:
+                continue
+            if root != self.base_dir and not self._reaches(self.base_dir, root):
+                logger.info(f"Skipping excluded target directory: {root}")
+                continue
+            roots.append(root)
+        return [root for root in roots
+                if not any(other != root and self._reaches(other, root) for other in roots)]
+
+    def iter_trees(self) -> Iterator[DirNode]:
+        """Yield one fingerprinted directory tree per root."""
+        for root in self.roots:
+            if not root.is_dir():
+                logger.warning(f"Directory not found: {root}")
+                continue
+            yield self._walk(str(root))
+
+    def iter_files(self) -> Iterator[os.DirEntry]:
+        """Yield the files to scan, in ``os.walk`` (top-down) order per root."""
+        for tree in self.iter_trees():
+            yield from tree.iter_files()
+
+    def _walk(self, top: str) -> DirNode:
+        try:
+            with os.scandir(top) as entries:
+                entries = list(entries)
+        except OSError as e:
+            logger.warning(f"Cannot list {top}: {e}")
+            entries = []
+
+        files = []
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                # Like os.walk, symlinked directories are not followed
+                if not self._is_pruned(entry.name) and not entry.is_symlink():
+                    subdirs.append(entry.path)
+                continue
+            if self.skip_hidden and entry.name.startswith('.'):
+                continue
+            if self.extensions is not None and os.path.splitext(entry.name)[1].lower() not in self.extensions:
+                continue
+            files.append(entry)
+
+        return DirNode(top, files, [self._walk(subdir) for subdir in subdirs])
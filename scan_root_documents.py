@@ -1,16 +1,28 @@
 import os
+import argparse
 import logging
-import pytesseract
-from PIL import Image, ImageEnhance
-import PyPDF2
-import docx2txt
 import json
 import re
 import shutil
+import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
 from collections import defaultdict, Counter
-from typing import Dict, List, Any, Set, Optional
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Any, Set, Optional, Tuple
+
+from docscan.catalog import ScanCatalog, bytes_digest, config_signature
+from docscan.extractors import extract
+from docscan.keywords import KeywordMatcher
+from docscan.neardup import DEFAULT_THRESHOLD, MINHASH_SETTINGS, MinHash, find_clusters
+from docscan import stats
+from docscan.parallel import ExtractionPool, ImageBatch, PdfSplit, TaskFailure
+from docscan.report import NdjsonReport, iter_ndjson
+from docscan.schedule import CostModel, Progress
+from docscan.search import SearchIndex
+from docscan.textfile import PLAIN_TEXT_EXTENSIONS, text_file_stats
+from docscan.textstats import TextStats, page_text_stats
+from docscan.walk import DirNode, WalkPlan
 
 # Configure logging
 logging.basicConfig(
@@ -26,18 +38,53 @@ logger = logging.getLogger(__name__)
 class DocumentAnalyzer:
     """Enhanced document analyzer with better filtering and analysis capabilities."""
     
-    def __init__(self, base_dir: str, max_reports: int = 5, days_to_keep: int = 7):
+    # Length of the stored content preview
+    PREVIEW_CHARS = 500
+    
+    def __init__(self, base_dir: str, max_reports: int = 5, days_to_keep: int = 7,
+                 use_catalog: bool = True, workers: int = 1, split_pdf_pages: int = 200,
+                 ocr_pdf_pages: bool = False, stream_report: bool = False,
+                 file_timeout: Optional[float] = None, memory_mb: Optional[int] = None,
+                 search_index: bool = True, near_duplicates: Optional[str] = 'flag',
+                 near_duplicate_threshold: float = DEFAULT_THRESHOLD):
         """Initialize the document analyzer.
         
         Args:
             base_dir: Base directory to scan
             max_reports: Maximum number of reports to keep
             days_to_keep: Number of days to keep old reports
+            use_catalog: Serve unchanged files from the persistent scan catalog
+            workers: Number of extraction processes (0 = one per CPU core)
+            split_pdf_pages: With several workers, PDFs with at least this many
+                pages are extracted as concurrent page ranges (0 = never split)
+            ocr_pdf_pages: OCR PDF pages that have no text layer (scanned pages)
+            stream_report: Write each document to an NDJSON report as soon as it
+                is processed instead of keeping all of them for one JSON report
+            file_timeout: Seconds one file may take to extract; slower files are
+                abandoned and listed as failed (None = no limit)
+            memory_mb: Memory cap of an extraction process in MB (None = no cap)
+            search_index: Keep the extracted text of every document in a
+                full-text index (see docscan.search); changed files are
+                re-indexed, deleted ones dropped
+            near_duplicates: What to do with clusters of near-identical documents
+                (see docscan.neardup): 'flag' lists them in the reports,
+                'collapse' also keeps only the first document of each cluster
+                in the documents and totals, None skips the detection
+            near_duplicate_threshold: Minimum estimated shingle similarity
+                of two near-duplicates
         """
         self.base_dir = Path(base_dir).resolve()
         self.results_dir = self.base_dir / "document_analysis"
         self.max_reports = max_reports
         self.days_to_keep = days_to_keep
+        self.workers = workers
+        self.split_pdf_pages = split_pdf_pages
+        self.ocr_pdf_pages = ocr_pdf_pages
+        self.stream_report = stream_report
+        self.file_timeout = file_timeout
+        self.memory_mb = memory_mb
+        self.near_duplicates = near_duplicates
+        self.near_duplicate_threshold = near_duplicate_threshold
         
         # Setup results directory
         self.results_dir.mkdir(exist_ok=True)
@@ -45,17 +92,28 @@ class DocumentAnalyzer:
         # Document analysis data
         self.text_data: List[Dict[str, Any]] = []
         self.file_types: Dict[str, int] = defaultdict(int)
+        # Running totals, so summaries do not depend on text_data (empty when streaming)
+        self.totals: Counter = Counter()
+        self.faculty_totals: Counter = Counter()
+        self.report: Optional[NdjsonReport] = None
+        # Files whose extraction was aborted (timeout, memory cap, crashed worker)
+        self.failed_files: List[Dict[str, str]] = []
+        # MinHash signatures of the documents by path (see docscan.neardup)
+        self.signatures: Dict[str, str] = {}
         self.faculty_keywords = {
             'business': ['business', 'management', 'economics', 'finance'],
             'technology': ['technology', 'computer', 'engineering', 'it'],
             'arts': ['arts', 'design', 'music', 'humanities'],
             'science': ['science', 'biology', 'chemistry', 'physics']
         }
+        self.faculty_matcher = KeywordMatcher(self.faculty_keywords)
         
         # Supported file extensions
         self.supported_extensions = {
             # Document formats
             '.pdf', '.docx', '.doc', '.txt', '.rtf', '.odt',
+            # Spreadsheets and presentations
+            '.xlsx', '.xlsm', '.pptx',
             # Image formats (OCR supported)
             '.jpg', '.jpeg', '.png',
             # Other text formats
@@ -91,35 +149,47 @@ class DocumentAnalyzer:
             'document_analysis', 'assets', 'pictures', 'images', 'img', 
             'css', 'js', 'fonts', 'bower_components'
         }
+        
+        # Persistent catalog of extraction results (see docscan.catalog)
+        self.catalog: Optional[ScanCatalog] = None
+        if use_catalog:
+            self.catalog = ScanCatalog(
+                self.results_dir / "scan_catalog.sqlite",
+                signature=config_signature(self.faculty_keywords, self.faculty_matcher.word_boundary,
+                                           self.PREVIEW_CHARS, self.ocr_pdf_pages, MINHASH_SETTINGS)
+            )
+        
+        # Full-text index; extraction workers write to it directly
+        self.search_index: Optional[SearchIndex] = None
+        self._indexed: Dict[str, Tuple[int, int]] = {}
+        if search_index:
+            self.search_index = SearchIndex(self.results_dir / "search_index.sqlite")
     
     def scan_documents(self) -> Dict[str, Any]:
         """Scan and analyze documents in the target directories."""
         logger.info(f"Starting document scan in: {self.base_dir}")
+        stats.reset()
         
-        # Process each target directory
-        for rel_dir in self.target_dirs:
-            target_dir = self.base_dir / rel_dir if rel_dir else self.base_dir
-            
-            if not target_dir.exists():
-                logger.warning(f"Directory not found: {target_dir}")
-                continue
-                
-            # Walk through the directory
-            for root, dirs, files in os.walk(target_dir):
-                # Skip ignored directories
-                dirs[:] = [d for d in dirs if d not in self.skip_dirs]
-                
-                for file in files:
-                    file_path = Path(root) / file
-                    
-                    # Check if file should be skipped
-                    if self._should_skip(file_path):
-                        continue
-                        
-                    try:
-                        self._process_file(file_path)
-                    except Exception as e:
-                        logger.error(f"Error processing {file_path}: {e}")
+        if self.stream_report:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.report = NdjsonReport(self.results_dir, f"document_analysis_{timestamp}").open()
+        if self.catalog:
+            self.catalog.connect()
+        try:
+            self._scan_target_dirs()
+            if self.catalog:
+                # Only prune after a complete walk, otherwise a crash would empty the catalog
+                removed = self.catalog.prune()
+                catalog_stats = self.catalog.stats()
+                logger.info(f"Scan catalog: {catalog_stats['hits']} unchanged, {catalog_stats['misses']} extracted, "
+                            f"{catalog_stats['unchanged_dirs']} unchanged directories skipped, "
+                            f"{removed} stale entries removed")
+        finally:
+            if self.catalog:
+                self.catalog.close()
+            if self.report:
+                # Keeps every document written so far if the scan failed
+                self.report.close()
         
         # Clean up old reports before generating new ones
         self._cleanup_old_reports()
@@ -127,156 +197,462 @@ class DocumentAnalyzer:
         # Generate and save reports
         return self._generate_reports()
     
-    def _process_file(self, file_path: Path) -> None:
-        """Process a single file and extract text with enhanced analysis."""
+    def _scan_target_dirs(self) -> None:
+        """Walk all target directories and process every supported file.
+        
+        Catalog lookups happen in walk order. Catalog hits are merged first,
+        then the remaining files are extracted into records (in parallel when
+        ``workers`` > 1) from the cheapest to the most expensive estimate, so
+        text files are done early and OCR and big PDFs drain last. Estimates
+        use the throughput observed in earlier runs (see docscan.schedule),
+        and the progress line's ETA is based on them. Documents are put back
+        in walk order for the report, so it is identical regardless of the
+        worker count. Directories whose fingerprint is unchanged since the
+        last complete scan are served from the catalog as a whole, without
+        per-file lookups.
+        """
+        plan = WalkPlan(self.base_dir, self.target_dirs, self.skip_dirs, self.supported_extensions)
+        trees = list(plan.iter_trees())
+        if self.search_index:
+            self._indexed = self.search_index.indexed()
+        candidates = []
+        for tree in trees:
+            self._plan_tree(tree, candidates)
+        
+        cost_model = CostModel(self.catalog.load_throughput() if self.catalog else None)
+        costs = [0.0 if record is not None else cost_model.estimate(file_ext, file_stat.st_size)
+                 for _, file_stat, _, file_ext, record in candidates]
+        # Stable sort: files with equal estimates stay in walk order
+        schedule = sorted(range(len(candidates)), key=costs.__getitem__)
+        sizes = {file_path: file_stat.st_size for file_path, file_stat, _, _, record in candidates if record is None}
+        
+        pool = ExtractionPool(
+            partial(type(self), self.base_dir, use_catalog=False, ocr_pdf_pages=self.ocr_pdf_pages,
+                    search_index=self.search_index is not None),
+            '_extract_record',
+            workers=self.workers,
+            local=self,
+            pdf_split=PdfSplit(self._merge_pdf_pages, min_pages=self.split_pdf_pages,
+                               ocr_scanned=self.ocr_pdf_pages),
+            timeout=self.file_timeout,
+            memory_mb=self.memory_mb,
+            observe=lambda args, seconds: cost_model.observe(args[1], sizes[args[0]], seconds),
+            image_batch=ImageBatch()
+        )
+        records = pool.map(
+            (candidates[index][0], candidates[index][3])
+            for index in schedule
+            if candidates[index][4] is None
+        )
+        
+        progress = Progress(len(candidates), sum(costs))
+        catalogued: Set[str] = set()
+        for index in schedule:
+            file_path, file_stat, rel_path, file_ext, record = candidates[index]
+            try:
+                if record is None:
+                    record = next(records)
+                    if isinstance(record, TaskFailure):
+                        # Not catalogued, so the file is retried on the next scan
+                        self.failed_files.append({'path': rel_path, 'reason': record.reason})
+                        continue
+                    if record is None:
+                        continue
+                    content_hash = record.pop('content_hash', '')
+                    if self.catalog:
+                        self.catalog.store(rel_path, file_stat, record, content_hash)
+                catalogued.add(rel_path)
+                self._add_document(rel_path, file_stat, file_ext, record)
+            except Exception as e:
+                logger.error(f"Error processing {file_path}: {e}", exc_info=True)
+            finally:
+                progress.advance(costs[index])
+        
+        if not self.report:
+            walk_order = {candidate[2]: index for index, candidate in enumerate(candidates)}
+            self.text_data.sort(key=lambda document: walk_order[document['path']])
+        
+        if self.catalog:
+            self.catalog.store_throughput(cost_model.merged_history())
+            complete: List[Tuple[str, str]] = []
+            for tree in trees:
+                self._collect_complete_dirs(tree, catalogued, complete)
+            self.catalog.store_dirs(complete)
+        
+        if self.search_index:
+            removed = self.search_index.prune(candidate[2] for candidate in candidates)
+            index_stats = self.search_index.stats()
+            logger.info(f"Search index: {index_stats['documents']} documents, {removed} removed")
+            self.search_index.close()
+    
+    def _rel_path(self, path: str) -> str:
+        return str(Path(path).relative_to(self.base_dir))
+    
+    def _plan_tree(self, node: DirNode, candidates: List[Tuple]) -> None:
+        """Plan the files of a directory tree, taking unchanged subtrees from the catalog."""
+        if self.catalog and self.catalog.dir_unchanged(self._rel_path(node.path), node.fingerprint):
+            entries = list(node.iter_files())
+            rel_paths = [self._rel_path(entry.path) for entry in entries]
+            records = self.catalog.load_records(rel_paths)
+            if records is not None:
+                for entry, rel_path in zip(entries, rel_paths):
+                    file_path = Path(entry.path)
+                    file_stat = entry.stat()
+                    record = records[rel_path] if self._index_current(rel_path, file_stat) else None
+                    candidates.append((file_path, file_stat, rel_path, file_path.suffix.lower(), record))
+                return
+        
+        for entry in node.files:
+            try:
+                candidates.append(self._plan_file(entry))
+            except Exception as e:
+                logger.error(f"Error processing {entry.path}: {e}")
+        for child in node.children:
+            self._plan_tree(child, candidates)
+    
+    def _collect_complete_dirs(self, node: DirNode, catalogued: Set[str],
+                               complete: List[Tuple[str, str]]) -> bool:
+        """Collect (rel_dir, fingerprint) of directories whose files all have catalog records."""
+        done = all(self._rel_path(entry.path) in catalogued for entry in node.files)
+        for child in node.children:
+            done = self._collect_complete_dirs(child, catalogued, complete) and done
+        if done:
+            complete.append((self._rel_path(node.path), node.fingerprint))
+        return done
+    
+    def _plan_file(self, entry: os.DirEntry) -> Tuple[Path, os.stat_result, str, str, Optional[Dict[str, Any]]]:
+        """Look a walked file up in the catalog (record is None if it needs extraction)."""
+        file_path = Path(entry.path)
+        file_stat = entry.stat()
+        file_ext = file_path.suffix.lower()
+        rel_path = self._rel_path(entry.path)
+        
+        # Unchanged files are served from the catalog without re-reading them
+        touched: List[int] = []
+        record = self.catalog.lookup(rel_path, file_path, file_stat, touched.append) if self.catalog else None
+        if record is not None and not self._index_current(rel_path, file_stat):
+            if touched and self._indexed.get(rel_path) == (file_stat.st_size, touched[0]):
+                # Only touched: the indexed text is still current
+                self.search_index.touch(rel_path, file_stat.st_size, file_stat.st_mtime_ns)
+            else:
+                # Catalogued, but its text is not in the search index yet
+                record = None
+        return file_path, file_stat, rel_path, file_ext, record
+    
+    def _index_current(self, rel_path: str, file_stat: os.stat_result) -> bool:
+        """Whether the search index (if any) holds this version of the file."""
+        return (self.search_index is None
+                or self._indexed.get(rel_path) == (file_stat.st_size, file_stat.st_mtime_ns))
+    
+    def _add_document(self, rel_path: str, file_stat: os.stat_result, file_ext: str,
+                      record: Dict[str, Any]) -> None:
+        """Store file info with enhanced metadata (files without text are ignored)."""
+        if not record:
+            return
+        
+        self.file_types[file_ext] = self.file_types.get(file_ext, 0) + 1
+        
+        document = {
+            'path': rel_path,
+            'size': file_stat.st_size,
+            'words': record['words'],
+            'chars': record['chars'],
+            'lines': record['lines'],
+            'modified': datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
+            'extension': file_ext,
+            'faculty_mentions': record['faculty_mentions'],
+            'content_preview': record['content_preview']
+        }
+        self.totals.update(documents=1, size=document['size'], words=document['words'], chars=document['chars'])
+        self.faculty_totals.update(document['faculty_mentions'])
+        if self.near_duplicates and record.get('minhash'):
+            self.signatures[rel_path] = record['minhash']
+        if self.report:
+            self.report.write(document)
+        else:
+            self.text_data.append(document)
+    
+    def _extract_record(self, file_path: Path, file_ext: str) -> Optional[Dict[str, Any]]:
+        """Extract a file into its cacheable record (None if it could not be read)."""
+        logger.info(f"Processing: {file_path}")
+        return self._indexed_record(file_path, file_ext, partial(self._read_record, file_path, file_ext))
+    
+    def _read_record(self, file_path: Path, file_ext: str, on_text: Optional[Callable[[str], None]] = None,
+                     on_restart: Optional[Callable[[], None]] = None) -> Optional[Dict[str, Any]]:
+        """Record of a file; ``on_text`` receives its text piece by piece (see _indexed_record)."""
+        if file_ext == '.pdf':
+            return self._pdf_record(file_path, on_text)
+        if file_ext in PLAIN_TEXT_EXTENSIONS:
+            return self._text_file_record(file_path, on_text, on_restart)
+        
+        text = self._read_file_content(file_path, file_ext)
+        if text is None:
+            return None
+        if on_text is not None:
+            on_text(text)
+        return self._build_record(text)
+    
+    def _indexed_record(self, file_path: Path, file_ext: str,
+                        read: Callable[[Optional[Callable[[str], None]], Optional[Callable[[], None]]],
+                                       Optional[Dict[str, Any]]]
+                        ) -> Optional[Dict[str, Any]]:
+        """Run ``read(on_text, on_restart)`` and put the text it produces into the search index.
+        
+        ``on_restart`` drops the text written so far, for a reader whose text
+        starts over (see _text_file_record). A file that could not be read
+        keeps its previous index entry; as it is not catalogued either, it is
+        retried on the next scan.
+        """
+        if self.search_index is None:
+            return read(None, None)
         try:
-            logger.info(f"Processing: {file_path}")
-            
-            # Get file info
             file_stat = file_path.stat()
-            file_size = file_path.stat().st_size
-            file_ext = file_path.suffix.lower()
-            
-            # Read file content based on type
-            text = self._read_file_content(file_path, file_ext)
-            if not text:
-                return
-                
-            # Basic text metrics
-            word_count = len(text.split())
-            char_count = len(text)
-            line_count = text.count('\n') + 1
-            
-            # Analyze content
-            faculty_mentions = self._analyze_faculty_content(text)
-            
-            # Store file info with enhanced metadata
-            self.file_types[file_ext] = self.file_types.get(file_ext, 0) + 1
-            
-            self.text_data.append({
-                'path': str(file_path.relative_to(self.base_dir)),
-                'size': file_size,
-                'words': word_count,
-                'chars': char_count,
-                'lines': line_count,
-                'modified': datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
-                'extension': file_ext,
-                'faculty_mentions': faculty_mentions,
-                'content_preview': text[:500] + '...' if len(text) > 500 else text
-            })
-            
-        except Exception as e:
-            logger.error(f"Error processing {file_path}: {e}", exc_info=True)
+            with self.search_index.writer(self._rel_path(str(file_path)), file_ext,
+                                          file_stat.st_size, file_stat.st_mtime_ns) as writer:
+                record = read(writer.write, writer.restart)
+                if record is not None:
+                    writer.commit(self._primary_faculty(record))
+                return record
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Error indexing {file_path}: {e}")
+            return None
     
-    def _read_file_content(self, file_path: Path, file_ext: str) -> Optional[str]:
-        """Read content from different file types with error handling."""
+    def _pdf_record(self, file_path: Path,
+                    on_text: Optional[Callable[[str], None]] = None) -> Optional[Dict[str, Any]]:
+        """Stream a PDF page by page, keeping only counts, faculty mentions and the preview."""
         try:
-            if file_ext == '.pdf':
-                return self._read_pdf(file_path)
-            elif file_ext in ('.docx', '.doc'):
-                return docx2txt.process(str(file_path))
-            elif file_ext in ('.jpg', '.jpeg', '.png'):
-                return self._read_image(file_path)
-            else:  # .txt, .md, .html, .json, etc.
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        return f.read()
-                except UnicodeDecodeError:
-                    try:
-                        with open(file_path, 'r', encoding='latin-1') as f:
-                            return f.read()
-                    except Exception as e:
-                        logger.warning(f"Could not read {file_path}: {e}")
-                        return None
+            # Imported on first use, like the extractors (see docscan.extractors)
+            from docscan.pdf import iter_pdf_pages
+            digests: List[str] = []
+            pages = iter_pdf_pages(file_path, ocr_scanned=self.ocr_pdf_pages,
+                                   on_bytes=lambda data: digests.append(bytes_digest(data)))
+            return self._with_hash(self._pages_record(pages, on_text), digests)
         except Exception as e:
-            logger.error(f"Error reading {file_path}: {e}")
+            logger.error(f"Error processing PDF {file_path}: {e}")
             return None
     
-    def _read_pdf(self, file_path: Path) -> str:
-        """Read content from PDF files."""
+    def _text_file_record(self, file_path: Path, on_text: Optional[Callable[[str], None]] = None,
+                          on_restart: Optional[Callable[[], None]] = None) -> Optional[Dict[str, Any]]:
+        """Stream a plain-text file in one pass (memory-mapped when large) without holding its text.
+        
+        The record equals ``_build_record`` of the whole text: nothing is stripped.
+        """
+        analyzer = self._text_analyzer(on_text)
+        
+        def restart() -> None:
+            # Not UTF-8 after all: the text starts over as latin-1 (see text_file_stats)
+            nonlocal analyzer
+            if on_restart is not None:
+                on_restart()
+            analyzer = self._text_analyzer(on_text)
+        
+        digests: List[str] = []
         try:
-            text = ""
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-            return text.strip()
+            text_stats = text_file_stats(file_path, self.PREVIEW_CHARS, on_chunk=lambda chunk: analyzer[2](chunk),
+                                         strip=False, on_bytes=lambda data: digests.append(bytes_digest(data)),
+                                         on_restart=restart)
         except Exception as e:
-            logger.error(f"Error processing PDF {file_path}: {e}")
-            return ""
+            logger.error(f"Error reading {file_path}: {e}")
+            return None
+        faculty_mentions, minhash, _ = analyzer
+        return self._with_hash(self._stats_record(text_stats, faculty_mentions, minhash), digests)
+    
+    @staticmethod
+    def _with_hash(record: Dict[str, Any], digests: List[str]) -> Dict[str, Any]:
+        """Add the content hash taken while extracting; it is popped again for the catalog."""
+        if record and digests:
+            record['content_hash'] = digests[0]
+        return record
+    
+    def _merge_pdf_pages(self, file_path: Path, pages: Optional[List[str]]) -> Optional[Dict[str, Any]]:
+        """Build the record of a PDF that was extracted as parallel page ranges."""
+        logger.info(f"Processed in page ranges: {file_path}")
+        if pages is None:
+            return None
+        return self._indexed_record(Path(file_path), '.pdf',
+                                    lambda on_text, on_restart: self._pages_record(pages, on_text))
+    
+    def _pages_record(self, pages: Iterable[str],
+                      on_text: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Record for a document given as a sequence of page texts."""
+        faculty_mentions, minhash, analyze = self._text_analyzer(on_text)
+        
+        def analyze_page(page_text: str) -> None:
+            # Pages are separated like page_text_stats separates them
+            analyze(page_text + '\n')
+        
+        text_stats = page_text_stats(pages, self.PREVIEW_CHARS, on_page=analyze_page)
+        return self._stats_record(text_stats, faculty_mentions, minhash)
+    
+    def _text_analyzer(self, on_text: Optional[Callable[[str], None]] = None
+                       ) -> Tuple[Dict[str, int], MinHash, Callable[[str], None]]:
+        """Faculty totals, a MinHash and a callback adding one piece of text to both.
+        
+        The callback passes every piece on to ``on_text`` as well.
+        """
+        faculty_mentions = {faculty: 0 for faculty in self.faculty_keywords}
+        minhash = MinHash()
+        
+        def analyze(text: str) -> None:
+            for faculty, mentions in self._analyze_faculty_content(text).items():
+                faculty_mentions[faculty] += mentions
+            minhash.update(text)
+            if on_text is not None:
+                on_text(text)
+        
+        return faculty_mentions, minhash, analyze
+    
+    @staticmethod
+    def _primary_faculty(record: Dict[str, Any]) -> Optional[str]:
+        """The most mentioned faculty of a record (the search index's faculty filter)."""
+        mentions = record.get('faculty_mentions') or {}
+        faculty = max(mentions, key=mentions.get, default=None)
+        return faculty if faculty and mentions[faculty] > 0 else None
+    
+    def _stats_record(self, text_stats: TextStats, faculty_mentions: Dict[str, int],
+                      minhash: MinHash) -> Dict[str, Any]:
+        if text_stats.empty:
+            return {}
+        record = text_stats.as_dict()
+        record['faculty_mentions'] = faculty_mentions
+        record['minhash'] = minhash.digest()
+        return record
+    
+    def _build_record(self, text: str) -> Dict[str, Any]:
+        """Compute the cacheable metrics for extracted text (empty dict if no text)."""
+        if not text:
+            return {}
+        
+        return {
+            'words': len(text.split()),
+            'chars': len(text),
+            'lines': text.count('\n') + 1,
+            'faculty_mentions': self._analyze_faculty_content(text),
+            'content_preview': text[:self.PREVIEW_CHARS] + '...' if len(text) > self.PREVIEW_CHARS else text,
+            'minhash': MinHash().update(text).digest()
+        }
     
-    def _read_image(self, file_path: Path) -> str:
-        """Read content from images using OCR."""
+    def _read_file_content(self, file_path: Path, file_ext: str) -> Optional[str]:
+        """Read content through the shared extractor registry (None if it could not be read)."""
         try:
-            # Open image and enhance for better OCR
-            image = Image.open(file_path)
-            
-            # Convert to grayscale if not already
-            if image.mode != 'L':
-                image = image.convert('L')
-            
-            # Enhance image for better OCR results
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(2)
-            enhancer = ImageEnhance.Sharpness(image)
-            image = enhancer.enhance(2)
-            
-            # Use pytesseract to extract text
-            text = pytesseract.image_to_string(image)
-            return text.strip()
+            return extract(file_path, file_ext, ocr_scanned=self.ocr_pdf_pages)
         except Exception as e:
-            logger.error(f"Error processing image {file_path}: {e}")
-            return ""
+            logger.error(f"Error reading {file_path}: {e}")
+            return None
     
     def _generate_reports(self) -> Dict[str, Any]:
         """Generate comprehensive analysis reports with enhanced metrics."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # Calculate statistics
-        total_size = sum(f['size'] for f in self.text_data)
-        total_words = sum(f['words'] for f in self.text_data)
-        total_chars = sum(f.get('chars', 0) for f in self.text_data)
+        near_duplicates = self._find_near_duplicates()
+        if self.near_duplicates == 'collapse':
+            self._collapse_near_duplicates(near_duplicates)
+        elif near_duplicates and not self.report:
+            duplicate_of = {path: cluster['kept'] for cluster in near_duplicates for path in cluster['duplicates']}
+            for document in self.text_data:
+                if document['path'] in duplicate_of:
+                    document['near_duplicate_of'] = duplicate_of[document['path']]
         
-        # Aggregate faculty mentions
-        faculty_mentions = defaultdict(int)
-        for doc in self.text_data:
-            for faculty, count in doc.get('faculty_mentions', {}).items():
-                faculty_mentions[faculty] += count
+        # Calculate statistics
+        total_documents = self.totals['documents']
+        total_words = self.totals['words']
         
         # Create metadata
         metadata = {
             'generated_at': datetime.now().isoformat(),
             'base_directory': str(self.base_dir),
-            'total_documents': len(self.text_data),
-            'total_size': total_size,
+            'total_documents': total_documents,
+            'total_size': self.totals['size'],
             'total_words': total_words,
-            'total_chars': total_chars,
-            'avg_words_per_doc': round(total_words / len(self.text_data), 2) if self.text_data else 0,
+            'total_chars': self.totals['chars'],
+            'avg_words_per_doc': round(total_words / total_documents, 2) if total_documents else 0,
             'file_types': dict(sorted(self.file_types.items(), key=lambda x: x[1], reverse=True)),
-            'faculty_mentions': dict(sorted(faculty_mentions.items(), key=lambda x: x[1], reverse=True)),
+            'faculty_mentions': dict(sorted(self.faculty_totals.items(), key=lambda x: x[1], reverse=True)),
+            'catalog': self.catalog.stats() if self.catalog else None,
+            'failed_files': self.failed_files,
+            'near_duplicates': {
+                'mode': self.near_duplicates,
+                'threshold': self.near_duplicate_threshold,
+                'duplicate_documents': sum(len(cluster['duplicates']) for cluster in near_duplicates),
+                'clusters': near_duplicates
+            } if self.near_duplicates else None,
+            'ocr': {
+                'images_ocred': stats.counters['ocr_runs'],
+                'images_skipped_no_text': stats.counters['ocr_prefilter_skipped'],
+                'ocr_cache_hits': stats.counters['ocr_cache_hits'],
+                'pdf_pages_ocred': stats.counters['pdf_pages_ocred']
+            },
             'analysis_time': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
         
-        # Save JSON report
-        json_report = {
-            'metadata': metadata,
-            'documents': self.text_data
-        }
-        
-        json_path = self.results_dir / f"document_analysis_{timestamp}.json"
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(json_report, f, indent=2, ensure_ascii=False, default=str)
+        if self.report:
+            # Documents are already on disk; only the summary is left to write
+            self.report.finish({'metadata': metadata})
+            json_path = self.report.summary_path
+            json_report = {
+                'metadata': metadata,
+                'documents_file': str(self.report.documents_path)
+            }
+            documents = iter_ndjson(self.report.documents_path)
+        else:
+            # Save JSON report
+            json_report = {
+                'metadata': metadata,
+                'documents': self.text_data
+            }
+            
+            json_path = self.results_dir / f"document_analysis_{timestamp}.json"
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(json_report, f, indent=2, ensure_ascii=False, default=str)
+            documents = sorted(self.text_data, key=lambda x: x['path'].lower())
         
         # Save text report
         txt_path = self.results_dir / f"document_summary_{timestamp}.txt"
         with open(txt_path, 'w', encoding='utf-8') as f:
-            self._write_text_report(f, metadata)
+            self._write_text_report(f, metadata, documents)
         
         logger.info(f"Reports generated: {json_path}, {txt_path}")
         return json_report
     
-    def _write_text_report(self, file, metadata: Dict[str, Any]) -> None:
-        """Write a comprehensive text version of the report with enhanced formatting."""
+    def _find_near_duplicates(self) -> List[Dict[str, Any]]:
+        """Clusters of near-identical documents; of each cluster the first path (sorted) is kept."""
+        if not self.near_duplicates:
+            return []
+        signatures = sorted(self.signatures.items(), key=lambda item: item[0].lower())
+        clusters = find_clusters(signatures, self.near_duplicate_threshold)
+        logger.info(f"Near-duplicates: {sum(len(members) - 1 for members in clusters)} documents "
+                    f"in {len(clusters)} clusters")
+        return [{'kept': members[0], 'duplicates': members[1:]}
+                for members in sorted(clusters, key=lambda members: members[0].lower())]
+    
+    def _collapse_near_duplicates(self, clusters: List[Dict[str, Any]]) -> None:
+        """Take all but the kept document of every cluster out of the totals and the documents.
+        
+        A streamed report already holds every document; the duplicates stay
+        in its NDJSON file but are left out of the totals and the text report.
+        """
+        duplicates = {path for cluster in clusters for path in cluster['duplicates']}
+        if not duplicates:
+            return
+        documents = iter_ndjson(self.report.documents_path) if self.report else self.text_data
+        for document in documents:
+            if document['path'] not in duplicates:
+                continue
+            self.totals.subtract(documents=1, size=document['size'], words=document['words'],
+                                 chars=document['chars'])
+            self.faculty_totals.subtract(document['faculty_mentions'])
+            self.file_types[document['extension']] -= 1
+            if not self.file_types[document['extension']]:
+                del self.file_types[document['extension']]
+        if not self.report:
+            self.text_data = [document for document in self.text_data if document['path'] not in duplicates]
+    
+    def _write_text_report(self, file, metadata: Dict[str, Any], documents: Iterable[Dict[str, Any]]) -> None:
+        """Write a comprehensive text version of the report with enhanced formatting.
+        
+        ``documents`` are written in the order given (sorted by path, or scan
+        order when they are read back from a streamed report).
+        """
         def write_section(title: str, char: str = '=') -> None:
             """Helper to write section headers."""
             file.write(f"\n{char * 80}\n")
@@ -298,6 +674,34 @@ class DocumentAnalyzer:
         file.write(f"Total Words: {metadata['total_words']:,}\n")
         file.write(f"Total Characters: {metadata['total_chars']:,}\n")
         file.write(f"Average Words/Document: {metadata['avg_words_per_doc']:,}\n")
+        if metadata.get('catalog'):
+            file.write(f"Served From Catalog: {metadata['catalog']['hits']:,} "
+                       f"(extracted: {metadata['catalog']['misses']:,})\n")
+        file.write(f"Images OCR'd: {metadata['ocr']['images_ocred']:,} "
+                   f"(skipped without text: {metadata['ocr']['images_skipped_no_text']:,}, "
+                   f"from OCR cache: {metadata['ocr']['ocr_cache_hits']:,})\n")
+        if metadata['ocr']['pdf_pages_ocred']:
+            file.write(f"Scanned PDF Pages OCR'd: {metadata['ocr']['pdf_pages_ocred']:,}\n")
+        
+        if metadata['failed_files']:
+            write_section("FAILED FILES")
+            for failed in metadata['failed_files']:
+                file.write(f"- {failed['path']}: {failed['reason']}\n")
+        
+        near_duplicates = metadata['near_duplicates']
+        duplicate_of: Dict[str, str] = {}
+        if near_duplicates and near_duplicates['clusters']:
+            collapsed = near_duplicates['mode'] == 'collapse'
+            write_section("NEAR-DUPLICATE CLUSTERS")
+            file.write(f"{near_duplicates['duplicate_documents']:,} documents in "
+                       f"{len(near_duplicates['clusters']):,} clusters are near-duplicates "
+                       f"(similarity >= {near_duplicates['threshold']:.0%})"
+                       f"{', counted once' if collapsed else ''}\n")
+            for cluster in near_duplicates['clusters']:
+                file.write(f"\n{cluster['kept']}\n")
+                for path in cluster['duplicates']:
+                    file.write(f"  ~ {path}\n")
+                    duplicate_of[path] = cluster['kept']
         
         # File Type Analysis
         write_section("FILE TYPE ANALYSIS")
@@ -313,10 +717,12 @@ class DocumentAnalyzer:
         
         # Document Details
         write_section("DOCUMENT DETAILS")
-        for doc in sorted(self.text_data, key=lambda x: x['path'].lower()):
+        for doc in documents:
             # Skip very small or empty files
             if doc['words'] < 5:
                 continue
+            if doc['path'] in duplicate_of and near_duplicates['mode'] == 'collapse':
+                continue
                 
             file.write(f"\n{'=' * 60}\n")
             file.write(f"FILE: {doc['path']}\n")
@@ -326,6 +732,8 @@ class DocumentAnalyzer:
             file.write(f"Words: {doc['words']:,} | ")
             file.write(f"Lines: {doc['lines']:,}\n")
             file.write(f"Modified: {doc['modified']}\n")
+            if doc['path'] in duplicate_of:
+                file.write(f"Near-Duplicate Of: {duplicate_of[doc['path']]}\n")
             
             # Show faculty mentions if any
             faculty_refs = [f"{k.title()}:{v}" for k, v in doc.get('faculty_mentions', {}).items() if v > 0]
@@ -364,40 +772,60 @@ class DocumentAnalyzer:
             logger.error(f"Error during report cleanup: {e}")
     
     def _analyze_faculty_content(self, text: str) -> Dict[str, int]:
-        """Analyze text for faculty-related keywords."""
-        text_lower = text.lower()
-        faculty_counts = {faculty: 0 for faculty in self.faculty_keywords}
-        
-        for faculty, keywords in self.faculty_keywords.items():
-            for keyword in keywords:
-                faculty_counts[faculty] += text_lower.count(keyword)
-                
-        return faculty_counts
+        """Count whole-word faculty keyword mentions."""
+        return self.faculty_matcher.counts(text)
 
-    def _should_skip(self, path: Path) -> bool:
-        """Determine if a path should be skipped during scanning."""
-        # Skip hidden files and directories
-        if any(part.startswith('.') for part in path.parts if part != '.'):
-            return True
-            
-        # Skip files in excluded directories
-        for part in path.parts:
-            if part in self.skip_dirs:
-                return True
-                
-        # Skip unsupported file extensions
-        if path.suffix.lower() not in self.supported_extensions:
-            return True
-            
-        return False
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options for the root document scan."""
+    parser = argparse.ArgumentParser(description="Scan and analyze the KEAN root documents.")
+    parser.add_argument('--base-dir', default=r'D:\busineshuboffline CHATGTP\KEAN',
+                        help="Directory to scan")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Parallel extraction processes (0 = one per CPU core)")
+    parser.add_argument('--split-pdf-pages', type=int, default=200,
+                        help="Split PDFs with at least this many pages across workers (0 = never)")
+    parser.add_argument('--ocr-pdf-pages', action='store_true',
+                        help="OCR PDF pages without a text layer (scanned documents)")
+    parser.add_argument('--stream-report', action='store_true',
+                        help="Write documents to an NDJSON report while scanning (flat memory, survives crashes)")
+    parser.add_argument('--file-timeout', type=float, default=600,
+                        help="Seconds one file may take to extract before it is abandoned (0 = no limit)")
+    parser.add_argument('--max-memory-mb', type=int, default=0,
+                        help="Memory cap of each extraction process in MB (0 = no cap)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignore the scan catalog and re-extract every file")
+    parser.add_argument('--near-duplicates', choices=['flag', 'collapse', 'off'], default='flag',
+                        help="List clusters of near-identical documents (flag), also count each "
+                             "cluster once (collapse), or skip the detection (off)")
+    parser.add_argument('--near-duplicate-threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Minimum estimated similarity of near-duplicates (0-1)")
+    parser.add_argument('--no-index', action='store_true',
+                        help="Do not update the full-text search index (search it with python -m docscan.search)")
+    parser.add_argument('--ocr-text-threshold', type=float,
+                        help="Minimum edge density for an image to be OCR'd (0 = OCR every image)")
+    return parser.parse_args(argv)
 
 def main():
+    args = parse_args()
+    if args.ocr_text_threshold is not None:
+        from docscan.ocr import set_text_threshold
+        set_text_threshold(args.ocr_text_threshold)
     try:
         # Initialize scanner with the root directory
         analyzer = DocumentAnalyzer(
-            base_dir=r'D:\busineshuboffline CHATGTP\KEAN',
+            base_dir=args.base_dir,
             max_reports=5,  # Keep last 5 reports
-            days_to_keep=7  # Keep reports up to 7 days old
+            days_to_keep=7,  # Keep reports up to 7 days old
+            use_catalog=not args.no_cache,
+            workers=args.workers,
+            split_pdf_pages=args.split_pdf_pages,
+            ocr_pdf_pages=args.ocr_pdf_pages,
+            stream_report=args.stream_report,
+            file_timeout=args.file_timeout or None,
+            memory_mb=args.max_memory_mb or None,
+            search_index=not args.no_index,
+            near_duplicates=None if args.near_duplicates == 'off' else args.near_duplicates,
+            near_duplicate_threshold=args.near_duplicate_threshold
         )
         
         # Start scanning
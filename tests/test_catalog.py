@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+import docscan.catalog
+from docscan.catalog import ScanCatalog, bytes_digest, file_digest
+from docscan import textfile
+from docscan.textfile import text_file_stats
+
+
+def _touch(path, mtime_ns):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path.stat()
+
+
+def test_store_does_not_read_the_file(tmp_path, monkeypatch):
+    doc = tmp_path / 'doc.txt'
+    doc.write_text('hello')
+    monkeypatch.setattr(docscan.catalog, 'file_digest', lambda path: (_ for _ in ()).throw(AssertionError(path)))
+
+    with ScanCatalog(tmp_path / 'catalog.sqlite') as catalog:
+        catalog.store('doc.txt', doc.stat(), {'words': 1})
+        assert catalog.lookup('doc.txt', doc, doc.stat()) == {'words': 1}
+
+
+def test_touched_file_without_hash_is_extracted_again(tmp_path):
+    doc = tmp_path / 'doc.txt'
+    doc.write_text('hello')
+    with ScanCatalog(tmp_path / 'catalog.sqlite') as catalog:
+        catalog.store('doc.txt', _touch(doc, 1_000_000_000), {'words': 1})
+        assert catalog.lookup('doc.txt', doc, _touch(doc, 2_000_000_000)) is None
+
+
+def test_touched_file_with_matching_hash_stays_a_hit(tmp_path):
+    doc = tmp_path / 'doc.txt'
+    doc.write_text('hello')
+    with ScanCatalog(tmp_path / 'catalog.sqlite') as catalog:
+        catalog.store('doc.txt', _touch(doc, 1_000_000_000), {'words': 1}, content_hash=file_digest(doc))
+        touched = []
+        assert catalog.lookup('doc.txt', doc, _touch(doc, 2_000_000_000), touched.append) == {'words': 1}
+        assert touched == [1_000_000_000]
+        # The new mtime is stored, so the next scan needs no hash
+        assert catalog.lookup('doc.txt', doc, doc.stat(), touched.append) == {'words': 1}
+        assert touched == [1_000_000_000]
+
+        doc.write_text('jello')
+        assert catalog.lookup('doc.txt', doc, _touch(doc, 3_000_000_000)) is None
+
+
+@pytest.mark.parametrize('mmap_min_bytes', [16 * 1024 * 1024, 1])
+def test_extractors_hand_over_the_bytes_they_read(tmp_path, monkeypatch, mmap_min_bytes):
+    monkeypatch.setattr(textfile, 'MMAP_MIN_BYTES', mmap_min_bytes)
+    doc = tmp_path / 'doc.txt'
+    doc.write_bytes('Grüße\r\naus der Fakultät'.encode('utf-8'))
+    digests = []
+    text_file_stats(doc, on_bytes=lambda data: digests.append(bytes_digest(data)))
+    assert digests == [file_digest(doc)]
+
+
+@pytest.mark.parametrize('mmap_min_bytes', [16 * 1024 * 1024, 1])
+def test_pdf_pages_are_parsed_from_the_hashed_bytes(tmp_path, monkeypatch, mmap_min_bytes):
+    monkeypatch.setattr(textfile, 'MMAP_MIN_BYTES', mmap_min_bytes)
+    PyPDF2 = pytest.importorskip('PyPDF2')
+    from docscan.pdf import iter_pdf_pages
+
+    writer = PyPDF2.PdfWriter()
+    for _ in range(3):
+        writer.add_blank_page(width=100, height=100)
+    doc = tmp_path / 'doc.pdf'
+    with open(doc, 'wb') as f:
+        writer.write(f)
+    digests = []
+    assert list(iter_pdf_pages(doc, on_bytes=lambda data: digests.append(bytes_digest(data)))) == ['', '', '']
+    assert digests == [file_digest(doc)]
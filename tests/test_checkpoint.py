@@ -0,0 +1,47 @@
+from docscan.checkpoint import Checkpoint
+
+
+def _write(checkpoint, names):
+    for name in names:
+        checkpoint.add_document({'file': name})
+
+
+def test_resume_cuts_documents_back_to_the_last_snapshot(tmp_path):
+    checkpoint = Checkpoint(tmp_path / 'checkpoint', signature=['docs', False], interval=0)
+    assert checkpoint.start(resume=True) is None
+    _write(checkpoint, ['a.txt', 'b.txt'])
+    checkpoint.save({'processed': ['a.txt', 'b.txt']})
+    # Written after the snapshot, then the scan dies mid-record
+    _write(checkpoint, ['c.txt'])
+    checkpoint._documents.write('{"file": "d.t')
+    checkpoint.close()
+
+    resumed = Checkpoint(tmp_path / 'checkpoint', signature=['docs', False])
+    state = resumed.start(resume=True)
+    assert state['processed'] == ['a.txt', 'b.txt']
+    assert [document['file'] for document in resumed.documents()] == ['a.txt', 'b.txt']
+
+    # The redone files are appended after the restored ones
+    _write(resumed, ['c.txt'])
+    resumed.save({'processed': ['a.txt', 'b.txt', 'c.txt']})
+    assert [document['file'] for document in resumed.documents()] == ['a.txt', 'b.txt', 'c.txt']
+    resumed.clear()
+    assert not (tmp_path / 'checkpoint').exists()
+
+
+def test_other_settings_or_no_resume_start_afresh(tmp_path):
+    checkpoint = Checkpoint(tmp_path / 'checkpoint', signature=['docs', False])
+    checkpoint.start()
+    _write(checkpoint, ['a.txt'])
+    checkpoint.save({'processed': ['a.txt']})
+    checkpoint.close()
+
+    changed = Checkpoint(tmp_path / 'checkpoint', signature=['docs', True])
+    assert changed.start(resume=True) is None
+    assert list(changed.documents()) == []
+    changed.close()
+
+    fresh = Checkpoint(tmp_path / 'checkpoint', signature=['docs', True])
+    assert fresh.start(resume=False) is None
+    assert list(fresh.documents()) == []
+    fresh.close()
@@ -0,0 +1,76 @@
+import io
+import os
+import stat
+import zipfile
+
+import pytest
+
+from docscan.extractors import UnsupportedFormat, extract, extractor_for
+
+CONTENT_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+    xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+    xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0">
+  <office:body><office:text>
+    <text:h text:outline-level="1">Fakultät für Informatik</text:h>
+    <text:p>Vorlesung <text:span>Algorithmen</text:span>:<text:s text:c="3"/>Raum<text:tab/>101<text:line-break/>zweite Zeile</text:p>
+    <text:p>Text mit Fußnote<text:note><text:note-body><text:p>Die Fußnote</text:p></text:note-body></text:note> und Rest</text:p>
+    <table:table><table:table-row><table:table-cell><text:p>Zelle</text:p></table:table-cell></table:table-row></table:table>
+  </office:text></office:body>
+</office:document-content>
+"""
+
+
+def _odt_bytes():
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, 'w') as odt:
+        odt.writestr('mimetype', 'application/vnd.oasis.opendocument.text')
+        odt.writestr('content.xml', CONTENT_XML)
+    return data.getvalue()
+
+
+def test_odt_paragraphs_from_path_and_stream(tmp_path):
+    path = tmp_path / 'skript.odt'
+    path.write_bytes(_odt_bytes())
+    stream = io.BytesIO(_odt_bytes())
+    stream.name = 'archiv.zip/skript.odt'
+
+    expected = ("Fakultät für Informatik\n"
+                "Vorlesung Algorithmen:   Raum\t101\nzweite Zeile\n"
+                "Die Fußnote\n"
+                "Text mit Fußnote und Rest\n"
+                "Zelle")
+    assert extract(path) == expected
+    assert extract(stream) == expected
+
+
+def test_word_formats_have_their_own_extractors():
+    assert extractor_for('.docx') is not extractor_for('.doc')
+    assert extractor_for('.odt') is not extractor_for('.docx')
+    with pytest.raises(UnsupportedFormat):
+        extract(io.BytesIO(b''), '.wpd')
+
+
+def test_doc_without_antiword_is_an_import_error(tmp_path, monkeypatch):
+    monkeypatch.setenv('PATH', str(tmp_path))
+    doc = tmp_path / 'alt.doc'
+    doc.write_bytes(b'\xd0\xcf\x11\xe0')
+
+    with pytest.raises(ImportError, match='antiword'):
+        extract(doc)
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="fake antiword is a shell script")
+def test_doc_goes_through_antiword(tmp_path, monkeypatch):
+    antiword = tmp_path / 'antiword'
+    antiword.write_text('#!/bin/sh\n[ -s "$3" ] || { echo "empty file" >&2; exit 1; }\nprintf "Text aus %s" "${3##*/}"\n')
+    antiword.chmod(antiword.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv('PATH', str(tmp_path))
+    doc = tmp_path / 'alt.doc'
+    doc.write_bytes(b'\xd0\xcf\x11\xe0')
+
+    assert extract(doc) == 'Text aus alt.doc'
+    # A zip member is handed to antiword as a temporary file
+    assert extract(io.BytesIO(b'\xd0\xcf\x11\xe0'), '.doc').startswith('Text aus ')
+    with pytest.raises(ValueError, match='empty file'):
+        extract(io.BytesIO(b''), '.doc')
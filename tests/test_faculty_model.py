@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import pytest
+
+from docscan import faculty_model
+from docscan.faculty_model import MAX_TEXT_CHARS, FacultyBatch, FacultyClassifier
+
+
+class Recorder:
+    def __init__(self):
+        self.handled = []
+
+    def __call__(self, text, name, prediction):
+        self.handled.append((text, name, prediction))
+
+
+class FakeClassifier:
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, texts):
+        self.batches.append(list(texts))
+        return [('Medizin' if 'patient' in text else 'Informatik', 0.9) for text in texts]
+
+
+@pytest.fixture
+def model(tmp_path, monkeypatch):
+    path = tmp_path / 'faculty_model.joblib'
+    classifier = FakeClassifier()
+    monkeypatch.setitem(faculty_model._loaded, path, classifier)
+    return path, classifier
+
+
+def test_without_model_documents_are_handled_at_once(tmp_path):
+    handle = Recorder()
+    batch = FacultyBatch(tmp_path / 'missing.joblib', handle, spill_dir=tmp_path)
+
+    batch.add('first text', 'a.txt')
+    assert handle.handled == [('first text', 'a.txt', None)]
+    batch.add('second text', 'b.txt', classify=False)
+    assert handle.handled[-1] == ('second text', 'b.txt', None)
+    batch.flush()
+    assert len(handle.handled) == 2
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_model_predicts_queued_documents_in_order(tmp_path, model):
+    path, classifier = model
+    handle = Recorder()
+    batch = FacultyBatch(path, handle, spill_dir=tmp_path)
+    long_text = 'patient ' * MAX_TEXT_CHARS
+
+    batch.add('path says Informatik', 'first.txt', classify=False)
+    batch.add(long_text, 'long.txt')
+    batch.add('kept in order', 'second.txt', classify=False)
+    batch.add('compiler design', 'third.txt')
+    assert handle.handled == [('path says Informatik', 'first.txt', None)]
+
+    batch.flush()
+    assert handle.handled[1:] == [(long_text, 'long.txt', ('Medizin', 0.9)),
+                                  ('kept in order', 'second.txt', None),
+                                  ('compiler design', 'third.txt', ('Informatik', 0.9))]
+    # The model only saw the start of the long text, and the spilled texts are gone
+    assert [len(text) for text in classifier.batches[0]] == [MAX_TEXT_CHARS, len('compiler design')]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_full_batch_is_flushed(tmp_path, model):
+    path, classifier = model
+    handle = Recorder()
+    batch = FacultyBatch(path, handle, batch_size=2, spill_dir=tmp_path)
+
+    for name in ['a', 'b', 'c']:
+        batch.add(f"text {name}", name)
+    assert [name for _, name, _ in handle.handled] == ['a', 'b']
+    batch.flush()
+    assert [name for _, name, _ in handle.handled] == ['a', 'b', 'c']
+    assert len(classifier.batches) == 2
+
+
+def test_trained_classifier_round_trip(tmp_path):
+    pytest.importorskip('sklearn')
+    pytest.importorskip('joblib')
+    texts = ['patient clinic diagnosis therapy'] * 3 + ['compiler algorithm software network'] * 3
+    labels = ['Medizin'] * 3 + ['Informatik'] * 3
+    path = tmp_path / 'faculty_model.joblib'
+    FacultyClassifier.train(texts, labels).save(path)
+
+    handle = Recorder()
+    batch = FacultyBatch(path, handle, spill_dir=tmp_path)
+    batch.add('the patient needs therapy', 'doc.txt')
+    batch.flush()
+    assert handle.handled[0][2][0] == 'Medizin'
+
+
+def test_default_model_is_where_the_university_scanners_look():
+    university = Path(__file__).resolve().parent.parent / 'University'
+    assert faculty_model.DEFAULT_MODEL == university / 'document_analysis' / 'faculty_model.joblib'
+    assert faculty_model.parse_args(['train', 'labeled']).model == faculty_model.DEFAULT_MODEL
@@ -0,0 +1,65 @@
+import re
+
+import pytest
+
+from docscan.keywords import KeywordMatcher
+
+TEXT = """Die Fakultät für Informatik und WIRTSCHAFTSINFORMATIK lädt ein.
+Machine   learning,
+machine\tLearning and machine-learning at the University: it's IT for it.
+Medizin/Klinik: klinische Studien (medizinische Fakultät); Patienten_Akte_Medizin.pdf
+Wirtschaft, Wirtschaftswissenschaften und Betriebswirtschaft; informatiker, Informatik!
+"""
+
+KEYWORDS = ['informatik', 'wirtschaft*', 'machine learning', 'it', 'medizin', 'klinik*', 'fakultät',
+            'betriebs wirt*', 'learning']
+
+
+def _baseline_regex(keyword):
+    # Whole words of letters and digits, any whitespace between the words of a phrase
+    words = re.findall(r'[^\W_]+', keyword.rstrip('*'))
+    body = r'\s+'.join(re.escape(word) for word in words)
+    end = r'[^\W_]*' if keyword.endswith('*') else r'(?![^\W_])'
+    return re.compile(rf'(?<![^\W_]){body}{end}', re.IGNORECASE)
+
+
+def test_substring_mode_equals_str_count():
+    keywords = ['informatik', 'it', 'medizin', 'learning', 'ät']
+    matcher = KeywordMatcher({'all': keywords}, word_boundary=False)
+
+    assert matcher.keyword_counts(TEXT) == {keyword: TEXT.lower().count(keyword) for keyword in keywords}
+
+
+def test_word_mode_equals_regex_baseline():
+    matcher = KeywordMatcher({'all': KEYWORDS})
+
+    assert matcher.keyword_counts(TEXT) == {keyword: len(_baseline_regex(keyword).findall(TEXT))
+                                            for keyword in KEYWORDS}
+
+
+@pytest.mark.parametrize('keyword, text, count', [
+    # Word boundaries: no match inside other words, underscores and punctuation separate words
+    ('it', 'university city it IT It.', 3),
+    ('medizin', 'Medizinische Fakultät, Patienten_Medizin.pdf', 1),
+    ('informatik', 'Wirtschaftsinformatik informatiker (Informatik)', 1),
+    # A trailing '*' matches word prefixes (German compounds)
+    ('wirtschaft*', 'Wirtschaftsinformatik, Betriebswirtschaft, WIRTSCHAFT', 2),
+    # Case folding, including umlauts
+    ('fakultät', 'FAKULTÄT Fakultät fakultät', 3),
+    # Phrases match across any whitespace but not across punctuation
+    ('machine learning', 'machine learning\nMachine\t\tLearning machine-learning machine learnings', 2),
+    ('betriebs wirt*', 'Betriebs Wirtschaft betriebs wirte Betriebswirtschaft', 2),
+])
+def test_word_boundaries_prefixes_and_case(keyword, text, count):
+    assert KeywordMatcher({'group': [keyword]}).keyword_counts(text)[keyword] == count
+
+
+def test_groups_sum_their_keywords_in_priority_order():
+    matcher = KeywordMatcher({'Informatik': ['informatik', 'machine learning'],
+                              'Medizin': ['medizin', 'klinik*'],
+                              'Jura': ['recht']})
+
+    assert matcher.counts(TEXT) == {'Informatik': 4, 'Medizin': 3, 'Jura': 0}
+    assert matcher.found(TEXT) == ['Informatik', 'Medizin']
+    assert matcher.first('Klinik und Informatik') == 'Informatik'
+    assert matcher.first('') is None
@@ -0,0 +1,56 @@
+import random
+
+from docscan.neardup import MinHash, NearDuplicateIndex, find_clusters, similarity
+
+
+def _text(seed, words=400):
+    rng = random.Random(seed)
+    return ' '.join(f"word{rng.randrange(5000)}" for _ in range(words))
+
+
+def _signature(text):
+    return MinHash().update(text).digest()
+
+
+def test_copies_and_light_edits_cluster_unrelated_texts_do_not():
+    report = _text(1)
+    edited = report.replace('word', 'Word', 3) + ' one more closing sentence'
+    signatures = [
+        ('b/report_v2.txt', _signature(edited)),
+        ('other.txt', _signature(_text(2))),
+        ('a/report.txt', _signature(report)),
+        ('third.txt', _signature(_text(3))),
+        ('c/report copy.txt', _signature(report)),
+    ]
+
+    assert find_clusters(signatures) == [['b/report_v2.txt', 'a/report.txt', 'c/report copy.txt']]
+
+
+def test_clusters_keep_add_order_and_separate_groups():
+    index = NearDuplicateIndex()
+    for key, seed in [('x2', 10), ('y1', 20), ('x1', 10), ('z', 30), ('y2', 20)]:
+        index.add(key, _signature(_text(seed)))
+
+    assert index.clusters() == [['x2', 'x1'], ['y1', 'y2']]
+
+
+def test_partial_overlap_is_not_a_near_duplicate():
+    shared = _text(4, words=300)
+    a = _signature(shared + ' ' + _text(5, words=300))
+    b = _signature(shared + ' ' + _text(6, words=300))
+
+    assert 0.1 < similarity(a, b) < 0.6
+    assert find_clusters([('a', a), ('b', b)]) == []
+
+
+def test_signature_ignores_chunking_case_and_punctuation():
+    text = _text(7)
+    words = text.split(' ')
+    chunked = MinHash()
+    for start in range(0, len(words), 37):
+        chunked.update(' '.join(words[start:start + 37]) + ' ')
+
+    assert chunked.digest() == _signature(text)
+    assert _signature(text.upper().replace(' ', ', ')) == _signature(text)
+    assert _signature('') is None
+    assert _signature('two words') is not None
@@ -0,0 +1,72 @@
+import itertools
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from docscan import ocr_cache
+from docscan.ocr_cache import OcrCache
+
+PARAMS = {'lang': 'eng'}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    # A clock that ticks on every call, so every use has its own time
+    ticks = itertools.count(1)
+    monkeypatch.setattr(ocr_cache, 'time', SimpleNamespace(time=lambda: float(next(ticks))))
+    cache = OcrCache(tmp_path / 'ocr.sqlite', max_bytes=10)
+    yield cache
+    cache.close()
+
+
+def _last_used(cache):
+    with sqlite3.connect(str(cache.db_path)) as conn:
+        return dict(conn.execute("SELECT content_hash, last_used FROM ocr"))
+
+
+def test_hits_do_not_write_until_the_next_insert(cache):
+    cache.put('a', PARAMS, 'aaaa')
+    before = _last_used(cache)
+    changes = cache.conn.total_changes
+
+    assert cache.get('a', PARAMS) == 'aaaa'
+    assert cache.get('a', PARAMS) == 'aaaa'
+    assert cache.get('missing', PARAMS) is None
+    assert cache.conn.total_changes == changes
+    assert _last_used(cache) == before
+
+    cache.put('b', PARAMS, 'bbbb')
+    assert _last_used(cache)['a'] > before['a']
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_eviction_sees_buffered_hits(cache):
+    for name in 'abc':
+        cache.put(name, PARAMS, name * 4)
+    cache.get('a', PARAMS)
+
+    assert cache.evict() == 1
+    assert set(_last_used(cache)) == {'a', 'c'}
+
+
+def test_hits_are_written_in_batches(cache, monkeypatch):
+    monkeypatch.setattr(ocr_cache, 'TOUCH_BATCH', 2)
+    cache.put('a', PARAMS, 'a')
+    cache.put('b', PARAMS, 'b')
+    before = _last_used(cache)
+
+    cache.get('a', PARAMS)
+    assert _last_used(cache) == before
+    cache.get('b', PARAMS)
+    after = _last_used(cache)
+    assert after['a'] > before['a'] and after['b'] > before['b']
+
+
+def test_close_writes_pending_hits(cache):
+    cache.put('a', PARAMS, 'a')
+    before = _last_used(cache)['a']
+    cache.get('a', PARAMS)
+    cache.close()
+
+    assert _last_used(cache)['a'] > before
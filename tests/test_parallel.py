@@ -0,0 +1,200 @@
+import os
+import time
+
+import pytest
+
+from docscan.parallel import (EXTRACTION_ERROR, MEMORY_EXCEEDED, TIMED_OUT, WORKER_CRASHED, ExtractionPool,
+                              ImageBatch, PdfSplit, TaskFailure)
+
+
+class Worker:
+    """Stand-in scanner: the argument names what the task does."""
+
+    def run(self, arg):
+        if arg == 'raise':
+            raise ValueError('broken file')
+        if arg == 'unpicklable':
+            return lambda: None
+        if arg == 'crash':
+            os._exit(1)
+        if arg == 'hang':
+            time.sleep(60)
+        if arg == 'huge':
+            return bytearray(4 * 1024 ** 3)
+        return arg.upper()
+
+
+def _memory_mb():
+    # Current address space of this process, which a forked worker starts with
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmSize:'):
+                return int(line.split()[1]) // 1024
+
+
+def _run(pool, args):
+    return list(pool.map((arg,) for arg in args))
+
+
+@pytest.mark.parametrize('workers, timeout', [(1, None), (2, None), (1, 30), (2, 30)])
+def test_exception_becomes_failure_and_later_files_still_arrive(workers, timeout):
+    pool = ExtractionPool(Worker, 'run', workers=workers, timeout=timeout)
+    results = _run(pool, ['a', 'raise', 'b', 'c', 'raise', 'd'])
+
+    assert results[0] == 'A'
+    assert isinstance(results[1], TaskFailure)
+    assert results[1].reason.startswith(EXTRACTION_ERROR)
+    assert 'broken file' in results[1].reason
+    assert results[2:4] == ['B', 'C']
+    assert isinstance(results[4], TaskFailure)
+    assert results[5] == 'D'
+
+
+@pytest.mark.parametrize('workers, timeout', [(1, 30), (2, None), (2, 30)])
+def test_unpicklable_result_becomes_failure(workers, timeout):
+    pool = ExtractionPool(Worker, 'run', workers=workers, timeout=timeout)
+    results = _run(pool, ['a', 'unpicklable', 'b'])
+
+    assert results[0] == 'A'
+    assert isinstance(results[1], TaskFailure)
+    assert results[1].reason.startswith(EXTRACTION_ERROR)
+    assert results[2] == 'B'
+
+
+@pytest.mark.parametrize('workers, timeout', [(1, 30), (2, None), (2, 30)])
+def test_crashed_worker_fails_only_its_file(workers, timeout):
+    pool = ExtractionPool(Worker, 'run', workers=workers, timeout=timeout, chunksize=2)
+    results = _run(pool, ['a', 'b', 'crash', 'c', 'd', 'e', 'f'])
+
+    assert results == ['A', 'B', TaskFailure(WORKER_CRASHED), 'C', 'D', 'E', 'F']
+
+
+def test_timeout_kills_worker_and_continues():
+    pool = ExtractionPool(Worker, 'run', workers=1, timeout=1)
+    started = time.monotonic()
+    results = _run(pool, ['a', 'hang', 'b'])
+
+    assert results == ['A', TaskFailure(TIMED_OUT), 'B']
+    assert time.monotonic() - started < 30
+
+
+@pytest.mark.skipif(_memory_mb() is None, reason="needs /proc to size the memory cap")
+def test_memory_cap_fails_only_the_offending_file():
+    pytest.importorskip('resource')
+    pool = ExtractionPool(Worker, 'run', workers=1, memory_mb=_memory_mb() + 512)
+    results = _run(pool, ['a', 'huge', 'b'])
+
+    assert results == ['A', TaskFailure(MEMORY_EXCEEDED), 'B']
+
+
+def test_single_sandboxed_worker_does_not_split_pdfs(monkeypatch):
+    def candidate(self, file_path):
+        raise AssertionError("split with a single worker")
+
+    monkeypatch.setattr(PdfSplit, 'candidate', candidate)
+    pool = ExtractionPool(Worker, 'run', workers=1, timeout=30, pdf_split=PdfSplit(lambda path, pages: pages))
+
+    assert _run(pool, ['a.pdf', 'b']) == ['A.PDF', 'B']
+
+
+def _write_pdf(path, pages):
+    from PyPDF2 import PdfWriter
+
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    with open(path, 'wb') as f:
+        writer.write(f)
+    return str(path)
+
+
+@pytest.mark.parametrize('timeout', [None, 5])
+def test_pages_are_counted_in_the_workers(tmp_path, monkeypatch, timeout):
+    pytest.importorskip('PyPDF2')
+    from docscan import parallel, pdf
+
+    count_pages = pdf.pdf_page_count
+
+    def pdf_page_count(file_path):
+        # Inherited by the forked workers; the parent must never count pages
+        if os.getpid() == parent or 'hang' in str(file_path):
+            time.sleep(20)
+        return count_pages(file_path)
+
+    parent = os.getpid()
+    monkeypatch.setattr(pdf, 'pdf_page_count', pdf_page_count)
+    monkeypatch.setattr(parallel, 'SPLIT_MIN_BYTES', 0)
+    files = [_write_pdf(tmp_path / 'big.pdf', 25), _write_pdf(tmp_path / 'small.pdf', 3)]
+    if timeout:
+        files.append(_write_pdf(tmp_path / 'hang.pdf', 3))
+    files.append('notes.txt')
+    split = PdfSplit(lambda path, pages: len(pages), min_pages=10, pages_per_task=4)
+    pool = ExtractionPool(Worker, 'run', workers=2, timeout=timeout, pdf_split=split)
+
+    started = time.monotonic()
+    results = _run(pool, files)
+
+    assert results[:2] == [25, files[1].upper()]
+    if timeout:
+        assert results[2] == TaskFailure(TIMED_OUT)
+    assert results[-1] == 'NOTES.TXT'
+    assert time.monotonic() - started < 15
+
+
+class FakeEngine:
+    """OCR engine that reports how it was called instead of reading the image."""
+    lang = 'eng'
+    backend = 'pytesseract'
+
+    def recognize(self, image):
+        return 'alone'
+
+    def recognize_batch(self, images):
+        images = list(images)
+        return [f"batch of {len(images)}"] * len(images)
+
+
+class ImageWorker:
+    def read(self, path):
+        from docscan.ocr import ocr_image_file
+
+        if path.startswith('crash'):
+            os._exit(1)
+        if path.endswith('.png'):
+            return ocr_image_file(path)
+        return path.upper()
+
+
+@pytest.fixture
+def images(tmp_path, monkeypatch):
+    from PIL import Image
+    from docscan import ocr
+
+    # Inherited by the forked workers
+    monkeypatch.setattr(ocr, 'get_ocr_engine', FakeEngine)
+    monkeypatch.setenv('KEAN_OCR_CACHE', 'off')
+    monkeypatch.setenv('KEAN_OCR_TEXT_THRESHOLD', '0')
+    monkeypatch.chdir(tmp_path)
+    for shade, name in enumerate(['a.png', 'b.png', 'c.png', 'crash.png']):
+        Image.new('L', (40, 20), shade * 60).save(name)
+    with open('broken.png', 'wb') as f:
+        f.write(b'not an image')
+
+
+@pytest.mark.parametrize('workers, timeout', [(1, None), (2, None), (1, 30)])
+def test_images_are_recognized_in_batches(images, workers, timeout):
+    pool = ExtractionPool(ImageWorker, 'read', workers=workers, timeout=timeout, image_batch=ImageBatch(size=2))
+    results = _run(pool, ['a.png', 'notes.txt', 'broken.png', 'b.png', 'c.png'])
+
+    assert results[:2] == ['batch of 1', 'NOTES.TXT']
+    # An image that cannot be read fails on its own, not its batch
+    assert isinstance(results[2], TaskFailure)
+    assert results[3:] == ['batch of 2', 'batch of 2']
+
+
+@pytest.mark.parametrize('workers, timeout', [(2, None), (1, 30)])
+def test_images_of_a_failed_batch_are_retried_one_by_one(images, workers, timeout):
+    pool = ExtractionPool(ImageWorker, 'read', workers=workers, timeout=timeout, image_batch=ImageBatch(size=4))
+    results = _run(pool, ['notes.txt', 'a.png', 'crash.png', 'b.png', 'c.png'])
+
+    assert results == ['NOTES.TXT', 'alone', TaskFailure(WORKER_CRASHED), 'alone', 'alone']
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from docscan.report import NdjsonReport, iter_ndjson
+
+
+def test_documents_are_on_disk_before_finish(tmp_path):
+    report = NdjsonReport(tmp_path, 'report').open()
+    report.write({'file': 'a.txt', 'text': 'erste Zeile\nzweite'})
+    report.write({'file': 'b.txt', 'text': ''})
+
+    # Flushed per document: a crash now still leaves both records
+    assert list(iter_ndjson(report.documents_path)) == [{'file': 'a.txt', 'text': 'erste Zeile\nzweite'},
+                                                        {'file': 'b.txt', 'text': ''}]
+    assert not report.summary_path.exists()
+
+    report.finish({'metadata': {'total_documents': 2}})
+    summary = json.loads(report.summary_path.read_text(encoding='utf-8'))
+    assert summary == {'metadata': {'total_documents': 2}, 'documents_file': 'report.ndjson',
+                       'documents_written': 2}
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    with NdjsonReport(tmp_path, 'report') as report:
+        for i in range(3):
+            report.write({'file': f"{i}.txt", 'text': 'x' * 100})
+    data = report.documents_path.read_bytes()
+    # The scan died in the middle of the third record
+    report.documents_path.write_bytes(data[:len(data) - 50])
+
+    assert [record['file'] for record in iter_ndjson(report.documents_path)] == ['0.txt', '1.txt']
+
+
+def test_corrupt_complete_line_raises(tmp_path):
+    path = tmp_path / 'report.ndjson'
+    path.write_text('{"file": "a.txt"}\n{"file": \n{"file": "c.txt"}\n', encoding='utf-8')
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_ndjson(path))
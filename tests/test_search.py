@@ -0,0 +1,111 @@
+import pytest
+
+from docscan import search
+from docscan.search import SearchIndex, match_expression
+
+
+def _index(index, rel_path, *texts, faculty=None, version=(1, 1)):
+    ext = '.' + rel_path.rsplit('.', 1)[1]
+    with index.writer(rel_path, ext, *version) as writer:
+        for text in texts:
+            writer.write(text)
+        writer.commit(faculty)
+
+
+@pytest.fixture
+def index(tmp_path):
+    with SearchIndex(tmp_path / 'index.sqlite') as index:
+        _index(index, 'reports/ml.pdf', 'Machine learning for ', 'clinical diagnosis. Learning rates matter; ',
+               'learning learning.', faculty='technology')
+        _index(index, 'notes/once.txt', 'A short note that mentions learning once among many other words '
+               'about the campus library and its opening hours.', faculty='arts')
+        _index(index, 'finance/budget.docx', 'Budget planning for the Économie department.', faculty='business')
+        yield index
+
+
+def _paths(hits):
+    return [hit.path for hit in hits]
+
+
+def test_bm25_ranks_the_denser_document_first(index):
+    hits = index.search('learning')
+
+    assert _paths(hits) == ['reports/ml.pdf', 'notes/once.txt']
+    assert hits[0].score > hits[1].score > 0
+    assert '[learning]' in hits[0].snippet.lower()
+    assert (hits[0].faculty, hits[0].ext) == ('technology', '.pdf')
+
+
+@pytest.mark.parametrize('query, paths', [
+    # Every word must occur; text written in several pieces is one document
+    ('learning clinical', ['reports/ml.pdf']),
+    ('"machine learning"', ['reports/ml.pdf']),
+    ('"learning machine"', []),
+    ('libr*', ['notes/once.txt']),
+    ('budget OR diagnosis', ['finance/budget.docx', 'reports/ml.pdf']),
+    # Diacritics are folded, punctuation is no syntax error
+    ('economie', ['finance/budget.docx']),
+    ('c++ "', []),
+])
+def test_queries(index, query, paths):
+    assert sorted(_paths(index.search(query))) == sorted(paths)
+
+
+def test_filters(index):
+    assert _paths(index.search('learning', faculty='arts')) == ['notes/once.txt']
+    assert _paths(index.search('learning', ext='PDF')) == ['reports/ml.pdf']
+    assert index.search('learning', ext='.docx') == []
+
+
+def test_reindexing_replaces_the_old_text(index):
+    pieces = index.stats()['pieces']
+    _index(index, 'notes/once.txt', 'Rewritten note about the cafeteria.', faculty='arts', version=(2, 2))
+
+    assert index.search('library') == []
+    assert _paths(index.search('cafeteria')) == ['notes/once.txt']
+    assert index.stats() == {'documents': 3, 'pieces': pieces}
+    assert index.indexed()['notes/once.txt'] == (2, 2)
+
+
+def test_uncommitted_or_restarted_text_is_dropped(index):
+    with index.writer('notes/once.txt', '.txt', 3, 3) as writer:
+        writer.write('never committed')
+    assert index.search('committed') == []
+    assert index.indexed()['notes/once.txt'] == (1, 1)
+
+    with index.writer('notes/once.txt', '.txt', 3, 3) as writer:
+        writer.write('GrÃ¼Ã\u009fe decoded wrongly ')
+        writer.restart()
+        writer.write('decoded again')
+        writer.commit()
+    assert index.search('wrongly') == []
+    assert _paths(index.search('decoded')) == ['notes/once.txt']
+
+
+def test_long_documents_rank_by_their_best_piece(index, monkeypatch):
+    monkeypatch.setattr(search, 'INDEX_CHUNK_CHARS', 200)
+    filler = 'filler words about nothing in particular ' * 40
+    _index(index, 'long.txt', filler, 'zebra crossing zebra stripes zebra ', filler)
+    _index(index, 'short.txt', 'one zebra here ' + filler[:150])
+
+    hits = index.search('zebra')
+    assert _paths(hits) == ['long.txt', 'short.txt']
+    assert hits[0].snippet.lower().count('[zebra]') == 3
+    assert index.stats()['pieces'] > index.stats()['documents']
+
+
+def test_prune_and_touch(index):
+    assert index.prune(['reports/ml.pdf', 'finance/budget.docx']) == 1
+    assert sorted(index.indexed()) == ['finance/budget.docx', 'reports/ml.pdf']
+    assert index.search('library') == []
+
+    index.touch('reports/ml.pdf', 5, 6)
+    assert index.indexed()['reports/ml.pdf'] == (5, 6)
+    assert _paths(index.search('diagnosis')) == ['reports/ml.pdf']
+
+
+def test_match_expression_quotes_everything():
+    assert match_expression('learn* "machine learning" OR c++') == '"learn"* "machine learning" OR "c++"'
+    # OR only joins two terms; empty phrases are dropped
+    assert match_expression('OR budget OR') == '"OR" "budget"'
+    assert match_expression('"" " "') == ''
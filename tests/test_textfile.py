@@ -0,0 +1,64 @@
+import pytest
+
+from docscan import textfile
+from docscan.textfile import decode_bytes, iter_text_chunks, text_file_stats
+
+
+@pytest.fixture(autouse=True)
+def small_slices(monkeypatch):
+    monkeypatch.setattr(textfile, 'CHUNK_BYTES', 16)
+
+
+def _decode(data):
+    chunks = []
+    restarts = []
+
+    def restart():
+        restarts.append(len(chunks))
+        chunks.clear()
+
+    for chunk in iter_text_chunks(data, on_restart=restart):
+        chunks.append(chunk)
+    return ''.join(chunks), restarts
+
+
+@pytest.mark.parametrize('data, encoding', [
+    ('Fakultät für Informatik\r\nZeile zwei\r'.encode('utf-8') * 3, 'utf-8'),
+    ('﻿mit BOM, Grüße'.encode('utf-8'), 'utf-8'),
+    ('UTF-16 Größe\r\nzwei'.encode('utf-16'), 'utf-16'),
+    # ASCII up to the first latin-1 byte: decoding switches in place
+    ('plain ascii words for a while, then Straße und Bücher'.encode('latin-1'), 'latin-1'),
+])
+def test_decoded_in_one_pass(data, encoding):
+    text, restarts = _decode(data)
+
+    assert text == data.decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
+    assert text == decode_bytes(data).replace('\r\n', '\n').replace('\r', '\n')
+    assert restarts == []
+
+
+@pytest.mark.parametrize('data', [
+    # Valid UTF-8 first, a latin-1 byte slices later
+    'Grüße '.encode('utf-8') + b'more words here and there ' + 'Straße'.encode('latin-1'),
+    # A multi-byte sequence cut off by the end of the file
+    'Grüße und '.encode('utf-8') + b'\xc3',
+])
+def test_restarts_as_latin1_after_non_ascii_text(data):
+    text, restarts = _decode(data)
+
+    assert text == data.decode('latin-1')
+    # Chunks had been passed on before the restart
+    assert len(restarts) == 1 and restarts[0] > 0
+
+
+def test_file_stats_start_over_on_restart(tmp_path):
+    text = 'Grüße aus der Fakultät\n' * 3 + 'Straße Ende'
+    path = tmp_path / 'mixed.txt'
+    path.write_bytes(text.encode('utf-8').replace('Straße'.encode('utf-8'), 'Straße'.encode('latin-1')))
+    expected = path.read_bytes().decode('latin-1')
+    chunks = []
+
+    stats = text_file_stats(path, on_chunk=chunks.append, on_restart=chunks.clear)
+
+    assert ''.join(chunks) == expected
+    assert (stats.words, stats.chars, stats.lines) == (len(expected.split()), len(expected), 4)
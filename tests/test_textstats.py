@@ -0,0 +1,78 @@
+import pytest
+
+from docscan import textfile
+from docscan.keywords import KeywordMatcher
+from docscan.textstats import TextStats, page_text_stats
+
+# Leading/trailing whitespace, unicode spaces (NBSP, em space), CR, tabs,
+# combining marks, emoji, punctuation glued to words and a long word
+TEXT = ("\n\t  Fakultät für Informatik—Wirtschaft und Technik.\r\n"
+        "Cáfé 👩‍🔬 research: computer-engineering, IT/it's ... «management»\n\n"
+        "   finance\teconomics " + "x" * 700 + " music!\n  \n")
+
+GROUPS = {
+    'business': ['business', 'management', 'economics', 'finance'],
+    'technology': ['technology', 'computer', 'engineering', 'it'],
+    'arts': ['arts', 'design', 'music', 'humanities'],
+}
+
+
+def _baseline(text, preview_chars=500):
+    # The counts the scanners computed on the joined text before streaming
+    return {
+        'words': len(text.split()),
+        'chars': len(text),
+        'lines': text.count('\n') + 1,
+        'content_preview': text[:preview_chars] + '...' if len(text) > preview_chars else text,
+    }
+
+
+def _chunked(text, size):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, len(TEXT)])
+@pytest.mark.parametrize('strip', [True, False])
+def test_chunked_counts_equal_the_joined_text(size, strip):
+    text_stats = TextStats(strip=strip)
+    for chunk in _chunked(TEXT, size):
+        text_stats.feed(chunk)
+
+    assert text_stats.as_dict() == _baseline(TEXT.strip() if strip else TEXT)
+
+
+@pytest.mark.parametrize('text', ['', ' \n\t  ', 'word', ' two  words '])
+def test_short_and_blank_texts(text):
+    text_stats = TextStats()
+    for chunk in _chunked(text, 1):
+        text_stats.feed(chunk)
+
+    assert text_stats.as_dict() == _baseline(text.strip())
+    assert text_stats.empty == (not text.strip())
+
+
+def test_pages_equal_the_old_joined_pdf_text():
+    pages = ['  Deckblatt', '', 'Seite zwei\r\nmit Text  ', '\n', TEXT]
+    seen = []
+    text_stats = page_text_stats(pages, preview_chars=40, on_page=seen.append)
+
+    assert seen == pages
+    assert text_stats.as_dict() == _baseline(''.join(page + '\n' for page in pages).strip(), 40)
+
+
+def test_faculty_counts_per_chunk_equal_the_whole_text(tmp_path, monkeypatch):
+    monkeypatch.setattr(textfile, 'CHUNK_BYTES', 16)
+    path = tmp_path / 'doc.txt'
+    path.write_bytes((TEXT * 3).encode('utf-8'))
+    matcher = KeywordMatcher(GROUPS)
+    totals = dict.fromkeys(GROUPS, 0)
+
+    def count(chunk):
+        for faculty, mentions in matcher.counts(chunk).items():
+            totals[faculty] += mentions
+
+    text_stats = textfile.text_file_stats(path, on_chunk=count, strip=False)
+    text = (TEXT * 3).replace('\r\n', '\n')
+
+    assert totals == matcher.counts(text) == {'business': 9, 'technology': 12, 'arts': 3}
+    assert text_stats.as_dict() == _baseline(text)
@@ -0,0 +1,30 @@
+import json
+
+from docscan import textstore
+from docscan.textstore import TextStore
+
+
+def test_texts_read_back_across_segments(tmp_path, monkeypatch):
+    monkeypatch.setattr(textstore, 'CHUNK_CHARS', 1000)
+    store = TextStore(tmp_path / 'store', segment_bytes=2000)
+    texts = [f"Dokument {i} " + ' '.join(str(n * i) for n in range(2000)) for i in range(5)]
+    texts += ['', 'Umlaute äöü, emoji \U0001F600 and a lone surrogate \udc80']
+    refs = [store.put(text) for text in texts]
+
+    assert len({segment for segment, _, _ in refs}) > 1
+    # Out of order and while the last segment is still being written
+    for i in reversed(range(len(texts))):
+        assert store.get(refs[i]) == texts[i]
+    assert 0 < store.size_on_disk() < sum(len(text) for text in texts)
+
+    store.close()
+    assert store.get(refs[0]) == texts[0]
+    store.remove()
+    assert not (tmp_path / 'store').exists()
+
+
+def test_references_survive_a_json_round_trip(tmp_path):
+    store = TextStore(tmp_path)
+    ref = json.loads(json.dumps(store.put('gespeicherter Text')))
+    assert store.get(ref) == 'gespeicherter Text'
+    store.remove()
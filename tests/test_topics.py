@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('sklearn')
+
+from docscan import topics  # noqa: E402
+from docscan.topics import STOP_WORDS, TOKEN_PATTERN, TopicModel  # noqa: E402
+
+DOCS = {
+    'med/a.txt': 'Patienten in der Klinik: Diagnose, Therapie und Therapie-Studien. Klinik 2024.',
+    'med/b.txt': 'Clinical trials of a new therapy; patients and diagnosis.',
+    'cs/c.txt': 'Compiler design, compiler optimization and software engineering.',
+    'cs/d.txt': 'Neural networks for software testing and compiler fuzzing.',
+    'law/e.txt': 'Vertragsrecht und Haftung im Zivilrecht.',
+}
+
+
+def _version(text):
+    return str(len(text))
+
+
+def _matrix(model):
+    """Counts as {(key, term): count}, independent of row and column order."""
+    counts = model.counts.tocoo()
+    return {(model.keys[row], model.vocabulary[column]): int(value)
+            for row, column, value in zip(counts.row, counts.col, counts.data)}
+
+
+def _fresh(tmp_path, docs):
+    model = TopicModel(tmp_path / 'fresh.npz')
+    model.update((key, _version(text), text) for key, text in docs.items())
+    return model
+
+
+def test_incremental_updates_equal_a_fresh_count(tmp_path):
+    model = TopicModel(tmp_path / 'topics.npz')
+    first = {key: DOCS[key] for key in ['med/a.txt', 'cs/c.txt', 'law/e.txt']}
+    assert model.update((key, _version(text), text) for key, text in first.items()) == 3
+
+    # Next scan: one changed, two new, one deleted document
+    changed = dict(DOCS, **{'cs/c.txt': 'Quantum computing and compiler theory.'})
+    del changed['law/e.txt']
+    delta = [(key, _version(text), text) for key, text in changed.items()
+             if not model.current(key, _version(text))]
+    assert sorted(key for key, _, _ in delta) == ['cs/c.txt', 'cs/d.txt', 'med/b.txt']
+    assert model.update(delta, keep=set(changed)) == 3
+
+    fresh = _fresh(tmp_path, changed)
+    assert sorted(model.keys) == sorted(fresh.keys)
+    assert _matrix(model) == _matrix(fresh)
+    # Terms only the deleted or replaced texts had are gone from the vocabulary
+    assert sorted(model.vocabulary) == sorted(fresh.vocabulary)
+    assert 'vertragsrecht' not in model.vocabulary and 'optimization' not in model.vocabulary
+    # Equal weights may come in another order; every term of a document is compared
+    assert ({key: sorted(terms) for key, terms in model.top_terms(50).items()}
+            == {key: sorted(terms) for key, terms in fresh.top_terms(50).items()})
+
+
+def test_weights_equal_sklearn_tfidf(tmp_path):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    model = _fresh(tmp_path, DOCS)
+    vectorizer = TfidfVectorizer(token_pattern=TOKEN_PATTERN, stop_words=list(STOP_WORDS), sublinear_tf=True)
+    expected = vectorizer.fit_transform(DOCS.values()).toarray()
+    terms = vectorizer.get_feature_names_out()
+
+    weights = model._weights().toarray()
+    columns = [model.vocabulary.index(term) for term in terms]
+    rows = [model.keys.index(key) for key in DOCS]
+    np.testing.assert_allclose(weights[np.ix_(rows, columns)], expected)
+    # Stop words, numbers and short words are not terms
+    assert not {'und', 'the', 'and', 'in'} & set(model.vocabulary)
+    assert not any(term.isdigit() or len(term) < 3 for term in model.vocabulary)
+
+
+def test_repeated_key_keeps_its_last_version(tmp_path):
+    model = TopicModel(tmp_path / 'topics.npz')
+    model.update([('doc', '1', 'alpha beta'), ('other', '1', 'gamma'), ('doc', '2', 'delta epsilon')])
+
+    assert sorted(model.keys) == ['doc', 'other']
+    assert model.current('doc', '2') and not model.current('doc', '1')
+    assert sorted(term for key, term in _matrix(model) if key == 'doc') == ['delta', 'epsilon']
+
+
+def test_save_and_load_round_trip(tmp_path, monkeypatch):
+    model = _fresh(tmp_path, DOCS)
+    model.path = tmp_path / 'topics.npz'
+    model.save()
+
+    loaded = TopicModel(tmp_path / 'topics.npz').load()
+    assert loaded.keys == model.keys and loaded.versions == model.versions
+    assert _matrix(loaded) == _matrix(model)
+    assert loaded.current('cs/c.txt', _version(DOCS['cs/c.txt']))
+
+    # Counts made with other settings are not reused
+    monkeypatch.setattr(topics, 'TOPIC_SETTINGS', 'other settings')
+    assert len(TopicModel(tmp_path / 'topics.npz').load()) == 0
+
+
+def test_group_top_terms_are_group_means(tmp_path):
+    model = _fresh(tmp_path, DOCS)
+    groups = {key: key.split('/')[0] for key in DOCS if not key.startswith('law/')}
+    top = model.group_top_terms(groups, n=3)
+
+    assert list(top) == ['med', 'cs']
+    assert top['cs'][0][0] == 'compiler'
+    weights = model._weights().toarray()
+    rows = [model.keys.index(key) for key in ['cs/c.txt', 'cs/d.txt']]
+    assert top['cs'][0][1] == round(float(weights[rows, model.vocabulary.index('compiler')].mean()), 4)
+    assert {term for term, _ in top['med']} & {'therapie', 'therapy', 'klinik', 'patients', 'diagnosis'}
@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+from docscan import walk
+from docscan.walk import WalkPlan
+
+SKIP_DIRS = {'node_modules', 'document_analysis'}
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for rel_path in ['top.txt', 'regions/north/a.txt', 'regions/north/b.pdf', 'regions/south/c.txt',
+                     'regions/image.png', 'notes/d.txt', 'node_modules/pkg/e.txt',
+                     'regions/document_analysis/report.txt', '.git/f.txt', 'notes/.hidden.txt']:
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel_path)
+    return tmp_path
+
+
+def _rel_files(plan, base):
+    return [os.path.relpath(entry.path, base) for entry in plan.iter_files()]
+
+
+def test_overlapping_targets_are_walked_once(tree):
+    plan = WalkPlan(tree, ['regions', '', 'regions/north', './notes/', ''], SKIP_DIRS, {'.txt', '.pdf'})
+
+    assert plan.roots == [tree]
+    files = _rel_files(plan, tree)
+    assert len(files) == len(set(files))
+    assert sorted(files) == ['notes/d.txt', 'regions/north/a.txt', 'regions/north/b.pdf',
+                             'regions/south/c.txt', 'top.txt']
+
+
+def test_nested_targets_without_their_parent(tree):
+    plan = WalkPlan(tree, ['regions/north', 'regions', 'notes'], SKIP_DIRS, None)
+
+    assert plan.roots == [tree / 'regions', tree / 'notes']
+    assert sorted(_rel_files(plan, tree)) == ['notes/d.txt', 'regions/image.png', 'regions/north/a.txt',
+                                              'regions/north/b.pdf', 'regions/south/c.txt']
+
+
+def test_excluded_directories_are_never_entered(tree, monkeypatch):
+    scanned = []
+    scandir = os.scandir
+
+    def recording_scandir(path):
+        scanned.append(os.path.relpath(path, tree))
+        return scandir(path)
+
+    monkeypatch.setattr(walk.os, 'scandir', recording_scandir)
+    # A target inside an excluded directory is dropped, not walked
+    plan = WalkPlan(tree, ['', 'node_modules/pkg'], SKIP_DIRS, {'.txt'})
+    files = _rel_files(plan, tree)
+
+    assert plan.roots == [tree]
+    assert 'notes/.hidden.txt' not in files
+    assert sorted(scanned) == ['.', 'notes', 'regions', 'regions/north', 'regions/south']
+
+
+def _fingerprints(base):
+    plan = WalkPlan(base, [''], SKIP_DIRS, {'.txt', '.pdf'})
+    return {os.path.relpath(node.path, base): node.fingerprint
+            for tree in plan.iter_trees() for node in tree.iter_nodes()}
+
+
+def _changed(before, after):
+    return sorted(rel_dir for rel_dir in before if before[rel_dir] != after[rel_dir])
+
+
+def test_unchanged_tree_keeps_its_fingerprints(tree):
+    before = _fingerprints(tree)
+
+    assert sorted(before) == ['.', 'notes', 'regions', 'regions/north', 'regions/south']
+    assert _fingerprints(tree) == before
+    # Files the walk does not yield do not count
+    (tree / 'regions' / 'south' / 'scan.png').write_text('ignored')
+    assert _fingerprints(tree) == before
+
+
+@pytest.mark.parametrize('change', [
+    lambda path: path.write_text('new content'),
+    lambda path: os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1)),
+    lambda path: path.rename(path.with_name('renamed.txt')),
+    lambda path: path.with_name('added.txt').write_text('added'),
+    lambda path: path.unlink(),
+])
+def test_nested_change_reaches_every_ancestor(tree, change):
+    before = _fingerprints(tree)
+    change(tree / 'regions' / 'north' / 'a.txt')
+
+    assert _changed(before, _fingerprints(tree)) == ['.', 'regions', 'regions/north']
+
+
+def test_unchanged_subtrees_are_skipped_by_the_catalog(tree):
+    from docscan.catalog import ScanCatalog
+
+    fingerprints = _fingerprints(tree)
+    with ScanCatalog(tree / 'catalog.sqlite') as catalog:
+        catalog.store_dirs(fingerprints.items())
+        (tree / 'regions' / 'north' / 'b.pdf').write_text('changed')
+        after = _fingerprints(tree)
+
+        assert [rel_dir for rel_dir in sorted(after) if catalog.dir_unchanged(rel_dir, after[rel_dir])] == [
+            'notes', 'regions/south']